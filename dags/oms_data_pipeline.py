@@ -68,7 +68,7 @@ def _check_raw_db():
 def _health_check():
     """Executa health check e salva resultado."""
     result = subprocess.run(
-        ["python3", "scripts/health_check.py", "--json"],
+        ["python3", "scripts/oms.py", "health", "--json"],
         cwd=PROJECT_DIR,
         capture_output=True,
         text=True,
@@ -16,6 +16,9 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import queries as q  # noqa: E402
+
 # ── Config ──────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="WHO GHO Analytics",
@@ -77,21 +80,19 @@ st.markdown(
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_obs = query("SELECT COUNT(*) AS n FROM main.fct_observations").iloc[0, 0]
+    total_obs = query(q.TOTAL_OBSERVATIONS).iloc[0, 0]
     st.metric("Observações", f"{total_obs:,}")
 
 with col2:
-    total_indicators = query("SELECT COUNT(*) AS n FROM main.dim_indicator").iloc[0, 0]
+    total_indicators = query(q.TOTAL_INDICATORS).iloc[0, 0]
     st.metric("Indicadores", f"{total_indicators:,}")
 
 with col3:
-    total_locations = query("SELECT COUNT(*) AS n FROM main.dim_location").iloc[0, 0]
+    total_locations = query(q.TOTAL_LOCATIONS).iloc[0, 0]
     st.metric("Países/Regiões", f"{total_locations:,}")
 
 with col4:
-    years_range = query(
-        "SELECT MIN(year) || '–' || MAX(year) AS period FROM main.dim_period"
-    ).iloc[0, 0]
+    years_range = query(q.YEARS_RANGE).iloc[0, 0]
     st.metric("Período", years_range)
 
 st.divider()
@@ -104,14 +105,7 @@ tab1, tab2, tab3, tab4 = st.tabs(
 with tab1:
     st.subheader("Observações por Categoria")
 
-    df_cat = query("""
-        SELECT i.category, COUNT(*) AS total
-        FROM main.fct_observations f
-        JOIN main.dim_indicator i ON f.indicator_id = i.indicator_id
-        GROUP BY i.category
-        ORDER BY total DESC
-        LIMIT 15
-    """)
+    df_cat = query(q.OBS_BY_CATEGORY)
     fig = px.bar(
         df_cat,
         x="category",
@@ -127,14 +121,7 @@ with tab1:
 
     with col_a:
         st.subheader("Top 10 Indicadores")
-        df_top = query("""
-            SELECT i.indicator_code, i.indicator_name, COUNT(*) AS total
-            FROM main.fct_observations f
-            JOIN main.dim_indicator i ON f.indicator_id = i.indicator_id
-            GROUP BY i.indicator_code, i.indicator_name
-            ORDER BY total DESC
-            LIMIT 10
-        """)
+        df_top = query(q.TOP_INDICATORS)
         fig2 = px.bar(
             df_top,
             x="total",
@@ -149,13 +136,7 @@ with tab1:
 
     with col_b:
         st.subheader("Distribuição por Sexo")
-        df_sex = query("""
-            SELECT s.sex_code, s.sex_name, COUNT(*) AS total
-            FROM main.fct_observations f
-            JOIN main.dim_sex s ON f.sex_id = s.sex_id
-            GROUP BY s.sex_code, s.sex_name
-            ORDER BY total DESC
-        """)
+        df_sex = query(q.OBS_BY_SEX)
         fig3 = px.pie(
             df_sex,
             values="total",
@@ -168,15 +149,7 @@ with tab1:
 with tab2:
     st.subheader("Evolução Temporal")
 
-    df_trend = query("""
-        SELECT p.year, i.category, AVG(f.value) AS avg_value
-        FROM main.fct_observations f
-        JOIN main.dim_period p ON f.period_id = p.period_id
-        JOIN main.dim_indicator i ON f.indicator_id = i.indicator_id
-        WHERE i.category IN (SELECT category FROM main.dim_indicator GROUP BY category)
-        GROUP BY p.year, i.category
-        ORDER BY p.year
-    """)
+    df_trend = query(q.VALUE_BY_YEAR_CATEGORY)
     fig4 = px.line(
         df_trend,
         x="year",
@@ -191,24 +164,12 @@ with tab2:
     col_c, col_d = st.columns(2)
     with col_c:
         st.subheader("Top 10 Países (total de observações)")
-        df_loc = query("""
-            SELECT l.country_code, l.country_name, COUNT(*) AS total
-            FROM main.fct_observations f
-            JOIN main.dim_location l ON f.location_id = l.location_id
-            GROUP BY l.country_code, l.country_name
-            ORDER BY total DESC
-            LIMIT 10
-        """)
+        df_loc = query(q.TOP_LOCATIONS)
         st.dataframe(df_loc, use_container_width=True, hide_index=True)
 
     with col_d:
         st.subheader("Indicadores por Categoria")
-        df_cat_count = query("""
-            SELECT category, COUNT(*) AS total
-            FROM main.dim_indicator
-            GROUP BY category
-            ORDER BY total DESC
-        """)
+        df_cat_count = query(q.INDICATORS_BY_CATEGORY)
         fig5 = px.pie(
             df_cat_count,
             values="total",
@@ -222,27 +183,13 @@ with tab3:
     st.subheader("Dados da Tabela Fato")
     st.caption("Amostra das primeiras 1.000 linhas de `fct_observations` com joins")
 
-    df_sample = query("""
-        SELECT
-            f.observation_id,
-            i.indicator_code,
-            l.country_code,
-            p.year,
-            s.sex_code,
-            f.value
-        FROM main.fct_observations f
-        LEFT JOIN main.dim_indicator i ON f.indicator_id = i.indicator_id
-        LEFT JOIN main.dim_location l ON f.location_id = l.location_id
-        LEFT JOIN main.dim_period p ON f.period_id = p.period_id
-        LEFT JOIN main.dim_sex s ON f.sex_id = s.sex_id
-        LIMIT 1000
-    """)
+    df_sample = query(q.FACT_SAMPLE)
     st.dataframe(df_sample, use_container_width=True, hide_index=True)
 
     st.subheader("Último Build")
     st.code(
         f"Target: {target}\n"
-        f"Tabelas: {query('SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = \\'main\\'').iloc[0, 0]}\n"
+        f"Tabelas: {query(q.TABLE_COUNT).iloc[0, 0]}\n"
         f"Total observações: {total_obs:,}",
         language="text",
     )
@@ -266,15 +213,7 @@ with tab4:
     st.subheader("📊 Contagens por Camada")
 
     try:
-        df_volumes = query("""
-            SELECT 'dim_indicator' AS tabela,
-                   (SELECT COUNT(*) FROM main.dim_indicator) AS mart_rows
-            UNION ALL SELECT 'dim_location', (SELECT COUNT(*) FROM main.dim_location)
-            UNION ALL SELECT 'dim_period', (SELECT COUNT(*) FROM main.dim_period)
-            UNION ALL SELECT 'dim_sex', (SELECT COUNT(*) FROM main.dim_sex)
-            UNION ALL SELECT 'fct_observations', (SELECT COUNT(*) FROM main.fct_observations)
-            ORDER BY tabela
-        """)
+        df_volumes = query(q.LAYER_VOLUMES)
         st.dataframe(df_volumes, use_container_width=True, hide_index=True)
     except Exception:
         st.info("Execute `make build` primeiro para carregar os dados.")
@@ -284,18 +223,7 @@ with tab4:
     # PK uniqueness check
     st.subheader("🔑 Unicidade de Chaves")
     try:
-        df_unique = query("""
-            SELECT 'dim_indicator.indicator_key' AS chave,
-                   COUNT(*) AS total,
-                   COUNT(DISTINCT indicator_key) AS unicos,
-                   COUNT(*) - COUNT(DISTINCT indicator_key) AS duplicatas
-            FROM main.dim_indicator
-            UNION ALL
-            SELECT 'fct_observations.observation_id',
-                   COUNT(*), COUNT(DISTINCT observation_id),
-                   COUNT(*) - COUNT(DISTINCT observation_id)
-            FROM main.fct_observations
-        """)
+        df_unique = query(q.KEY_UNIQUENESS)
         st.dataframe(df_unique, use_container_width=True, hide_index=True)
     except Exception:
         st.info("Erro ao verificar unicidade. Execute `make build`.")
@@ -0,0 +1,160 @@
+"""
+Consultas SQL do dashboard sobre o Star Schema gerado pelo dbt.
+
+Ficam fora de app.py para que scripts/benchmark_pipeline.py execute exatamente
+as mesmas consultas sem depender do Streamlit. Os gráficos leem os agregados
+agg_* construídos pelo dbt depois do fct_observations (poucas linhas, qualquer
+que seja o tamanho da fato); FACT_JOIN_QUERIES guarda as consultas equivalentes
+direto na fato, ligada às dimensões pelas chaves surrogate (*_key), para
+conferência e benchmarks.
+"""
+
+TOTAL_OBSERVATIONS = "SELECT COUNT(*) AS n FROM main.fct_observations"
+
+TOTAL_INDICATORS = "SELECT COUNT(*) AS n FROM main.dim_indicator"
+
+TOTAL_LOCATIONS = "SELECT COUNT(*) AS n FROM main.dim_location"
+
+YEARS_RANGE = "SELECT MIN(year) || '–' || MAX(year) AS period FROM main.dim_period"
+
+OBS_BY_CATEGORY = """
+    SELECT category, total
+    FROM main.agg_obs_by_category
+    ORDER BY total DESC
+    LIMIT 15
+"""
+
+TOP_INDICATORS = """
+    SELECT indicator_code, indicator_name, total
+    FROM main.agg_obs_by_indicator
+    ORDER BY total DESC
+    LIMIT 10
+"""
+
+OBS_BY_SEX = """
+    SELECT sex_code, sex_name, total
+    FROM main.agg_obs_by_sex
+    ORDER BY total DESC
+"""
+
+VALUE_BY_YEAR_CATEGORY = """
+    SELECT year, category, avg_value
+    FROM main.agg_value_by_year_category
+    ORDER BY year
+"""
+
+TOP_LOCATIONS = """
+    SELECT country_code, country_name, total
+    FROM main.agg_obs_by_location
+    ORDER BY total DESC
+    LIMIT 10
+"""
+
+INDICATORS_BY_CATEGORY = """
+    SELECT category, COUNT(*) AS total
+    FROM main.dim_indicator
+    GROUP BY category
+    ORDER BY total DESC
+"""
+
+FACT_SAMPLE = """
+    SELECT
+        f.observation_id,
+        i.indicator_code,
+        l.country_code,
+        p.year,
+        s.sex_code,
+        f.value
+    FROM main.fct_observations f
+    LEFT JOIN main.dim_indicator i ON f.indicator_key = i.indicator_key
+    LEFT JOIN main.dim_location l ON f.location_key = l.location_key
+    LEFT JOIN main.dim_period p ON f.period_key = p.period_key
+    LEFT JOIN main.dim_sex s ON f.sex_key = s.sex_key
+    LIMIT 1000
+"""
+
+TABLE_COUNT = "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'main'"
+
+LAYER_VOLUMES = """
+    SELECT 'dim_indicator' AS tabela,
+           (SELECT COUNT(*) FROM main.dim_indicator) AS mart_rows
+    UNION ALL SELECT 'dim_location', (SELECT COUNT(*) FROM main.dim_location)
+    UNION ALL SELECT 'dim_period', (SELECT COUNT(*) FROM main.dim_period)
+    UNION ALL SELECT 'dim_sex', (SELECT COUNT(*) FROM main.dim_sex)
+    UNION ALL SELECT 'fct_observations', (SELECT COUNT(*) FROM main.fct_observations)
+    ORDER BY tabela
+"""
+
+KEY_UNIQUENESS = """
+    SELECT 'dim_indicator.indicator_key' AS chave,
+           COUNT(*) AS total,
+           COUNT(DISTINCT indicator_key) AS unicos,
+           COUNT(*) - COUNT(DISTINCT indicator_key) AS duplicatas
+    FROM main.dim_indicator
+    UNION ALL
+    SELECT 'fct_observations.observation_id',
+           COUNT(*), COUNT(DISTINCT observation_id),
+           COUNT(*) - COUNT(DISTINCT observation_id)
+    FROM main.fct_observations
+"""
+
+# Todas as consultas de uma renderização completa do dashboard, na ordem em que são executadas
+DASHBOARD_QUERIES = {
+    "total_observations": TOTAL_OBSERVATIONS,
+    "total_indicators": TOTAL_INDICATORS,
+    "total_locations": TOTAL_LOCATIONS,
+    "years_range": YEARS_RANGE,
+    "obs_by_category": OBS_BY_CATEGORY,
+    "top_indicators": TOP_INDICATORS,
+    "obs_by_sex": OBS_BY_SEX,
+    "value_by_year_category": VALUE_BY_YEAR_CATEGORY,
+    "top_locations": TOP_LOCATIONS,
+    "indicators_by_category": INDICATORS_BY_CATEGORY,
+    "fact_sample": FACT_SAMPLE,
+    "table_count": TABLE_COUNT,
+    "layer_volumes": LAYER_VOLUMES,
+    "key_uniqueness": KEY_UNIQUENESS,
+}
+
+# Mesmas consultas dos gráficos calculadas direto na fato (o que os agregados agg_* pré-computam)
+FACT_JOIN_QUERIES = {
+    "obs_by_category": """
+    SELECT i.category, COUNT(*) AS total
+    FROM main.fct_observations f
+    JOIN main.dim_indicator i ON f.indicator_key = i.indicator_key
+    GROUP BY i.category
+    ORDER BY total DESC
+    LIMIT 15
+""",
+    "top_indicators": """
+    SELECT i.indicator_code, i.indicator_name, COUNT(*) AS total
+    FROM main.fct_observations f
+    JOIN main.dim_indicator i ON f.indicator_key = i.indicator_key
+    GROUP BY i.indicator_code, i.indicator_name
+    ORDER BY total DESC
+    LIMIT 10
+""",
+    "obs_by_sex": """
+    SELECT s.sex_code, s.sex_name, COUNT(*) AS total
+    FROM main.fct_observations f
+    JOIN main.dim_sex s ON f.sex_key = s.sex_key
+    GROUP BY s.sex_code, s.sex_name
+    ORDER BY total DESC
+""",
+    "value_by_year_category": """
+    SELECT p.year, i.category, AVG(f.value) AS avg_value
+    FROM main.fct_observations f
+    JOIN main.dim_period p ON f.period_key = p.period_key
+    JOIN main.dim_indicator i ON f.indicator_key = i.indicator_key
+    GROUP BY p.year, i.category
+    ORDER BY p.year
+""",
+    "top_locations": """
+    SELECT l.country_code, l.country_name, COUNT(*) AS total
+    FROM main.fct_observations f
+    JOIN main.dim_location l ON f.location_key = l.location_key
+    GROUP BY l.country_code, l.country_name
+    ORDER BY total DESC
+    LIMIT 10
+""",
+}
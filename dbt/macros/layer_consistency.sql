@@ -0,0 +1,63 @@
+-- macros/layer_consistency.sql
+-- Consistência de uma camada (snapshot raw → staging → mart) numa única consulta:
+-- contagens, chaves duplicadas/nulas, órfãos das FKs e soma de valores. O modelo
+-- audit/audit_consistency une uma chamada por camada (UNION ALL BY NAME: colunas
+-- ausentes numa camada ficam NULL) e o teste consistency/consistent_layers falha
+-- nas linhas com status 'fail'.
+--   extra_rows:   linhas que o mart acrescenta ao staging (ex: UNK em dim_sex)
+--   value_column: coluna somada em staging e mart (DECIMAL, soma exata)
+--   foreign_keys: [{'name': ..., 'column': <chave na fato e na dimensão>, 'to': ref(dimensão)}]
+
+{% macro layer_consistency(layer, raw, staging, mart, natural_key, surrogate_key,
+                           extra_rows=0, value_column=none, foreign_keys=[]) %}
+(
+WITH staging_stats AS (
+    SELECT
+        COUNT(*) AS staging_rows
+        {%- if value_column %},
+        SUM(CAST({{ value_column }} AS DECIMAL(38, 6))) AS staging_value_sum
+        {%- endif %}
+    FROM {{ staging }}
+),
+
+mart_stats AS (
+    SELECT
+        COUNT(*) AS mart_rows,
+        COUNT(*) - COUNT(DISTINCT m.{{ natural_key }}) AS duplicate_keys,
+        COUNT(*) - COUNT(m.{{ surrogate_key }}) AS null_keys
+        {%- if value_column %},
+        SUM(CAST(m.{{ value_column }} AS DECIMAL(38, 6))) AS mart_value_sum
+        {%- endif %}
+        {%- for fk in foreign_keys %},
+        COUNT(*) FILTER (WHERE d{{ loop.index }}.{{ fk.column }} IS NULL) AS orphan_{{ fk.name }}_rows
+        {%- endfor %}
+    FROM {{ mart }} m
+    {%- for fk in foreign_keys %}
+    LEFT JOIN {{ fk.to }} d{{ loop.index }} ON m.{{ fk.column }} = d{{ loop.index }}.{{ fk.column }}
+    {%- endfor %}
+)
+
+SELECT
+    '{{ layer }}' AS layer,
+    '{{ mart.identifier }}' AS mart_model,
+    (SELECT COUNT(*) FROM {{ raw }}) AS raw_rows,
+    s.*,
+    s.staging_rows + {{ extra_rows }} AS expected_mart_rows,
+    m.*,
+    CASE
+        WHEN m.mart_rows = s.staging_rows + {{ extra_rows }}
+         AND m.duplicate_keys = 0
+         AND m.null_keys = 0
+         {%- if value_column %}
+         AND m.mart_value_sum IS NOT DISTINCT FROM s.staging_value_sum
+         {%- endif %}
+         {%- for fk in foreign_keys %}
+         AND m.orphan_{{ fk.name }}_rows = 0
+         {%- endfor %}
+        THEN 'pass'
+        ELSE 'fail'
+    END AS status,
+    CAST(now() AS TIMESTAMP) AS audited_at
+FROM staging_stats s, mart_stats m
+)
+{% endmacro %}
@@ -0,0 +1,26 @@
+-- macros/raw_source.sql
+-- Camada raw selecionável: SQLite (sqlite_scanner, default) ou Parquet (read_parquet).
+--   DBT_RAW_FORMAT=sqlite  → source('raw_db', ...)       banco de populate_database.py
+--   DBT_RAW_FORMAT=parquet → source('raw_parquet', ...)  arquivos de ingest_parquet.py
+-- Também pode ser escolhida por variável: dbt build --vars '{raw_format: parquet}'
+
+{% macro raw_format() %}
+    {{- return(var('raw_format', env_var('DBT_RAW_FORMAT', 'sqlite'))) -}}
+{% endmacro %}
+
+{% macro raw_source(table_name) %}
+    {%- if raw_format() == 'parquet' -%}
+        {{ source('raw_parquet', table_name) }}
+    {%- else -%}
+        {{ source('raw_db', table_name) }}
+    {%- endif -%}
+{% endmacro %}
+
+-- on-run-start: o ATTACH do SQLite só é necessário no layout sqlite
+{% macro attach_raw_db() %}
+    {%- if raw_format() == 'parquet' -%}
+        SELECT 1
+    {%- else -%}
+        ATTACH IF NOT EXISTS '{{ env_var('DBT_RAW_DB', '../database/who_gho.db') }}' AS raw_db (TYPE SQLITE)
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,30 @@
+-- macros/source_snapshot.sql
+-- Snapshot da camada raw: os modelos de models/source_snapshot copiam cada tabela raw
+-- uma vez por execução; staging, marts e testes leem a cópia, não o SQLite.
+--   DBT_RAW_SNAPSHOT=table   → tabela DuckDB nativa (default com DBT_RAW_FORMAT=sqlite)
+--   DBT_RAW_SNAPSHOT=parquet → snap_<tabela>.parquet em DBT_RAW_SNAPSHOT_DIR (diretório existente,
+--                              default target/), via materialização external
+--   DBT_RAW_SNAPSHOT=view    → sem cópia (default com DBT_RAW_FORMAT=parquet, já colunar)
+-- Também pode ser escolhido por variável: dbt build --vars '{raw_snapshot: parquet}'
+
+{% macro raw_snapshot_mode() %}
+    {%- set default = 'view' if raw_format() == 'parquet' else 'table' -%}
+    {%- set mode = var('raw_snapshot', env_var('DBT_RAW_SNAPSHOT', default)) -%}
+    {%- if mode not in ['table', 'parquet', 'view'] -%}
+        {{ exceptions.raise_compiler_error("raw_snapshot inválido: '" ~ mode ~ "' (use table, parquet ou view)") }}
+    {%- endif -%}
+    {{- return(mode) -}}
+{% endmacro %}
+
+{% macro source_snapshot(table_name) %}
+    {%- set mode = raw_snapshot_mode() -%}
+    {%- if mode == 'parquet' -%}
+        {{ config(
+            materialized='external',
+            location=env_var('DBT_RAW_SNAPSHOT_DIR', 'target') ~ '/snap_' ~ table_name ~ '.parquet'
+        ) }}
+    {%- else -%}
+        {{ config(materialized=mode) }}
+    {%- endif %}
+SELECT * FROM {{ raw_source(table_name) }}
+{%- endmacro %}
@@ -0,0 +1,25 @@
+-- macros/surrogate_key.sql
+-- Chaves surrogate dos marts: inteiro de 64 bits (UBIGINT) do hash() do DuckDB sobre as
+-- colunas da chave natural. Ocupa 8 bytes em vez dos 32 caracteres do MD5 hexadecimal de
+-- dbt_utils.generate_surrogate_key e as junções fato × dimensão comparam inteiros.
+-- O hash() não é garantido entre versões do DuckDB: depois de atualizar o DuckDB rode
+-- `dbt build --full-refresh` (os testes relationships da fato acusam chaves órfãs).
+--   DBT_SURROGATE_KEY=int64 → hash() inteiro (default)
+--   DBT_SURROGATE_KEY=md5   → dbt_utils.generate_surrogate_key (chaves VARCHAR antigas;
+--                             só para comparação, ver scripts/benchmark_surrogate_keys.py)
+
+{% macro surrogate_key_mode() %}
+    {%- set mode = var('surrogate_key', env_var('DBT_SURROGATE_KEY', 'int64')) -%}
+    {%- if mode not in ['int64', 'md5'] -%}
+        {{ exceptions.raise_compiler_error("surrogate_key inválido: '" ~ mode ~ "' (use int64 ou md5)") }}
+    {%- endif -%}
+    {{- return(mode) -}}
+{% endmacro %}
+
+{% macro surrogate_key(columns) %}
+    {%- if surrogate_key_mode() == 'md5' -%}
+        {{ dbt_utils.generate_surrogate_key(columns) }}
+    {%- else -%}
+        hash({{ columns | join(', ') }})
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,34 @@
+-- audit/audit_consistency.sql
+-- Auditoria cross-camada da execução: uma linha por camada, calculada por
+-- macros/layer_consistency.sql com uma única consulta por camada. Lida pelo teste
+-- consistency/consistent_layers e por scripts/reconciliation.py e scripts/health_check.py,
+-- que não recontam as camadas do DuckDB.
+
+{{ layer_consistency('indicators', ref('snap_dim_indicators'), ref('stg_indicators'), ref('dim_indicator'),
+                     'indicator_nk', 'indicator_key') }}
+
+UNION ALL BY NAME
+
+{{ layer_consistency('locations', ref('snap_dim_locations'), ref('stg_locations'), ref('dim_location'),
+                     'location_nk', 'location_key') }}
+
+UNION ALL BY NAME
+
+{{ layer_consistency('periods', ref('snap_dim_periods'), ref('stg_periods'), ref('dim_period'),
+                     'period_nk', 'period_key') }}
+
+UNION ALL BY NAME
+
+{{ layer_consistency('sex', ref('snap_dim_sex'), ref('stg_sex'), ref('dim_sex'),
+                     'sex_nk', 'sex_key', extra_rows=1) }}
+
+UNION ALL BY NAME
+
+{{ layer_consistency('observations', ref('snap_fact_observations'), ref('stg_observations'), ref('fct_observations'),
+                     'observation_id', 'observation_key', value_column='value',
+                     foreign_keys=[
+                         {'name': 'indicator', 'column': 'indicator_key', 'to': ref('dim_indicator')},
+                         {'name': 'location', 'column': 'location_key', 'to': ref('dim_location')},
+                         {'name': 'period', 'column': 'period_key', 'to': ref('dim_period')},
+                         {'name': 'sex', 'column': 'sex_key', 'to': ref('dim_sex')},
+                     ]) }}
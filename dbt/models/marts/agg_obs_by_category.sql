@@ -0,0 +1,9 @@
+-- marts/agg_obs_by_category.sql
+-- Agregado do dashboard: observações por categoria de indicador.
+-- Reconstruído a cada execução a partir do fct_observations; tem uma linha por categoria.
+SELECT
+    i.category,
+    COUNT(*) AS total
+FROM {{ ref('fct_observations') }} f
+JOIN {{ ref('dim_indicator') }} i ON f.indicator_key = i.indicator_key
+GROUP BY i.category
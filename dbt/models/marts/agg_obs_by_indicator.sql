@@ -0,0 +1,10 @@
+-- marts/agg_obs_by_indicator.sql
+-- Agregado do dashboard: observações por indicador (ranking dos indicadores).
+SELECT
+    i.indicator_code,
+    i.indicator_name,
+    i.category,
+    COUNT(*) AS total
+FROM {{ ref('fct_observations') }} f
+JOIN {{ ref('dim_indicator') }} i ON f.indicator_key = i.indicator_key
+GROUP BY i.indicator_code, i.indicator_name, i.category
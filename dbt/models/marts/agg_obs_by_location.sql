@@ -0,0 +1,9 @@
+-- marts/agg_obs_by_location.sql
+-- Agregado do dashboard: observações por país (ranking dos países).
+SELECT
+    l.country_code,
+    l.country_name,
+    COUNT(*) AS total
+FROM {{ ref('fct_observations') }} f
+JOIN {{ ref('dim_location') }} l ON f.location_key = l.location_key
+GROUP BY l.country_code, l.country_name
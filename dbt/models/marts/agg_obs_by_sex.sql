@@ -0,0 +1,9 @@
+-- marts/agg_obs_by_sex.sql
+-- Agregado do dashboard: observações por sexo (inclui UNK, sem classificação).
+SELECT
+    s.sex_code,
+    s.sex_name,
+    COUNT(*) AS total
+FROM {{ ref('fct_observations') }} f
+JOIN {{ ref('dim_sex') }} s ON f.sex_key = s.sex_key
+GROUP BY s.sex_code, s.sex_name
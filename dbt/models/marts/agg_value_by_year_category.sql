@@ -0,0 +1,13 @@
+-- marts/agg_value_by_year_category.sql
+-- Agregado do dashboard: valor médio por ano e categoria.
+-- Guarda soma e contagem junto da média para permitir reagregar (ex: média por década).
+SELECT
+    p.year,
+    i.category,
+    AVG(f.value) AS avg_value,
+    SUM(f.value) AS sum_value,
+    COUNT(f.value) AS n_values
+FROM {{ ref('fct_observations') }} f
+JOIN {{ ref('dim_period') }} p ON f.period_key = p.period_key
+JOIN {{ ref('dim_indicator') }} i ON f.indicator_key = i.indicator_key
+GROUP BY p.year, i.category
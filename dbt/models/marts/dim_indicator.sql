@@ -2,7 +2,7 @@
 -- Dimensão de indicadores de saúde da OMS.
 -- Materialized como table (dimensão pequena, rebuild ok).
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['indicator_id']) }} AS indicator_key,
+    {{ surrogate_key(['indicator_id']) }} AS indicator_key,
     indicator_id AS indicator_nk,
     indicator_code,
     indicator_name,
@@ -2,7 +2,7 @@
 -- Dimensão de período (ano).
 -- Nota: schema raw usa dim_periods, mantido como dim_period no modelo dimensional.
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['period_id']) }} AS period_key,
+    {{ surrogate_key(['period_id']) }} AS period_key,
     period_id AS period_nk,
     year,
     CAST(year AS VARCHAR) AS year_label,
@@ -17,7 +17,7 @@ WITH sex_raw AS (
 )
 
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['sex_id']) }} AS sex_key,
+    {{ surrogate_key(['sex_id']) }} AS sex_key,
     sex_id AS sex_nk,
     sex_code,
     sex_name
@@ -1,12 +1,25 @@
 -- marts/fct_observations.sql
 -- Tabela fato: observações de saúde por indicador, local, período e sexo.
 -- Grão: cada linha = uma observação (observation_id da fonte).
--- Incremental (merge) por observation_id (PK real da fonte).
+-- Incremental (merge) por observation_id (PK real da fonte): cada execução lê só as
+-- observações novas (observation_id acima do maior já carregado) ou alteradas desde a
+-- última carga (updated_at da fonte >= maior source_updated_at já carregado; o >= relê
+-- as linhas do instante do watermark, o que é inofensivo no merge). Remoções na fonte
+-- (prune_stale_facts) não aparecem no watermark: o post-hook apaga, por anti-join, as
+-- linhas cujo observation_id saiu do stg_observations, como um full-refresh faria.
 
 {{ config(
     materialized='incremental',
     unique_key=['observation_id'],
-    on_schema_change='append_new_columns'
+    on_schema_change='append_new_columns',
+    post_hook=[
+        "{% if is_incremental() %}
+        DELETE FROM {{ this }} AS f
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {{ ref('stg_observations') }} AS s WHERE s.observation_id = f.observation_id
+        )
+        {% endif %}"
+    ]
 ) }}
 
 WITH observations AS (
@@ -16,20 +29,26 @@ WITH observations AS (
         location_id,
         period_id,
         COALESCE(sex_id, 0) AS sex_id,
-        value
+        value,
+        updated_at
     FROM {{ ref('stg_observations') }}
+    {% if is_incremental() %}
+    WHERE observation_id > (SELECT COALESCE(MAX(observation_id), 0) FROM {{ this }})
+       OR updated_at >= (SELECT COALESCE(MAX(source_updated_at), TIMESTAMP '1970-01-01') FROM {{ this }})
+    {% endif %}
 )
 
 SELECT
     observation_id,
-    {{ dbt_utils.generate_surrogate_key(['observation_id']) }} AS observation_key,
+    {{ surrogate_key(['observation_id']) }} AS observation_key,
     indicator_id,
-    {{ dbt_utils.generate_surrogate_key(['indicator_id']) }} AS indicator_key,
+    {{ surrogate_key(['indicator_id']) }} AS indicator_key,
     location_id,
-    {{ dbt_utils.generate_surrogate_key(['location_id']) }} AS location_key,
+    {{ surrogate_key(['location_id']) }} AS location_key,
     period_id,
-    {{ dbt_utils.generate_surrogate_key(['period_id']) }} AS period_key,
+    {{ surrogate_key(['period_id']) }} AS period_key,
     sex_id,
-    {{ dbt_utils.generate_surrogate_key(['sex_id']) }} AS sex_key,
-    value
+    {{ surrogate_key(['sex_id']) }} AS sex_key,
+    value,
+    updated_at AS source_updated_at
 FROM observations
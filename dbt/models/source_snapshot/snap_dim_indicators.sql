@@ -0,0 +1,3 @@
+-- source_snapshot/snap_dim_indicators.sql
+-- Cópia de dim_indicators lida uma única vez da camada raw (ver macros/source_snapshot.sql).
+{{ source_snapshot('dim_indicators') }}
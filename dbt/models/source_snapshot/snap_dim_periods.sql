@@ -0,0 +1,3 @@
+-- source_snapshot/snap_dim_periods.sql
+-- Cópia de dim_periods lida uma única vez da camada raw (ver macros/source_snapshot.sql).
+{{ source_snapshot('dim_periods') }}
@@ -0,0 +1,3 @@
+-- source_snapshot/snap_fact_observations.sql
+-- Cópia de fact_observations lida uma única vez da camada raw (ver macros/source_snapshot.sql).
+{{ source_snapshot('fact_observations') }}
@@ -1,19 +1,19 @@
 -- staging/stg_dimensions.sql
--- Extrai dimensões auxiliares (localização, período, sexo) da camada raw.
+-- Extrai dimensões auxiliares (localização, período, sexo) do snapshot da camada raw.
 WITH locations AS (
     SELECT
         location_id,
         country_code,
         country_name,
         region_code
-    FROM {{ source('raw_db', 'dim_locations') }}
+    FROM {{ ref('snap_dim_locations') }}
 ),
 
 periods AS (
     SELECT
         period_id,
         year
-    FROM {{ source('raw_db', 'dim_periods') }}
+    FROM {{ ref('snap_dim_periods') }}
 ),
 
 sex AS (
@@ -21,7 +21,7 @@ sex AS (
         sex_id,
         sex_code,
         sex_name
-    FROM {{ source('raw_db', 'dim_sex') }}
+    FROM {{ ref('snap_dim_sex') }}
 )
 
 SELECT 'locations' AS dim_type, location_id AS id, country_code AS code
@@ -5,4 +5,4 @@ SELECT
     TRIM(indicator_code) AS indicator_code,
     COALESCE(NULLIF(TRIM(indicator_name), ''), 'N/A') AS indicator_name,
     COALESCE(NULLIF(TRIM(category), ''), 'UNCATEGORIZED') AS category
-FROM {{ source('raw_db', 'dim_indicators') }}
+FROM {{ ref('snap_dim_indicators') }}
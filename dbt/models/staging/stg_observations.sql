@@ -5,7 +5,10 @@ SELECT
     fo.indicator_id,
     fo.location_id,
     fo.period_id,
-    fo.sex_id,
-    fo.value
-FROM {{ source('raw_db', 'fact_observations') }} fo
+    -- o schema raw compacto grava sexo ausente como 0 (chave primária não admite NULL)
+    NULLIF(fo.sex_id, 0) AS sex_id,
+    fo.value,
+    -- TEXT no SQLite raw, TIMESTAMP no Parquet
+    CAST(fo.updated_at AS TIMESTAMP) AS updated_at
+FROM {{ ref('snap_fact_observations') }} fo
 WHERE fo.value IS NOT NULL
@@ -2,5 +2,5 @@
 SELECT
     period_id,
     year
-FROM {{ source('raw_db', 'dim_periods') }}
+FROM {{ ref('snap_dim_periods') }}
 WHERE year IS NOT NULL
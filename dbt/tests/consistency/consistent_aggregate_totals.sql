@@ -0,0 +1,15 @@
+-- Teste de consistência: cada agregado do dashboard soma o mesmo total de observações do fct_observations
+-- (contagem da fato lida da auditoria audit_consistency, sem recontar)
+-- Falha se retornar linhas (algum agregado diverge da fato)
+
+WITH mart AS (SELECT mart_rows AS cnt FROM {{ ref('audit_consistency') }} WHERE layer = 'observations'),
+     aggs AS (
+         SELECT 'agg_obs_by_category' AS model, SUM(total) AS cnt FROM {{ ref('agg_obs_by_category') }}
+         UNION ALL SELECT 'agg_obs_by_indicator', SUM(total) FROM {{ ref('agg_obs_by_indicator') }}
+         UNION ALL SELECT 'agg_obs_by_sex', SUM(total) FROM {{ ref('agg_obs_by_sex') }}
+         UNION ALL SELECT 'agg_obs_by_location', SUM(total) FROM {{ ref('agg_obs_by_location') }}
+         UNION ALL SELECT 'agg_value_by_year_category', SUM(n_values) FROM {{ ref('agg_value_by_year_category') }}
+     )
+SELECT aggs.model || ' total mismatch' AS failure_reason,
+       mart.cnt AS mart_rows, aggs.cnt AS aggregate_rows
+FROM aggs, mart WHERE COALESCE(aggs.cnt, 0) != mart.cnt
@@ -0,0 +1,19 @@
+-- Teste de consistência cross-camada: lê a auditoria da execução (audit_consistency),
+-- que calcula contagens, chaves e órfãos de todas as camadas uma vez só.
+-- Falha se retornar linhas (alguma camada diverge)
+
+SELECT
+    layer || ' inconsistent' AS failure_reason,
+    staging_rows,
+    expected_mart_rows,
+    mart_rows,
+    duplicate_keys,
+    null_keys,
+    staging_value_sum,
+    mart_value_sum,
+    orphan_indicator_rows,
+    orphan_location_rows,
+    orphan_period_rows,
+    orphan_sex_rows
+FROM {{ ref('audit_consistency') }}
+WHERE status <> 'pass'
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""benchmark_dashboard.py — Compara os gráficos do dashboard lidos dos agregados agg_* vs direto na fato.
+
+Uso:
+    python3 scripts/benchmark_dashboard.py                            # 200k e 1M linhas sintéticas
+    python3 scripts/benchmark_dashboard.py --sizes 5000000 --repeat 10 --json
+
+Para cada tamanho gera um banco raw sintético (init_test_db), roda
+`dbt build --full-refresh` e mede, com a mediana de --repeat execuções, cada
+consulta de gráfico de dashboard/queries.py em duas versões: a do dashboard,
+que lê o agregado agg_*, e a de FACT_JOIN_QUERIES, que agrega o
+fct_observations com junção às dimensões. Também reporta o tempo que os
+agregados acrescentam ao build (run_results.json) e confere que as duas
+versões devolvem as mesmas linhas.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import duckdb
+
+from benchmark_pipeline import DBT_DIR, PROJECT_DIR, find_dbt
+from init_test_db import generate_database
+
+DEFAULT_SIZES = [200_000, 1_000_000]
+
+
+def median_time(con: duckdb.DuckDBPyConnection, sql: str, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = con.execute(sql).fetchall()
+        timings.append(time.perf_counter() - start)
+    # LIMIT sobre empates pode escolher linhas diferentes; compara o conjunto ordenado
+    normalized = sorted((tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows), key=repr)
+    return statistics.median(timings), normalized
+
+
+def run_size(dbt: str, n_rows: int, repeat: int, target: str, seed: int) -> dict:
+    sys.path.insert(0, os.path.join(PROJECT_DIR, "dashboard"))
+    from queries import DASHBOARD_QUERIES, FACT_JOIN_QUERIES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_db = os.path.join(tmp, "raw.db")
+        duckdb_path = os.path.join(tmp, "bench.duckdb")
+        conn = sqlite3.connect(raw_db)
+        try:
+            generate_database(conn, n_rows, 200, 194, 30, seed)
+        finally:
+            conn.close()
+        env = {**os.environ, "DBT_PROFILES_DIR": DBT_DIR, "DBT_RAW_FORMAT": "sqlite",
+               "DBT_RAW_DB": raw_db, "DBT_DUCKDB_PATH": duckdb_path}
+        result = subprocess.run([dbt, "build", "--full-refresh", "--target", target],
+                                cwd=DBT_DIR, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"dbt build falhou:\n{result.stdout[-2000:]}")
+        with open(os.path.join(DBT_DIR, "target", "run_results.json")) as f:
+            agg_build_s = sum(r["execution_time"] for r in json.load(f)["results"]
+                              if r["unique_id"].startswith("model.") and ".agg_" in r["unique_id"])
+
+        entry: dict = {"rows": n_rows, "agg_build_s": round(agg_build_s, 3), "queries": [], "same_output": True}
+        con = duckdb.connect(duckdb_path, read_only=True)
+        try:
+            for name, fact_sql in FACT_JOIN_QUERIES.items():
+                agg_s, agg_rows = median_time(con, DASHBOARD_QUERIES[name], repeat)
+                fact_s, fact_rows = median_time(con, fact_sql, repeat)
+                same = agg_rows == fact_rows
+                entry["same_output"] = entry["same_output"] and same
+                entry["queries"].append({"query": name, "aggregate_ms": round(agg_s * 1000, 2),
+                                         "fact_ms": round(fact_s * 1000, 2), "same_output": same})
+            entry["render_ms"] = round(sum(median_time(con, sql, repeat)[0] for sql in DASHBOARD_QUERIES.values())
+                                       * 1000, 2)
+        finally:
+            con.close()
+    return entry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do dashboard: agregados agg_* vs consultas na fato")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Linhas sintéticas na fato")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções de cada consulta")
+    parser.add_argument("--target", default=os.environ.get("DBT_TARGET", "dev"), help="Target do dbt")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        dbt = find_dbt()
+        results: List[Dict] = [run_size(dbt, n_rows, args.repeat, args.target, args.seed) for n_rows in args.sizes]
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    same_output = all(r["same_output"] for r in results)
+
+    if args.json:
+        print(json.dumps({"sizes": results, "same_output": same_output}, indent=2))
+    else:
+        print("=" * 64)
+        print(f"  Gráficos do dashboard: agregado vs fato (mediana de {args.repeat})")
+        print("=" * 64)
+        for r in results:
+            print(f"\n  Fato com {r['rows']:,} linhas — agregados somam {r['agg_build_s']:.2f}s ao build, "
+                  f"renderização completa {r['render_ms']:.1f}ms")
+            print(f"  {'consulta':<24} {'agregado':>10} {'fato':>10}")
+            for q in r["queries"]:
+                status = "" if q["same_output"] else "  ✗ resultados diferentes"
+                print(f"  {q['query']:<24} {q['aggregate_ms']:>8.2f}ms {q['fact_ms']:>8.2f}ms{status}")
+        print(f"\n  Mesmos resultados nas duas versões: {'sim' if same_output else 'NÃO'}")
+
+    if not same_output:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
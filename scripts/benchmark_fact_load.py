@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""benchmark_fact_load.py — Compara estratégias de carga da fact_observations.
+
+Uso:
+    python3 scripts/benchmark_fact_load.py                       # 1.000.000 linhas
+    python3 scripts/benchmark_fact_load.py --rows 200000 --json  # saída JSON
+
+As observações sintéticas chegam agrupadas por indicador, como na ingestão
+real. Estratégias (cada uma em um banco SQLite temporário novo, com o schema
+de init_test_db.py e um índice secundário na fato):
+    - row_by_row:          get_or_create_id + cursor.execute (upsert) por
+                           observação, commit único (loop original de populate_facts)
+    - bulk:                DimensionKeyCache + FactBulkLoader (executemany do
+                           upsert em lotes, commit por lote)
+    - bulk_ingest_profile: bulk + ingest_profile (WAL, synchronous=NORMAL,
+                           cache maior, índices adiados)
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Iterator, List, Tuple
+
+from init_test_db import create_tables
+from populate_database import (
+    FACT_INSERT_SQL,
+    DimensionKeyCache,
+    FactBulkLoader,
+    ParsedObservation,
+    get_or_create_id,
+    ingest_profile,
+)
+
+N_INDICATORS = 200
+N_LOCATIONS = 200
+FIRST_YEAR = 1975
+N_PERIODS = 50
+SEX_CODES = ["MLE", "FMLE", "BTSX"]
+
+
+def synthetic_indicators(n_rows: int, seed: int = 42) -> Iterator[Tuple[int, List[ParsedObservation]]]:
+    """Distribui n_rows observações determinísticas entre os indicadores (indicator_id, observações).
+
+    Dentro de cada indicador as chaves (local, ano, sexo) são únicas, como no payload da API,
+    para que o upsert pela chave natural grave exatamente n_rows linhas.
+    """
+    rng = random.Random(seed)
+    combos = N_LOCATIONS * N_PERIODS * len(SEX_CODES)
+    per_indicator = min(-(-n_rows // N_INDICATORS), combos)
+    remaining = n_rows
+    indicator_id = 0
+    while remaining > 0:
+        indicator_id += 1
+        size = min(per_indicator, remaining)
+        remaining -= size
+        rows: List[ParsedObservation] = []
+        for key in rng.sample(range(combos), size):
+            location, rest = divmod(key, N_PERIODS * len(SEX_CODES))
+            period, sex = divmod(rest, len(SEX_CODES))
+            rows.append((f"L{location:03d}", FIRST_YEAR + period, SEX_CODES[sex], rng.uniform(0, 500)))
+        yield indicator_id, rows
+
+
+def prepare_db(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    create_tables(cursor)
+    cursor.executemany(
+        "INSERT INTO dim_indicators (indicator_code, category) VALUES (?, ?)",
+        [(f"IND{i:04d}", "BENCH") for i in range(N_INDICATORS)],
+    )
+    cursor.executemany(
+        "INSERT INTO dim_sex (sex_code) VALUES (?)", [(code,) for code in SEX_CODES]
+    )
+    # Índice secundário típico de lookup, para medir o efeito de adiar sua construção
+    cursor.execute(
+        "CREATE INDEX idx_bench_fact_lookup "
+        "ON fact_observations (indicator_id, location_id, period_id, sex_id)"
+    )
+    conn.commit()
+    return conn
+
+
+def load_row_by_row(conn: sqlite3.Connection, n_rows: int, batch_size: int) -> None:
+    cursor = conn.cursor()
+    for indicator_id, rows in synthetic_indicators(n_rows):
+        for country_code, year, sex_code, value in rows:
+            sex_id = get_or_create_id(cursor, "dim_sex", "sex_id", "sex_code", sex_code)
+            location_id = get_or_create_id(cursor, "dim_locations", "location_id", "country_code", country_code)
+            period_id = get_or_create_id(cursor, "dim_periods", "period_id", "year", year)
+            cursor.execute(FACT_INSERT_SQL, (indicator_id, location_id, period_id, sex_id, value))
+    conn.commit()
+
+
+def _load_bulk(conn: sqlite3.Connection, n_rows: int, batch_size: int) -> None:
+    keys = DimensionKeyCache(conn.cursor())
+    loader = FactBulkLoader(conn, batch_size)
+    for indicator_id, rows in synthetic_indicators(n_rows):
+        loader.add(indicator_id, keys.resolve(rows))
+    loader.flush()
+
+
+def load_bulk(conn: sqlite3.Connection, n_rows: int, batch_size: int) -> None:
+    _load_bulk(conn, n_rows, batch_size)
+
+
+def load_bulk_ingest_profile(conn: sqlite3.Connection, n_rows: int, batch_size: int) -> None:
+    with ingest_profile(conn):
+        _load_bulk(conn, n_rows, batch_size)
+
+
+STRATEGIES: List[Tuple[str, Callable[[sqlite3.Connection, int, int], None]]] = [
+    ("row_by_row", load_row_by_row),
+    ("bulk", load_bulk),
+    ("bulk_ingest_profile", load_bulk_ingest_profile),
+]
+
+
+def run(n_rows: int, batch_size: int) -> dict:
+    results = {"rows": n_rows, "batch_size": batch_size, "strategies": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, loader in STRATEGIES:
+            db_path = os.path.join(tmp, f"{name}.db")
+            conn = prepare_db(db_path)
+            start = time.perf_counter()
+            loader(conn, n_rows, batch_size)  # a geração dos dados entra no tempo de todas as estratégias
+            elapsed = time.perf_counter() - start
+            count = conn.execute("SELECT COUNT(*) FROM fact_observations").fetchone()[0]
+            conn.close()
+            results["strategies"].append(
+                {
+                    "name": name,
+                    "elapsed_s": round(elapsed, 3),
+                    "rows_per_s": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+                    "rows_loaded": count,
+                }
+            )
+    baseline = results["strategies"][0]["rows_per_s"]
+    for entry in results["strategies"]:
+        entry["speedup"] = round(entry["rows_per_s"] / baseline, 2) if baseline else None
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de carga da fact_observations")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas sintéticas")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Linhas por lote")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run(args.rows, args.batch_size)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("=" * 60)
+        print(f"  Benchmark de carga — {results['rows']:,} linhas (lote={results['batch_size']:,})")
+        print("=" * 60)
+        for entry in results["strategies"]:
+            print(
+                f"  {entry['name']:<22} {entry['elapsed_s']:>8.2f}s  "
+                f"{entry['rows_per_s']:>12,.0f} linhas/s  ({entry['speedup']}x)"
+            )
+
+    if any(e["rows_loaded"] != args.rows for e in results["strategies"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
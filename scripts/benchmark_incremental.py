@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""benchmark_incremental.py — Mede o fct_observations incremental: tempo vs tamanho do delta.
+
+Uso:
+    python3 scripts/benchmark_incremental.py                                  # 200k e 1M linhas
+    python3 scripts/benchmark_incremental.py --sizes 1000000 --deltas 1000 50000 --json
+
+Para cada tamanho gera um banco raw sintético (init_test_db), roda
+`dbt run --select +fct_observations --full-refresh` e, para cada delta,
+aplica na fonte delta observações pelo upsert da ingestão (FactBulkLoader),
+metade novas (indicadores novos) e metade com valor alterado, e roda
+`dbt run --select +fct_observations` (snapshot da fonte e fct incremental). Ao final de cada passo
+o fct_observations deve ter as mesmas linhas e a mesma soma de valores da
+fonte. O tempo incremental deve acompanhar o delta, não o tamanho da tabela.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import duckdb
+
+from benchmark_pipeline import DBT_DIR, find_dbt
+from init_test_db import generate_database
+from populate_database import FactBulkLoader
+
+DEFAULT_SIZES = [200_000, 1_000_000]
+DEFAULT_DELTAS = [1_000, 10_000, 100_000]
+
+
+def run_dbt(dbt: str, args: List[str], env: Dict[str, str]) -> float:
+    start = time.perf_counter()
+    result = subprocess.run([dbt, *args], cwd=DBT_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"dbt {' '.join(args)} falhou:\n{result.stdout[-2000:]}")
+    return elapsed
+
+
+def apply_delta(conn: sqlite3.Connection, delta: int, step: int, rng: random.Random) -> None:
+    """Grava delta observações na fonte: metade em indicadores novos, metade alterando valores existentes."""
+    location_ids = [row[0] for row in conn.execute("SELECT location_id FROM dim_locations")]
+    period_ids = [row[0] for row in conn.execute("SELECT period_id FROM dim_periods")]
+    sex_ids = [row[0] for row in conn.execute("SELECT sex_id FROM dim_sex")]
+    keys = [(location_id, period_id, sex_id) for location_id in location_ids
+            for period_id in period_ids for sex_id in sex_ids]
+    loader = FactBulkLoader(conn)
+    remaining = delta // 2
+    part = 0
+    while remaining > 0:
+        indicator_id = conn.execute(
+            "INSERT INTO dim_indicators (indicator_code, indicator_name, category) VALUES (?, ?, 'NCD')",
+            (f"NCD_DELTA{step:03d}_{part:03d}", f"Delta indicator {step}.{part}"),
+        ).lastrowid
+        count = min(remaining, len(keys))
+        loader.add(indicator_id, [(l, p, s, round(rng.uniform(0, 500), 3)) for l, p, s in rng.sample(keys, count)])
+        remaining -= count
+        part += 1
+    loader.flush()
+    changed = conn.execute(
+        "SELECT indicator_id, location_id, period_id, NULLIF(sex_id, 0), value FROM fact_observations "
+        "ORDER BY RANDOM() LIMIT ?",
+        (delta - delta // 2,),
+    ).fetchall()
+    for indicator_id, location_id, period_id, sex_id, value in changed:
+        loader.add(indicator_id, [(location_id, period_id, sex_id, round(value + 1.0, 3))])
+    loader.flush()
+
+
+def fingerprints(raw_db: str, duckdb_path: str) -> Dict[str, tuple]:
+    con = duckdb.connect(duckdb_path, read_only=True)
+    try:
+        con.execute(f"ATTACH '{raw_db}' AS raw_db (TYPE SQLITE, READ_ONLY)")
+        query = "SELECT COUNT(*), SUM(CAST(value AS DECIMAL(18, 3))) FROM {} WHERE value IS NOT NULL"
+        return {
+            "source": con.execute(query.format("raw_db.fact_observations")).fetchone(),
+            "fct": con.execute(query.format("main.fct_observations")).fetchone(),
+        }
+    finally:
+        con.close()
+
+
+def run_size(dbt: str, n_rows: int, deltas: List[int], target: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    result: dict = {"rows": n_rows, "runs": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_db = os.path.join(tmp, "raw.db")
+        duckdb_path = os.path.join(tmp, "bench.duckdb")
+        conn = sqlite3.connect(raw_db)
+        generate_database(conn, n_rows, 200, 194, 30, seed)
+        env = {**os.environ, "DBT_PROFILES_DIR": DBT_DIR, "DBT_RAW_FORMAT": "sqlite",
+               "DBT_RAW_DB": raw_db, "DBT_DUCKDB_PATH": duckdb_path}
+        try:
+            elapsed = run_dbt(dbt, ["run", "--select", "+fct_observations", "--full-refresh", "--target", target], env)
+            result["runs"].append({"mode": "full-refresh", "delta": n_rows, "elapsed_s": round(elapsed, 3)})
+            for step, delta in enumerate(deltas):
+                apply_delta(conn, delta, step, rng)
+                elapsed = run_dbt(dbt, ["run", "--select", "+fct_observations", "--target", target], env)
+                check = fingerprints(raw_db, duckdb_path)
+                result["runs"].append({"mode": "incremental", "delta": delta, "elapsed_s": round(elapsed, 3),
+                                       "consistent": check["source"] == check["fct"]})
+        finally:
+            conn.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do fct_observations incremental (tempo vs delta)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Linhas da fonte")
+    parser.add_argument("--deltas", type=int, nargs="+", default=DEFAULT_DELTAS, help="Observações por delta")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--target", default=os.environ.get("DBT_TARGET", "dev"), help="Target do dbt")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        dbt = find_dbt()
+        results = [run_size(dbt, n_rows, args.deltas, args.target, args.seed) for n_rows in args.sizes]
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    consistent = all(run.get("consistent", True) for r in results for run in r["runs"])
+
+    if args.json:
+        print(json.dumps({"sizes": results, "consistent": consistent}, indent=2))
+    else:
+        print("=" * 60)
+        print("  fct_observations: full-refresh vs incremental por delta")
+        print("=" * 60)
+        for r in results:
+            print(f"\n  Fonte com {r['rows']:,} linhas")
+            for run in r["runs"]:
+                status = "" if run.get("consistent", True) else "  ✗ divergente da fonte"
+                print(f"  {run['mode']:<13} {run['delta']:>10,} linhas  {run['elapsed_s']:>7.2f}s{status}")
+        print(f"\n  fct_observations igual à fonte após cada delta: {'sim' if consistent else 'NÃO'}")
+
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
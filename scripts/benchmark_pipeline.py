@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""benchmark_pipeline.py — Benchmark ponta a ponta do pipeline OMS, com baseline armazenado.
+
+Uso:
+    python3 scripts/benchmark_pipeline.py                          # 10k e 100k linhas, compara com o baseline
+    python3 scripts/benchmark_pipeline.py --sizes 1000000 --json
+    python3 scripts/benchmark_pipeline.py --update-baseline        # grava benchmarks/baseline.json
+    python3 scripts/benchmark_pipeline.py --threshold 0.3          # regressão = 30% mais lento/maior
+
+Para cada tamanho, em um diretório temporário:
+    - ingest:      populate_database.py --async contra o stub local da API
+                   (gho_api_stub.py), com o cache HTTP desligado
+    - dbt_build:   dbt build --full-refresh sobre um banco raw sintético do
+                   mesmo tamanho (init_test_db.py --rows)
+    - contracts:   data_contracts.py --json
+    - reconcile:   reconciliation.py --json
+    - health:      health_check.py --json
+    - dashboard:   as consultas de dashboard/queries.py sobre o DuckDB do build
+
+Cada etapa roda em um processo próprio; são registrados o tempo de parede, o
+pico de memória (RSS máximo do processo) e linhas/s. O resultado vai para
+benchmarks/results/<timestamp>.json e é comparado com benchmarks/baseline.json:
+etapas mais lentas ou com pico de memória acima de --threshold (e acima de
+um mínimo absoluto, para ignorar ruído em etapas curtas) são regressões e o
+script termina com exit 1.
+
+O próprio harness só importa a biblioteca padrão (e sqlite3/init_test_db):
+no Linux o RSS máximo de um filho herda o do pai no fork, então um pai
+carregado com duckdb/pyarrow inflaria o pico medido de todas as etapas.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPTS_DIR = os.path.join(PROJECT_DIR, "scripts")
+DBT_DIR = os.path.join(PROJECT_DIR, "dbt")
+BENCH_DIR = os.path.join(PROJECT_DIR, "benchmarks")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.2"))
+# Diferenças absolutas abaixo destes mínimos nunca contam como regressão (ruído)
+MIN_DELTA_S = 0.5
+MIN_DELTA_RSS_MB = 20.0
+STUB_ROWS_PER_INDICATOR = 1_000
+STAGES = ["ingest", "dbt_build", "contracts", "reconcile", "health", "dashboard"]
+
+
+def find_dbt() -> str:
+    """Executável do dbt: $DBT_BIN, o do PATH ou o do venv do projeto."""
+    candidates = [os.environ.get("DBT_BIN"), shutil.which("dbt"), os.path.join(PROJECT_DIR, "venv", "bin", "dbt")]
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate):
+            return candidate
+    raise FileNotFoundError("dbt não encontrado; defina DBT_BIN ou rode make setup")
+
+
+def run_stage(cmd: List[str], env: Dict[str, str], cwd: str, log_path: str) -> Tuple[float, float, int]:
+    """Executa uma etapa em um processo filho.
+
+    Retorna:
+        Tuple[float, float, int]: (tempo de parede em s, pico de RSS em MB, código de saída).
+    """
+    with open(log_path, "wb") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 devolve o rusage deste filho (ru_maxrss em KB no Linux)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return elapsed, usage.ru_maxrss / 1024, process.returncode
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"stub da API não respondeu na porta {port}")
+
+
+def prepare_ingest(work_dir: str, n_rows: int) -> Tuple[str, str]:
+    """Banco raw vazio + CSV de indicadores para que a ingestão do stub produza ~n_rows linhas."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    from init_test_db import create_tables
+    import sqlite3
+
+    db_path = os.path.join(work_dir, "ingest.db")
+    conn = sqlite3.connect(db_path)
+    create_tables(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    indicators_path = os.path.join(work_dir, "indicators.csv")
+    with open(indicators_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["IndicatorCode", "IndicatorName", "Language", "Category"])
+        for i in range(max(1, n_rows // STUB_ROWS_PER_INDICATOR)):
+            writer.writerow([f"BENCH_{i:05d}", f"Benchmark indicator {i}", "EN", "BENCH"])
+    return db_path, indicators_path
+
+
+def run_dashboard_queries(duckdb_path: str) -> None:
+    """Executado como etapa 'dashboard': roda todas as consultas do dashboard uma vez."""
+    import duckdb
+
+    sys.path.insert(0, os.path.join(PROJECT_DIR, "dashboard"))
+    from queries import DASHBOARD_QUERIES
+
+    con = duckdb.connect(duckdb_path, read_only=True)
+    try:
+        for sql in DASHBOARD_QUERIES.values():
+            con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+def benchmark_size(n_rows: int, dbt: str, target: str) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    python = sys.executable
+    with tempfile.TemporaryDirectory(prefix="oms_bench_") as tmp:
+        def record(stage: str, cmd: List[str], env: Dict[str, str], cwd: str, rows: int) -> None:
+            elapsed, rss_mb, code = run_stage(cmd, env, cwd, os.path.join(tmp, f"{stage}.log"))
+            results[stage] = {
+                "wall_s": round(elapsed, 3),
+                "peak_rss_mb": round(rss_mb, 1),
+                "rows": rows,
+                "rows_per_s": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+                "ok": code == 0,
+            }
+            if code != 0:
+                with open(os.path.join(tmp, f"{stage}.log"), encoding="utf-8", errors="replace") as f:
+                    results[stage]["error"] = f.read()[-1500:]
+
+        # ingest: stub local → populate_database --async
+        ingest_db, indicators_path = prepare_ingest(tmp, n_rows)
+        port = free_port()
+        stub = subprocess.Popen(
+            [python, os.path.join(SCRIPTS_DIR, "gho_api_stub.py"), "--port", str(port),
+             "--rows", str(min(n_rows, STUB_ROWS_PER_INDICATOR))],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            env = {**os.environ, "DBT_RAW_DB": ingest_db, "GHO_API_URL": f"http://127.0.0.1:{port}/api/",
+                   "GHO_CACHE_DISABLE": "1"}
+            record("ingest", [python, os.path.join(SCRIPTS_DIR, "populate_database.py"), "--category", "BENCH",
+                              "--async", "--concurrency", "16", "--rate-limit", "0",
+                              "--indicators-file", indicators_path], env, tmp, n_rows)
+        finally:
+            stub.terminate()
+            stub.wait()
+
+        # demais etapas: banco raw sintético do mesmo tamanho
+        raw_db = os.path.join(tmp, "raw.db")
+        duckdb_path = os.path.join(tmp, "bench.duckdb")
+        subprocess.run([python, os.path.join(SCRIPTS_DIR, "init_test_db.py"), "--db-path", raw_db,
+                        "--rows", str(n_rows), "--indicators", str(max(1, n_rows // 10_000) + 20)],
+                       check=True, stdout=subprocess.DEVNULL)
+        env = {**os.environ, "DBT_RAW_DB": raw_db, "DBT_DUCKDB_PATH": duckdb_path,
+               "DBT_PROFILES_DIR": DBT_DIR, "DBT_RAW_FORMAT": "sqlite"}
+        record("dbt_build", [dbt, "build", "--full-refresh", "--target", target], env, DBT_DIR, n_rows)
+        for stage, script in (("contracts", "data_contracts.py"), ("reconcile", "reconciliation.py"),
+                              ("health", "health_check.py")):
+            record(stage, [python, os.path.join(SCRIPTS_DIR, script), "--json"], env, PROJECT_DIR, n_rows)
+        record("dashboard", [python, os.path.abspath(__file__), "--dashboard-queries", duckdb_path],
+               env, PROJECT_DIR, n_rows)
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Etapas cujo tempo ou pico de memória passou do baseline em mais de threshold."""
+    regressions: List[dict] = []
+    for size, stages in current["results"].items():
+        for stage, entry in stages.items():
+            reference = baseline.get("results", {}).get(size, {}).get(stage)
+            if not reference or not reference.get("ok") or not entry.get("ok"):
+                continue
+            for metric, min_delta in (("wall_s", MIN_DELTA_S), ("peak_rss_mb", MIN_DELTA_RSS_MB)):
+                before, after = reference[metric], entry[metric]
+                if before > 0 and after > before * (1 + threshold) and after - before > min_delta:
+                    regressions.append({"size": size, "stage": stage, "metric": metric,
+                                        "baseline": before, "current": after,
+                                        "change_pct": round((after / before - 1) * 100, 1)})
+    return regressions
+
+
+def format_report(report: dict, baseline: Optional[dict]) -> str:
+    lines = ["=" * 72, f"  Benchmark do pipeline — {report['created_at']}", "=" * 72]
+    for size, stages in report["results"].items():
+        lines.append(f"\n  {int(size):,} linhas")
+        lines.append(f"  {'etapa':<11} {'tempo':>9} {'Δ base':>8} {'pico RSS':>10} {'linhas/s':>14}")
+        for stage in STAGES:
+            entry = stages.get(stage)
+            if entry is None:
+                continue
+            reference = (baseline or {}).get("results", {}).get(size, {}).get(stage)
+            delta = (f"{(entry['wall_s'] / reference['wall_s'] - 1) * 100:+.0f}%"
+                     if reference and reference.get("wall_s") else "—")
+            status = "" if entry["ok"] else "  ✗ falhou"
+            lines.append(f"  {stage:<11} {entry['wall_s']:>8.2f}s {delta:>8} {entry['peak_rss_mb']:>8.1f}MB "
+                         f"{entry['rows_per_s']:>14,.0f}{status}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do pipeline OMS")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Tamanhos (linhas na fato)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Aumento relativo que conta como regressão (default: 0.2 = 20%%; env BENCH_THRESHOLD)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Arquivo de baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Grava este resultado como novo baseline")
+    parser.add_argument("--target", default=os.environ.get("DBT_TARGET", "dev"), help="Target do dbt")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    parser.add_argument("--dashboard-queries", metavar="DUCKDB_PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.dashboard_queries:
+        run_dashboard_queries(args.dashboard_queries)
+        return
+
+    try:
+        dbt = find_dbt()
+    except FileNotFoundError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpus": os.cpu_count()},
+        "results": {str(size): benchmark_size(size, dbt, args.target) for size in args.sizes},
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result_path = os.path.join(RESULTS_DIR, f"{report['created_at'].replace(':', '')}.json")
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline: Optional[dict] = None
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold) if baseline else []
+    failed = [f"{size}/{stage}" for size, stages in report["results"].items()
+              for stage, entry in stages.items() if not entry["ok"]]
+
+    if args.json:
+        print(json.dumps({**report, "regressions": regressions, "failed": failed}, indent=2))
+    else:
+        print(format_report(report, baseline))
+        print(f"\n✓ Resultado: {result_path}")
+        if baseline is None:
+            print(f"  Sem baseline em {args.baseline}; grave um com --update-baseline (make bench-baseline).")
+        for reg in regressions:
+            print(f"✗ Regressão {reg['size']}/{reg['stage']} {reg['metric']}: "
+                  f"{reg['baseline']} → {reg['current']} ({reg['change_pct']:+}%)")
+        for name in failed:
+            print(f"✗ Etapa falhou: {name}")
+
+    if args.update_baseline and not failed:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        if not args.json:
+            print(f"✓ Baseline atualizado: {args.baseline}")
+    elif regressions or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""benchmark_raw_layout.py — Compara o `dbt build` com a camada raw em SQLite e em Parquet.
+
+Uso:
+    python3 scripts/benchmark_raw_layout.py                             # 1.000.000 linhas sintéticas
+    python3 scripts/benchmark_raw_layout.py --rows 200000 --repeat 3 --json
+    python3 scripts/benchmark_raw_layout.py --db-path database/who_gho.db   # banco raw existente
+
+Gera um banco SQLite raw sintético (mesmos dados de benchmark_fact_load.py)
+ou usa o informado, exporta-o para o layout Parquet de ingest_parquet.py e
+roda `dbt build --full-refresh` --repeat vezes para cada layout
+(DBT_RAW_FORMAT=sqlite e DBT_RAW_FORMAT=parquet), cada um com o seu DuckDB
+temporário. Reporta o tempo mediano de cada layout e confere que os dois
+builds produzem o mesmo fct_observations.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import duckdb
+
+from benchmark_fact_load import _load_bulk, prepare_db
+from benchmark_pipeline import find_dbt
+from ingest_parquet import export_sqlite
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DBT_DIR = os.path.join(PROJECT_DIR, "dbt")
+LAYOUTS = ["sqlite", "parquet"]
+
+
+def build_synthetic_db(db_path: str, n_rows: int, batch_size: int = 10_000) -> None:
+    conn = prepare_db(db_path)
+    try:
+        _load_bulk(conn, n_rows, batch_size)
+    finally:
+        conn.close()
+
+
+def fact_fingerprint(duckdb_path: str) -> Dict[str, float]:
+    con = duckdb.connect(duckdb_path, read_only=True)
+    try:
+        # Soma em DECIMAL: exata, independente da ordem de leitura de cada layout
+        rows, total = con.execute(
+            "SELECT COUNT(*), SUM(CAST(value AS DECIMAL(18, 6))) FROM main.fct_observations"
+        ).fetchone()
+    finally:
+        con.close()
+    return {"fct_rows": rows, "fct_value_sum": float(total or 0)}
+
+
+def run_layout(layout: str, dbt: str, db_path: str, parquet_dir: str, work_dir: str,
+               repeat: int, target: str) -> dict:
+    duckdb_path = os.path.join(work_dir, f"bench_{layout}.duckdb")
+    env = {
+        **os.environ,
+        "DBT_PROFILES_DIR": DBT_DIR,
+        "DBT_RAW_FORMAT": layout,
+        "DBT_RAW_DB": db_path,
+        "DBT_RAW_PARQUET_DIR": parquet_dir,
+        "DBT_DUCKDB_PATH": duckdb_path,
+    }
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [dbt, "build", "--full-refresh", "--target", target],
+            cwd=DBT_DIR, env=env, capture_output=True, text=True,
+        )
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"dbt build falhou no layout {layout}:\n{result.stdout[-2000:]}")
+    return {
+        "layout": layout,
+        "runs_s": [round(t, 3) for t in timings],
+        "median_s": round(statistics.median(timings), 3),
+        "min_s": round(min(timings), 3),
+        **fact_fingerprint(duckdb_path),
+    }
+
+
+def run(n_rows: int, db_path: str, repeat: int, target: str) -> dict:
+    dbt = find_dbt()
+    results: dict = {"repeat": repeat, "target": target, "layouts": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        if db_path:
+            db_path = os.path.abspath(db_path)
+        else:
+            db_path = os.path.join(tmp, "raw.db")
+            build_synthetic_db(db_path, n_rows)
+        parquet_dir = os.path.join(tmp, "parquet")
+        results["raw_tables"] = export_sqlite(db_path, parquet_dir)
+        results["sqlite_mb"] = round(os.path.getsize(db_path) / (1024 * 1024), 2)
+        results["parquet_mb"] = round(
+            sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(parquet_dir) for name in names)
+            / (1024 * 1024), 2)
+        for layout in LAYOUTS:
+            results["layouts"].append(run_layout(layout, dbt, db_path, parquet_dir, tmp, repeat, target))
+
+    baseline = results["layouts"][0]["median_s"]
+    for entry in results["layouts"]:
+        entry["speedup"] = round(baseline / entry["median_s"], 2) if entry["median_s"] else None
+    first = results["layouts"][0]
+    results["same_output"] = all(
+        (e["fct_rows"], e["fct_value_sum"]) == (first["fct_rows"], first["fct_value_sum"]) for e in results["layouts"]
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do dbt build: camada raw SQLite vs Parquet")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas sintéticas (ignorado com --db-path)")
+    parser.add_argument("--db-path", default=None, help="Banco SQLite raw existente em vez do sintético")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções do dbt build por layout")
+    parser.add_argument("--target", default=os.environ.get("DBT_TARGET", "dev"), help="Target do dbt")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        results = run(args.rows, args.db_path, args.repeat, args.target)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        fact_rows = results["raw_tables"]["fact_observations"]
+        print("=" * 60)
+        print(f"  dbt build por layout raw — {fact_rows:,} observações (mediana de {args.repeat})")
+        print(f"  SQLite: {results['sqlite_mb']} MB  |  Parquet: {results['parquet_mb']} MB")
+        print("=" * 60)
+        for entry in results["layouts"]:
+            print(f"  {entry['layout']:<10} {entry['median_s']:>8.2f}s  (min {entry['min_s']:.2f}s)  ({entry['speedup']}x)")
+        print(f"  Mesmo fct_observations nos dois layouts: {'sim' if results['same_output'] else 'NÃO'}")
+
+    if not results["same_output"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""benchmark_raw_schema.py — Compara as variantes de schema do banco raw: padrão vs compacto.
+
+Uso:
+    python3 scripts/benchmark_raw_schema.py                       # 1.000.000 linhas sintéticas
+    python3 scripts/benchmark_raw_schema.py --rows 5000000 --repeat 5 --json
+
+Para cada variante de create_database.SCHEMA_VARIANTS gera o mesmo banco
+sintético (init_test_db, mesma --seed) e mede:
+    - carga:      linhas/s da geração (inserção em lote, índices construídos ao final)
+    - recarga:    linhas/s do upsert de FactBulkLoader sobre chaves já existentes
+    - tamanho:    arquivo e páginas da fato + índices da fato (dbstat)
+    - varreduras: soma da fato inteira no SQLite, soma por indicador (uma consulta por
+                  indicador, pela chave natural) e leitura completa via sqlite_scan do
+                  DuckDB, o caminho do dbt (mediana de --repeat execuções)
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+from create_database import SCHEMA_VARIANTS
+from init_test_db import generate_database
+
+RELOAD_ROWS = 100_000
+
+
+def median_time(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def fact_pages_mb(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Tamanho em MB da fato e de cada índice dela, pelas páginas do dbstat."""
+    rows = conn.execute("""
+        SELECT s.name, SUM(s.pgsize)
+        FROM dbstat s JOIN sqlite_master m ON m.name = s.name
+        WHERE m.tbl_name = 'fact_observations'
+        GROUP BY s.name
+    """).fetchall()
+    return {name: round(size / (1024 * 1024), 2) for name, size in rows}
+
+
+def reload_rows(conn: sqlite3.Connection, n_rows: int) -> float:
+    """Recarrega n_rows observações existentes (novo valor) pelo upsert da ingestão; retorna linhas/s."""
+    from populate_database import FactBulkLoader
+
+    rows = conn.execute(
+        "SELECT indicator_id, location_id, period_id, NULLIF(sex_id, 0), value * 1.01 FROM fact_observations LIMIT ?",
+        (n_rows,),
+    ).fetchall()
+    loader = FactBulkLoader(conn)
+    start = time.perf_counter()
+    for indicator_id, location_id, period_id, sex_id, value in rows:
+        loader.add(indicator_id, [(location_id, period_id, sex_id, value)])
+    loader.flush()
+    elapsed = time.perf_counter() - start
+    return round(len(rows) / elapsed, 1) if elapsed > 0 else 0.0
+
+
+def run_variant(variant: str, work_dir: str, n_rows: int, indicators: int, seed: int, repeat: int) -> dict:
+    import duckdb
+
+    db_path = os.path.join(work_dir, f"raw_{variant}.db")
+    conn = sqlite3.connect(db_path)
+    try:
+        stats = generate_database(conn, n_rows, indicators, 194, 30, seed, variant=variant)
+        conn.execute("VACUUM")
+        result = {
+            "variant": variant,
+            "load_rows_per_s": stats["rows_per_s"],
+            "file_mb": round(os.path.getsize(db_path) / (1024 * 1024), 2),
+            "fact_objects_mb": fact_pages_mb(conn),
+        }
+        result["fact_total_mb"] = round(sum(result["fact_objects_mb"].values()), 2)
+        indicator_ids = [row[0] for row in conn.execute("SELECT indicator_id FROM dim_indicators")]
+        result["full_scan_s"] = round(median_time(
+            lambda: conn.execute("SELECT COUNT(*), SUM(value) FROM fact_observations").fetchone(), repeat), 4)
+        result["per_indicator_s"] = round(median_time(
+            lambda: [conn.execute("SELECT SUM(value) FROM fact_observations WHERE indicator_id = ?", (i,)).fetchone()
+                     for i in indicator_ids], repeat), 4)
+        result["reload_rows_per_s"] = reload_rows(conn, min(RELOAD_ROWS, n_rows))
+    finally:
+        conn.close()
+
+    con = duckdb.connect()
+    try:
+        con.execute("LOAD sqlite")
+        result["duckdb_scan_s"] = round(median_time(
+            lambda: con.execute(
+                f"SELECT COUNT(*), SUM(value) FROM sqlite_scan('{db_path}', 'fact_observations')"
+            ).fetchone(), repeat), 4)
+        result["fact_rows"], result["value_sum"] = con.execute(
+            f"SELECT COUNT(*), ROUND(SUM(value), 3) FROM sqlite_scan('{db_path}', 'fact_observations')"
+        ).fetchone()
+    finally:
+        con.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do banco raw: schema padrão vs compacto")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas sintéticas na fato")
+    parser.add_argument("--indicators", type=int, default=200, help="Indicadores sintéticos")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções de cada varredura")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_variant(variant, tmp, args.rows, args.indicators, args.seed, args.repeat)
+                   for variant in SCHEMA_VARIANTS]
+    same_output = len({(r["fact_rows"], r["value_sum"]) for r in results}) == 1
+
+    if args.json:
+        print(json.dumps({"rows": args.rows, "variants": results, "same_output": same_output}, indent=2))
+    else:
+        base = results[0]
+        print("=" * 72)
+        print(f"  Banco raw por variante de schema — {args.rows:,} observações (mediana de {args.repeat})")
+        print("=" * 72)
+        print(f"  {'variante':<10} {'arquivo':>9} {'fato+idx':>9} {'carga/s':>10} {'recarga/s':>10} "
+              f"{'scan':>8} {'por ind.':>9} {'duckdb':>8}")
+        for r in results:
+            print(f"  {r['variant']:<10} {r['file_mb']:>7.1f}MB {r['fact_total_mb']:>7.1f}MB "
+                  f"{r['load_rows_per_s']:>10,.0f} {r['reload_rows_per_s']:>10,.0f} "
+                  f"{r['full_scan_s']:>7.3f}s {r['per_indicator_s']:>8.3f}s {r['duckdb_scan_s']:>7.3f}s")
+        for r in results[1:]:
+            print(f"  {r['variant']} vs {base['variant']}: arquivo {(r['file_mb'] / base['file_mb'] - 1) * 100:+.0f}%, "
+                  f"scan DuckDB {(r['duckdb_scan_s'] / base['duckdb_scan_s'] - 1) * 100:+.0f}%")
+        print(f"  Mesmos dados nas variantes: {'sim' if same_output else 'NÃO'}")
+
+    if not same_output:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""benchmark_surrogate_keys.py — Compara as chaves surrogate dos marts: inteiro de 64 bits vs MD5.
+
+Uso:
+    python3 scripts/benchmark_surrogate_keys.py                       # 1.000.000 linhas sintéticas
+    python3 scripts/benchmark_surrogate_keys.py --rows 5000000 --repeat 5 --json
+
+Gera um banco raw sintético (init_test_db) e roda `dbt build --full-refresh`
+uma vez para cada estratégia da macro surrogate_key (DBT_SURROGATE_KEY=md5,
+as chaves VARCHAR de dbt_utils.generate_surrogate_key, e int64, o hash()
+UBIGINT do DuckDB), cada uma com o seu DuckDB temporário. Mede:
+    - build:    tempo de execução do fct_observations e das dimensões (run_results.json)
+    - tamanho:  fct_observations inteiro e só as colunas *_key, copiados para um
+                arquivo DuckDB novo
+    - junções:  consultas dos gráficos do dashboard calculadas direto na fato
+                (FACT_JOIN_QUERIES de dashboard/queries.py), que ligam fato e
+                dimensões pelas chaves (mediana de --repeat execuções)
+As duas estratégias devem produzir os mesmos resultados nas consultas.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+import duckdb
+
+from benchmark_pipeline import DBT_DIR, PROJECT_DIR, find_dbt
+from init_test_db import generate_database
+
+STRATEGIES = ["md5", "int64"]
+KEY_COLUMNS = ["observation_key", "indicator_key", "location_key", "period_key", "sex_key"]
+
+
+def model_timings(run_results_path: str) -> Dict[str, float]:
+    with open(run_results_path) as f:
+        results = json.load(f)["results"]
+    return {r["unique_id"].split(".")[-1]: r["execution_time"] for r in results
+            if r["unique_id"].startswith("model.")}
+
+
+def copy_size_mb(con: duckdb.DuckDBPyConnection, work_dir: str, name: str, columns: str) -> float:
+    """Tamanho em MB de um arquivo DuckDB novo contendo só as colunas pedidas do fct_observations."""
+    path = os.path.join(work_dir, f"{name}.duckdb")
+    con.execute(f"ATTACH '{path}' AS size_probe")
+    try:
+        con.execute(f"CREATE TABLE size_probe.fct AS SELECT {columns} FROM main.fct_observations")
+        con.execute("CHECKPOINT size_probe")
+    finally:
+        con.execute("DETACH size_probe")
+    size = os.path.getsize(path)
+    os.remove(path)
+    return round(size / (1024 * 1024), 2)
+
+
+def run_strategy(strategy: str, dbt: str, raw_db: str, work_dir: str, repeat: int, target: str) -> dict:
+    sys.path.insert(0, os.path.join(PROJECT_DIR, "dashboard"))
+    from queries import FACT_JOIN_QUERIES
+
+    duckdb_path = os.path.join(work_dir, f"bench_{strategy}.duckdb")
+    env = {**os.environ, "DBT_PROFILES_DIR": DBT_DIR, "DBT_RAW_FORMAT": "sqlite", "DBT_RAW_DB": raw_db,
+           "DBT_DUCKDB_PATH": duckdb_path, "DBT_SURROGATE_KEY": strategy}
+    start = time.perf_counter()
+    result = subprocess.run([dbt, "build", "--full-refresh", "--target", target],
+                            cwd=DBT_DIR, env=env, capture_output=True, text=True)
+    build_s = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"dbt build falhou com DBT_SURROGATE_KEY={strategy}:\n{result.stdout[-2000:]}")
+    timings = model_timings(os.path.join(DBT_DIR, "target", "run_results.json"))
+
+    con = duckdb.connect(duckdb_path)
+    try:
+        key_type = con.execute(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'fct_observations' AND column_name = 'observation_key'"
+        ).fetchone()[0]
+        entry = {
+            "strategy": strategy,
+            "key_type": key_type,
+            "build_s": round(build_s, 3),
+            "fct_build_s": round(timings.get("fct_observations", 0.0), 3),
+            "dims_build_s": round(sum(t for name, t in timings.items() if name.startswith("dim_")), 3),
+            "fct_mb": copy_size_mb(con, work_dir, f"{strategy}_fct", "*"),
+            "keys_mb": copy_size_mb(con, work_dir, f"{strategy}_keys", ", ".join(KEY_COLUMNS)),
+            "joins_s": {},
+        }
+        answers = {}
+        for name, sql in FACT_JOIN_QUERIES.items():
+            timings_q = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = con.execute(sql).fetchall()
+                timings_q.append(time.perf_counter() - start)
+            entry["joins_s"][name] = round(statistics.median(timings_q), 4)
+            answers[name] = sorted((tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows),
+                                   key=repr)
+        entry["joins_total_s"] = round(sum(entry["joins_s"].values()), 4)
+        entry["answers"] = answers
+    finally:
+        con.close()
+    return entry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark das chaves surrogate dos marts: int64 vs MD5")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas sintéticas na fato")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções de cada consulta")
+    parser.add_argument("--target", default=os.environ.get("DBT_TARGET", "dev"), help="Target do dbt")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        dbt = find_dbt()
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_db = os.path.join(tmp, "raw.db")
+            conn = sqlite3.connect(raw_db)
+            try:
+                generate_database(conn, args.rows, 200, 194, 30, args.seed)
+            finally:
+                conn.close()
+            results = [run_strategy(s, dbt, raw_db, tmp, args.repeat, args.target) for s in STRATEGIES]
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    answers = [r.pop("answers") for r in results]
+    same_output = all(a == answers[0] for a in answers)
+
+    if args.json:
+        print(json.dumps({"rows": args.rows, "strategies": results, "same_output": same_output}, indent=2))
+    else:
+        base = results[0]
+        print("=" * 72)
+        print(f"  Chaves surrogate dos marts — {args.rows:,} observações (junções: mediana de {args.repeat})")
+        print("=" * 72)
+        print(f"  {'chave':<7} {'tipo':<9} {'fct':>7} {'dims':>7} {'fct MB':>8} {'chaves MB':>10} {'junções':>9}")
+        for r in results:
+            print(f"  {r['strategy']:<7} {r['key_type']:<9} {r['fct_build_s']:>6.2f}s {r['dims_build_s']:>6.2f}s "
+                  f"{r['fct_mb']:>8.1f} {r['keys_mb']:>10.1f} {r['joins_total_s']:>8.3f}s")
+        for r in results[1:]:
+            print(f"  {r['strategy']} vs {base['strategy']}: fct {(r['fct_mb'] / base['fct_mb'] - 1) * 100:+.0f}% em disco, "
+                  f"build {(r['fct_build_s'] / base['fct_build_s'] - 1) * 100:+.0f}%, "
+                  f"junções {(r['joins_total_s'] / base['joins_total_s'] - 1) * 100:+.0f}%")
+        print(f"  Mesmos resultados nas consultas: {'sim' if same_output else 'NÃO'}")
+
+    if not same_output:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
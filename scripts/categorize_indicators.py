@@ -1,35 +1,111 @@
 
-import pandas as pd
+import argparse
+import json
 import os
 
-def categorize_indicators(file_path):
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def load_rules(rules_path=None, prefix_rules=(), overrides=()):
+    """
+    Builds the categorization rules from an optional JSON file plus PREFIX=CATEGORY / CODE=CATEGORY pairs.
+
+    The JSON file has the shape {"prefix_rules": {"SDG_": "SDG"}, "overrides": {"WSH_SANITATION_SAFELY_MANAGED": "WASH"}}.
+    """
+    rules = {"prefix_rules": {}, "overrides": {}}
+    if rules_path:
+        with open(rules_path, encoding="utf-8") as f:
+            loaded = json.load(f)
+        rules["prefix_rules"].update(loaded.get("prefix_rules", {}))
+        rules["overrides"].update(loaded.get("overrides", {}))
+    for key, pairs in (("prefix_rules", prefix_rules), ("overrides", overrides)):
+        for pair in pairs:
+            name, _, category = pair.partition("=")
+            rules[key][name] = category
+    return rules
+
+
+def categorize_chunk(df, prefix_rules, overrides):
+    """
+    Vectorized categorization of one chunk.
+
+    Default: the first part of the indicator code (split on '_'). Prefix rules replace it, the
+    longest matching prefix winning, and per-code overrides win over everything.
+    """
+    codes = df['IndicatorCode']
+    category = codes.str.split('_', n=1).str[0]
+    for prefix, rule_category in sorted(prefix_rules.items(), key=lambda item: len(item[0])):
+        category = category.mask(codes.str.startswith(prefix, na=False), rule_category)
+    if overrides:
+        category = codes.map(overrides).fillna(category)
+    df['Category'] = category
+    return df
+
+
+def categorize_indicators(file_path, output_path=None, parquet_path=None, rules=None, chunk_size=DEFAULT_CHUNK_SIZE):
     """
-    Reads the indicators.csv file and categorizes the indicators based on their codes.
+    Reads the indicators.csv file in chunks and categorizes the indicators based on their codes.
+
+    Each chunk is appended to the categorized CSV and written as one row group of a typed
+    (string columns, ZSTD-compressed) Parquet file, so memory stays bounded by the chunk size.
     """
+    rules = rules or {"prefix_rules": {}, "overrides": {}}
+    # Output paths are relative to the project root; the script is expected to be run from there.
+    output_path = output_path or os.path.join('data', 'categorized_indicators.csv')
+    parquet_path = parquet_path or os.path.splitext(output_path)[0] + '.parquet'
+    writer = None
     try:
-        df = pd.read_csv(file_path)
-        # Extract the first part of the indicator code as the category
-        df['Category'] = df['IndicatorCode'].apply(lambda x: x.split('_')[0])
-        
-        # Get the category counts
-        category_counts = df['Category'].value_counts()
-        
+        category_counts = pd.Series(dtype='int64')
+        rows = 0
+        for i, chunk in enumerate(pd.read_csv(file_path, chunksize=chunk_size)):
+            chunk = categorize_chunk(chunk, rules["prefix_rules"], rules["overrides"])
+            chunk.to_csv(output_path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+            if writer is None:
+                schema = pa.schema([(str(col), pa.string()) for col in chunk.columns])
+                writer = pq.ParquetWriter(parquet_path, schema, compression='zstd')
+            arrays = [pa.array(chunk[col], from_pandas=True).cast(pa.string()) for col in chunk.columns]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            category_counts = category_counts.add(chunk['Category'].value_counts(), fill_value=0)
+            rows += len(chunk)
+
+        if writer is not None:
+            writer.close()
+            writer = None
+
         print("Top 20 Indicator Categories:")
-        print(category_counts.head(20))
-        
-        # Save the categorized indicators to a new CSV file
-        # Correcting the output path to be relative to the project root, not the script's location.
-        # This assumes the script is run from the project root.
-        output_path = os.path.join('data', 'categorized_indicators.csv')
-        df.to_csv(output_path, index=False)
-        print(f"\nCategorized indicators saved to: {output_path}")
-        
+        print(category_counts.astype('int64').sort_values(ascending=False, kind='stable').head(20))
+
+        print(f"\n{rows} categorized indicators saved to: {output_path}")
+        print(f"Typed Parquet saved to: {parquet_path}")
+
     except FileNotFoundError:
         print(f"Error: The file {file_path} was not found.")
     except Exception as e:
         print(f"An error occurred: {e}")
+    finally:
+        if writer is not None:
+            writer.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Categorize WHO GHO indicators by code prefix")
     # The script is expected to be run from the project root directory
-    file_path = os.path.join('data', 'indicators.csv')
-    categorize_indicators(file_path)
+    parser.add_argument("--input", default=os.path.join('data', 'indicators.csv'), help="Indicators CSV")
+    parser.add_argument("--output", default=None, help="Categorized CSV (default: data/categorized_indicators.csv)")
+    parser.add_argument("--parquet", default=None, help="Typed Parquet output (default: output path with .parquet)")
+    parser.add_argument("--rules", default=None, help="JSON file with prefix_rules and overrides")
+    parser.add_argument("--prefix-rule", action="append", default=[], metavar="PREFIX=CATEGORY",
+                        help="Map codes starting with PREFIX to CATEGORY (repeatable)")
+    parser.add_argument("--override", action="append", default=[], metavar="CODE=CATEGORY",
+                        help="Force the category of one indicator code (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    args = parser.parse_args()
+
+    categorize_indicators(
+        args.input, args.output, args.parquet,
+        load_rules(args.rules, args.prefix_rule, args.override), args.chunk_size,
+    )
@@ -1,14 +1,15 @@
 # Script para coletar dados da API da OMS
-import requests
 import pandas as pd
 import os
 
+import gho_client
+
 # URL base da API
-BASE_URL = "https://ghoapi.azureedge.net/api/"
+BASE_URL = gho_client.GHO_API_URL
 
 def get_indicators():
     """Busca a lista de todos os indicadores disponíveis."""
-    response = requests.get(f"{BASE_URL}Indicator")
+    response = gho_client.get(f"{BASE_URL}Indicator")
     if response.status_code == 200:
         return response.json()['value']
     else:
@@ -1,86 +1,355 @@
 
+import argparse
 import sqlite3
 import os
 
-def create_database():
+# Raw schema variants. "standard" is the historical schema. "compact" is opt-in: STRICT tables,
+# integer primary keys without AUTOINCREMENT (no sqlite_sequence bookkeeping) and a fact
+# table stored WITHOUT ROWID, clustered on its natural key, so the natural key needs no
+# separate index. A missing sex is stored as 0, like the marts do, because primary key
+# columns of a WITHOUT ROWID table cannot be NULL.
+SCHEMA_VARIANTS = ['standard', 'compact']
+
+STANDARD_SCHEMA = [
+    '''
+        CREATE TABLE IF NOT EXISTS dim_indicators (
+            indicator_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            indicator_code TEXT UNIQUE,
+            indicator_name TEXT,
+            category TEXT
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS dim_locations (
+            location_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            country_code TEXT UNIQUE,
+            country_name TEXT,
+            region_code TEXT
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS dim_periods (
+            period_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            year INTEGER UNIQUE
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS dim_sex (
+            sex_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sex_code TEXT UNIQUE,
+            sex_name TEXT
+        )
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS fact_observations (
+            observation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            indicator_id INTEGER,
+            location_id INTEGER,
+            period_id INTEGER,
+            sex_id INTEGER,
+            value REAL,
+            FOREIGN KEY (indicator_id) REFERENCES dim_indicators (indicator_id),
+            FOREIGN KEY (location_id) REFERENCES dim_locations (location_id),
+            FOREIGN KEY (period_id) REFERENCES dim_periods (period_id),
+            FOREIGN KEY (sex_id) REFERENCES dim_sex (sex_id)
+        )
+    ''',
+]
+
+# Natural key of the standard fact table: one observation per indicator/location/period/sex.
+# Missing sex counts as 0 so that reloads upsert instead of appending duplicates.
+# Its indicator_id prefix also covers the per-indicator reads of the loaders.
+FACT_NATURAL_KEY_INDEX = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_fact_observations_natural_key
+    ON fact_observations (indicator_id, location_id, period_id, COALESCE(sex_id, 0))
+'''
+
+# The compact fact has no rowid to number observations, so observation_id is packed from
+# the natural key: stable across reloads and unique within the bounds of the CHECKs.
+# (A generated column would be invisible to dbt's sqlite_scanner.)
+COMPACT_OBSERVATION_ID = '(?1 << 36) | (?2 << 20) | (?3 << 4) | COALESCE(?4, 0)'
+
+COMPACT_SCHEMA = [
+    '''
+        CREATE TABLE IF NOT EXISTS dim_indicators (
+            indicator_id INTEGER PRIMARY KEY,
+            indicator_code TEXT UNIQUE,
+            indicator_name TEXT,
+            category TEXT
+        ) STRICT
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS dim_locations (
+            location_id INTEGER PRIMARY KEY,
+            country_code TEXT UNIQUE,
+            country_name TEXT,
+            region_code TEXT
+        ) STRICT
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS dim_periods (
+            period_id INTEGER PRIMARY KEY,
+            year INTEGER UNIQUE
+        ) STRICT
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS dim_sex (
+            sex_id INTEGER PRIMARY KEY,
+            sex_code TEXT UNIQUE,
+            sex_name TEXT
+        ) STRICT
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS fact_observations (
+            observation_id INTEGER NOT NULL,
+            indicator_id INTEGER NOT NULL CHECK (indicator_id BETWEEN 0 AND 134217727),
+            location_id INTEGER NOT NULL CHECK (location_id BETWEEN 0 AND 65535),
+            period_id INTEGER NOT NULL CHECK (period_id BETWEEN 0 AND 65535),
+            sex_id INTEGER NOT NULL CHECK (sex_id BETWEEN 0 AND 15),
+            value REAL,
+            PRIMARY KEY (indicator_id, location_id, period_id, sex_id),
+            FOREIGN KEY (indicator_id) REFERENCES dim_indicators (indicator_id),
+            FOREIGN KEY (location_id) REFERENCES dim_locations (location_id),
+            FOREIGN KEY (period_id) REFERENCES dim_periods (period_id)
+        ) STRICT, WITHOUT ROWID
+    ''',
+]
+
+# UTC write time of an observation (fact_observations.updated_at, from migration 3)
+NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+# Plain insert of (indicator_id, location_id, period_id, sex_id, value) per variant
+FACT_INSERT_STATEMENTS = {
+    'standard': f'''
+        INSERT INTO fact_observations (indicator_id, location_id, period_id, sex_id, value, updated_at)
+        VALUES (?, ?, ?, ?, ?, {NOW_SQL})
+    ''',
+    'compact': f'''
+        INSERT INTO fact_observations (observation_id, indicator_id, location_id, period_id, sex_id, value, updated_at)
+        VALUES ({COMPACT_OBSERVATION_ID}, ?1, ?2, ?3, COALESCE(?4, 0), ?5, {NOW_SQL})
+    ''',
+}
+
+# Unique natural key of the fact in each variant (target of the loaders' upsert)
+FACT_NATURAL_KEY = {
+    'standard': '(indicator_id, location_id, period_id, COALESCE(sex_id, 0))',
+    'compact': '(indicator_id, location_id, period_id, sex_id)',
+}
+
+# Covering index for the ingestion's indicator selection by category
+# (indicator_id is the rowid, so it is part of every index entry).
+CATEGORY_INDEX = 'CREATE INDEX IF NOT EXISTS ix_dim_indicators_category ON dim_indicators (category, indicator_code)'
+
+
+class DuplicateFactsError(ValueError):
+    """fact_observations holds duplicate natural keys, so its unique index cannot be created."""
+
+
+def count_duplicate_facts(conn):
+    """Returns how many fact rows repeat the natural key of another row (0 when there are none)."""
+    return conn.execute('''
+        SELECT COALESCE(SUM(n - 1), 0) FROM (
+            SELECT COUNT(*) AS n FROM fact_observations
+            GROUP BY indicator_id, location_id, period_id, COALESCE(sex_id, 0)
+            HAVING COUNT(*) > 1
+        )
+    ''').fetchone()[0]
+
+
+def create_fact_natural_key(conn):
     """
-    Creates the SQLite database and the initial tables based on the star schema.
+    Creates the unique natural-key index of the standard fact table.
+
+    Databases loaded before the index may hold one copy of each observation per load;
+    those are checked first and raise DuplicateFactsError instead of a bare
+    "UNIQUE constraint failed". The compact fact is clustered on its natural key
+    already, so nothing is created there.
     """
-    # Define the database file path
+    if schema_variant(conn) != 'standard':
+        return
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_fact_observations_natural_key'"
+    ).fetchone()
+    if exists:
+        return
+    duplicates = count_duplicate_facts(conn)
+    if duplicates:
+        raise DuplicateFactsError(
+            f"fact_observations has {duplicates:,} duplicate row(s) by natural key; "
+            f"run scripts/dedup_fact_observations.py once, then retry"
+        )
+    conn.execute(FACT_NATURAL_KEY_INDEX)
+
+
+# Versioned migrations of the raw schema, applied in order and recorded in PRAGMA user_version.
+# Versions 1 and 2 are idempotent (IF NOT EXISTS), so databases created before versioning
+# (user_version 0) are upgraded in place without losing data. Never edit an applied
+# migration: append a new version instead. Steps that differ per variant map variant → statements;
+# a step may also be a callable taking the connection, for checks SQL alone cannot express.
+# (Databases migrated while version 1 still created the natural-key index already have it,
+# so version 4 is a no-op for them.)
+MIGRATIONS = [
+    (1, "star schema", {'standard': STANDARD_SCHEMA, 'compact': COMPACT_SCHEMA}),
+    (2, "lookup indexes", {
+        'standard': [
+            # Foreign keys not led by the natural key: orphan checks, per-country/year/sex
+            # filters and dimension deletes no longer scan the whole fact table.
+            'CREATE INDEX IF NOT EXISTS ix_fact_observations_location ON fact_observations (location_id)',
+            'CREATE INDEX IF NOT EXISTS ix_fact_observations_period ON fact_observations (period_id)',
+            'CREATE INDEX IF NOT EXISTS ix_fact_observations_sex ON fact_observations (sex_id)',
+            CATEGORY_INDEX,
+        ],
+        # Each secondary index of a WITHOUT ROWID table repeats the whole primary key, which
+        # would undo the footprint savings; the compact fact keeps only its clustered key.
+        'compact': [CATEGORY_INDEX],
+    }),
+    (3, "fact change timestamp", [
+        # Set by the loaders when an observation is inserted or its value changes; the
+        # incremental fct_observations model uses it as its change watermark. Rows loaded
+        # before this version keep NULL (they are covered by the first full build).
+        'ALTER TABLE fact_observations ADD COLUMN updated_at TEXT',
+    ]),
+    # Kept apart from the star schema so that a pre-versioning database holding duplicate
+    # observations still reaches version 3 and gets a clear pointer to the dedup script.
+    (4, "fact natural key", [create_fact_natural_key]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Loads of at least this many rows refresh the planner statistics (ANALYZE)
+ANALYZE_MIN_ROWS = 50_000
+
+RAW_TABLES = ['fact_observations', 'dim_indicators', 'dim_locations', 'dim_periods', 'dim_sex']
+
+
+def default_db_path():
     db_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database')
     os.makedirs(db_folder, exist_ok=True)
-    db_path = os.path.join(db_folder, 'who_gho.db')
+    return os.path.join(db_folder, 'who_gho.db')
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def schema_variant(conn):
+    """
+    Returns the variant of an existing raw database ('standard' or 'compact'), or None if
+    it has no fact table yet.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fact_observations'"
+    ).fetchone()
+    if row is None:
+        return None
+    return 'compact' if 'WITHOUT ROWID' in row[0].upper() else 'standard'
+
+
+def fact_upsert_sql(variant):
+    """
+    Insert of one observation that updates the value in place when its natural key exists.
+
+    Reloading an unchanged value is a no-op, so updated_at only moves on real changes.
+    """
+    return (f"{FACT_INSERT_STATEMENTS[variant].rstrip()}\n"
+            f"        ON CONFLICT {FACT_NATURAL_KEY[variant]}\n"
+            f"        DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at\n"
+            f"        WHERE fact_observations.value IS NOT excluded.value\n")
+
+
+def migrate(conn, variant=None):
+    """
+    Applies the pending migrations to the raw database and returns their versions.
+
+    variant chooses the schema of a new database (default 'standard'); an existing
+    database keeps its own, and asking for a different one raises ValueError.
+    Each migration runs in its own transaction together with the user_version bump,
+    so an interrupted upgrade leaves the database at the last complete version.
+    A database with duplicate facts stops before version 4 with DuplicateFactsError.
+    """
+    if variant and variant not in SCHEMA_VARIANTS:
+        raise ValueError(f"unknown variant {variant!r}; expected one of {', '.join(SCHEMA_VARIANTS)}")
+    existing = schema_variant(conn)
+    if variant and existing and variant != existing:
+        raise ValueError(f"database already uses the {existing} variant; recreate it to switch to {variant}")
+    variant = existing or variant or 'standard'
+    current = schema_version(conn)
+    applied = []
+    for version, _, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        if isinstance(statements, dict):
+            statements = statements[variant]
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute('BEGIN')
+        try:
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except (sqlite3.Error, ValueError):
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def analyze_after_load(conn, rows_loaded, min_rows=ANALYZE_MIN_ROWS):
+    """
+    Refreshes the query planner statistics after a large load.
+
+    Returns True when ANALYZE ran (rows_loaded >= min_rows).
+    """
+    if rows_loaded < min_rows:
+        return False
+    conn.execute('ANALYZE')
+    conn.commit()
+    return True
+
+
+def create_database(db_path=None, reset=False, variant=None):
+    """
+    Creates or upgrades the SQLite database with the star schema.
+
+    Existing data is kept: only the pending migrations are applied. With reset=True
+    every table is dropped first, for a clean start. variant picks the schema of a new
+    (or reset) database: 'standard' (default) or 'compact'.
+    """
+    db_path = db_path or default_db_path()
+    conn = None
 
     try:
         # Connect to the database (creates the file if it doesn't exist)
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Drop tables if they exist to ensure a clean start
-        cursor.execute('DROP TABLE IF EXISTS fact_observations')
-        cursor.execute('DROP TABLE IF EXISTS dim_indicators')
-        cursor.execute('DROP TABLE IF EXISTS dim_locations')
-        cursor.execute('DROP TABLE IF EXISTS dim_periods')
-        cursor.execute('DROP TABLE IF EXISTS dim_sex')
-
-        # Create the dimension tables
-        cursor.execute('''
-            CREATE TABLE dim_indicators (
-                indicator_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                indicator_code TEXT UNIQUE,
-                indicator_name TEXT,
-                category TEXT
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE dim_locations (
-                location_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                country_code TEXT UNIQUE,
-                country_name TEXT,
-                region_code TEXT
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE dim_periods (
-                period_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                year INTEGER UNIQUE
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE dim_sex (
-                sex_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sex_code TEXT UNIQUE,
-                sex_name TEXT
-            )
-        ''')
-
-        # Create the fact table
-        cursor.execute('''
-            CREATE TABLE fact_observations (
-                observation_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                indicator_id INTEGER,
-                location_id INTEGER,
-                period_id INTEGER,
-                sex_id INTEGER,
-                value REAL,
-                FOREIGN KEY (indicator_id) REFERENCES dim_indicators (indicator_id),
-                FOREIGN KEY (location_id) REFERENCES dim_locations (location_id),
-                FOREIGN KEY (period_id) REFERENCES dim_periods (period_id),
-                FOREIGN KEY (sex_id) REFERENCES dim_sex (sex_id)
-            )
-        ''')
-
-        conn.commit()
-        print(f"Database created successfully at {db_path}")
-
-    except sqlite3.Error as e:
+
+        if reset:
+            for table in RAW_TABLES:
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute('PRAGMA user_version = 0')
+
+        before = schema_version(conn)
+        applied = migrate(conn, variant)
+        if applied:
+            print(f"Database at {db_path} migrated from version {before} to {SCHEMA_VERSION} "
+                  f"(applied: {', '.join(str(v) for v in applied)}, {schema_variant(conn)} variant)")
+        else:
+            print(f"Database at {db_path} is up to date (version {before}, {schema_variant(conn)} variant)")
+
+    except (sqlite3.Error, ValueError) as e:
         print(f"Database error: {e}")
     finally:
         if conn:
             conn.close()
 
 if __name__ == "__main__":
-    create_database()
+    parser = argparse.ArgumentParser(description="Create or migrate the raw SQLite database")
+    parser.add_argument("--db-path", default=None, help="SQLite file (default: database/who_gho.db)")
+    parser.add_argument("--reset", action="store_true", help="Drop all tables before creating them (destroys data)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Compact variant for a new database: STRICT, no AUTOINCREMENT, WITHOUT ROWID fact")
+    args = parser.parse_args()
+    create_database(args.db_path, args.reset, 'compact' if args.compact else None)
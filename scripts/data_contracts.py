@@ -18,9 +18,10 @@ import sqlite3
 import sys
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import duckdb
+if TYPE_CHECKING:
+    import duckdb  # só para anotações; connect_dbt importa sob demanda
 
 PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DBT_DIR = os.path.join(PROJECT_DIR, "dbt")
@@ -282,6 +283,7 @@ RAW_CONTRACTS = [
             ColumnDef("period_id", "integer"),
             ColumnDef("sex_id", "integer", nullable=True),
             ColumnDef("value", "real"),
+            ColumnDef("updated_at", "text", nullable=True),
         ],
         pk_columns=["observation_id"],
         expected_min_rows=1,
@@ -295,7 +297,7 @@ MART_CONTRACTS = [
         table="dim_indicator",
         description="Dimensão de indicadores",
         columns=[
-            ColumnDef("indicator_key", "varchar"),
+            ColumnDef("indicator_key", "ubigint"),
             ColumnDef("indicator_nk", "bigint"),
             ColumnDef("indicator_code", "varchar"),
             ColumnDef("indicator_name", "varchar", nullable=True),
@@ -310,7 +312,7 @@ MART_CONTRACTS = [
         table="dim_location",
         description="Dimensão de localização",
         columns=[
-            ColumnDef("location_key", "varchar"),
+            ColumnDef("location_key", "ubigint"),
             ColumnDef("location_nk", "bigint"),
             ColumnDef("country_code", "varchar"),
             ColumnDef("country_name", "varchar", nullable=True),
@@ -325,7 +327,7 @@ MART_CONTRACTS = [
         table="dim_period",
         description="Dimensão de período",
         columns=[
-            ColumnDef("period_key", "varchar"),
+            ColumnDef("period_key", "ubigint"),
             ColumnDef("period_nk", "bigint"),
             ColumnDef("year", "bigint"),
             ColumnDef("year_label", "varchar", nullable=True),
@@ -340,7 +342,7 @@ MART_CONTRACTS = [
         table="dim_sex",
         description="Dimensão de sexo",
         columns=[
-            ColumnDef("sex_key", "varchar"),
+            ColumnDef("sex_key", "ubigint"),
             ColumnDef("sex_nk", "bigint"),
             ColumnDef("sex_code", "varchar"),
             ColumnDef("sex_name", "varchar", nullable=True),
@@ -355,16 +357,17 @@ MART_CONTRACTS = [
         description="Tabela fato de observações",
         columns=[
             ColumnDef("observation_id", "bigint"),
-            ColumnDef("observation_key", "varchar"),
+            ColumnDef("observation_key", "ubigint"),
             ColumnDef("indicator_id", "bigint"),
-            ColumnDef("indicator_key", "varchar"),
+            ColumnDef("indicator_key", "ubigint"),
             ColumnDef("location_id", "bigint"),
-            ColumnDef("location_key", "varchar"),
+            ColumnDef("location_key", "ubigint"),
             ColumnDef("period_id", "bigint"),
-            ColumnDef("period_key", "varchar"),
+            ColumnDef("period_key", "ubigint"),
             ColumnDef("sex_id", "bigint"),
-            ColumnDef("sex_key", "varchar"),
+            ColumnDef("sex_key", "ubigint"),
             ColumnDef("value", "double"),
+            ColumnDef("source_updated_at", "timestamp", nullable=True),
         ],
         pk_columns=["observation_id"],
         expected_min_rows=1,
@@ -379,7 +382,7 @@ def connect_raw() -> Optional[sqlite3.Connection]:
     return sqlite3.connect(RAW_DB)
 
 
-def connect_dbt() -> Optional[duckdb.DuckDBPyConnection]:
+def connect_dbt() -> Optional["duckdb.DuckDBPyConnection"]:
     candidates = [
         os.environ.get("DBT_DUCKDB_PATH"),
         os.path.join(DBT_DIR, "oms_dw.duckdb"),
@@ -387,6 +390,8 @@ def connect_dbt() -> Optional[duckdb.DuckDBPyConnection]:
     ]
     for p in candidates:
         if p and os.path.isfile(p):
+            import duckdb
+
             return duckdb.connect(p)
     return None
 
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""dedup_fact_observations.py — Migração única: remove duplicatas da fact_observations.
+
+Uso:
+    python3 scripts/dedup_fact_observations.py                 # database/who_gho.db
+    python3 scripts/dedup_fact_observations.py --dry-run       # apenas conta duplicatas
+    python3 scripts/dedup_fact_observations.py --db-path /tmp/test.db
+
+Bancos criados antes do índice único da chave natural acumulavam uma cópia de
+cada observação a cada execução de populate_facts. Para cada grupo
+(indicator_id, location_id, period_id, sexo) a migração mantém o menor
+observation_id (id estável para o merge incremental do dbt) com o valor da
+carga mais recente (maior observation_id) e updated_at atual, para que o
+fct_observations incremental remescle o valor, remove as demais linhas e cria o
+índice ux_fact_observations_natural_key. Tudo em uma única transação.
+
+Funciona em bancos de qualquer versão do schema, inclusive os anteriores ao
+versionamento (user_version 0), cuja migração para na versão 4 enquanto houver
+duplicatas; depois da limpeza as migrações pendentes são aplicadas.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+from create_database import NOW_SQL, create_fact_natural_key, migrate, schema_variant
+
+
+def find_duplicate_groups(cursor: sqlite3.Cursor) -> int:
+    """Materializa em _fact_dupes os grupos duplicados e retorna quantas linhas sobram."""
+    cursor.execute("DROP TABLE IF EXISTS temp._fact_dupes")
+    cursor.execute("""
+        CREATE TEMP TABLE _fact_dupes AS
+        SELECT MIN(observation_id) AS keep_id,
+               MAX(observation_id) AS latest_id,
+               COUNT(*) - 1        AS extra_rows
+        FROM fact_observations
+        GROUP BY indicator_id, location_id, period_id, COALESCE(sex_id, 0)
+        HAVING COUNT(*) > 1
+    """)
+    return cursor.execute("SELECT COALESCE(SUM(extra_rows), 0) FROM _fact_dupes").fetchone()[0]
+
+
+def dedup(conn: sqlite3.Connection, dry_run: bool = False) -> dict:
+    cursor = conn.cursor()
+    total_before = cursor.execute("SELECT COUNT(*) FROM fact_observations").fetchone()[0]
+    extra_rows = find_duplicate_groups(cursor)
+    groups = cursor.execute("SELECT COUNT(*) FROM _fact_dupes").fetchone()[0]
+    result = {"rows_before": total_before, "duplicate_groups": groups, "duplicate_rows": extra_rows, "rows_removed": 0,
+              "migrations": []}
+
+    if dry_run:
+        return result
+
+    # O sobrevivente de cada grupo recebe o valor da carga mais recente e um updated_at novo:
+    # o fct_observations incremental só remescla linhas com updated_at >= a sua marca d'água
+    has_updated_at = any(col[1] == "updated_at" for col in cursor.execute("PRAGMA table_info(fact_observations)"))
+    set_updated_at = f", updated_at = {NOW_SQL}" if has_updated_at else ""
+    cursor.execute(f"""
+        UPDATE fact_observations
+        SET value = (
+            SELECT f.value FROM _fact_dupes d
+            JOIN fact_observations f ON f.observation_id = d.latest_id
+            WHERE d.keep_id = fact_observations.observation_id
+        ){set_updated_at}
+        WHERE observation_id IN (SELECT keep_id FROM _fact_dupes WHERE latest_id <> keep_id)
+    """)
+    cursor.execute("""
+        DELETE FROM fact_observations
+        WHERE observation_id NOT IN (
+            SELECT MIN(observation_id) FROM fact_observations
+            GROUP BY indicator_id, location_id, period_id, COALESCE(sex_id, 0)
+        )
+    """)
+    result["rows_removed"] = cursor.rowcount
+    create_fact_natural_key(conn)  # no schema compacto a chave natural já é a chave primária
+    conn.commit()
+    result["migrations"] = migrate(conn)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Remove duplicatas da fact_observations pela chave natural")
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help="Caminho para o arquivo .db (default: database/who_gho.db relativo ao script)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Apenas conta as duplicatas")
+    args = parser.parse_args()
+
+    if args.db_path:
+        db_path = args.db_path
+    else:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        db_path = os.path.join(script_dir, "..", "database", "who_gho.db")
+
+    if not os.path.isfile(db_path):
+        print(f"✗ Banco não encontrado: {db_path}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        if schema_variant(conn) is None:
+            print(f"✗ Banco sem a tabela fact_observations: {db_path}")
+            sys.exit(1)
+        result = dedup(conn, dry_run=args.dry_run)
+    finally:
+        conn.close()
+
+    print(f"  Linhas antes:       {result['rows_before']:,}")
+    print(f"  Grupos duplicados:  {result['duplicate_groups']:,} ({result['duplicate_rows']:,} linhas excedentes)")
+    if args.dry_run:
+        print("✓ Dry-run: nada foi alterado")
+    else:
+        print(f"  Linhas removidas:   {result['rows_removed']:,}")
+        if result["migrations"]:
+            print(f"  Migrações aplicadas: {', '.join(map(str, result['migrations']))}")
+        print(f"✓ Índice ux_fact_observations_natural_key criado em {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,186 @@
-import pandas as pd
-import sqlite3
+import argparse
+import csv
+import hashlib
+import io
 import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
 import requests
 
-def get_db_connection():
-    """Cria uma conexão com o banco de dados SQLite."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(script_dir, '..', 'database', 'who_gho.db')
-    return sqlite3.connect(db_path)
+import gho_client
+from populate_database import get_db_connection  # respeita DBT_RAW_DB e aplica as migrações pendentes
+
+# CSV de códigos de país (nomes oficiais); o código da OMS corresponde ao ISO3166-1-Alpha-3
+COUNTRY_CODES_URL = os.environ.get("COUNTRY_CODES_URL", "https://datahub.io/core/country-codes/r/country-codes.csv")
+# Valores da dimensão COUNTRY da OMS: ParentCode é a região da OMS (AFR, AMR, EUR...)
+COUNTRY_REGIONS_URL = f"{gho_client.GHO_API_URL}DIMENSION/COUNTRY/DimensionValues"
+
+REF_TABLE = "ref_country_codes"
+
+
+def ensure_reference_tables(cursor: sqlite3.Cursor) -> None:
+    """Cria a tabela de referência de países e o registro de checksums das fontes."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {REF_TABLE} (
+            country_code TEXT PRIMARY KEY,
+            country_name TEXT,
+            region_code TEXT,
+            region_name TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ref_refresh_log (
+            table_name TEXT PRIMARY KEY,
+            checksum TEXT,
+            row_count INTEGER,
+            refreshed_at TEXT
+        )
+    """)
+
+
+def parse_country_names(csv_text: str) -> Dict[str, str]:
+    """ISO3166-1-Alpha-3 → official_name_en, lido em streaming do CSV (sem arquivo temporário)."""
+    names = {}
+    for row in csv.DictReader(io.StringIO(csv_text)):
+        code = (row.get('ISO3166-1-Alpha-3') or '').strip()
+        name = (row.get('official_name_en') or '').strip()
+        if code and name:
+            names[code] = name
+    return names
+
+
+def parse_country_regions(payload: dict) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Código do país → (código, nome) da região da OMS, a partir de DIMENSION/COUNTRY/DimensionValues."""
+    regions = {}
+    for value in payload.get('value', []):
+        if value.get('Code') and value.get('ParentCode'):
+            regions[value['Code']] = (value['ParentCode'], value.get('ParentTitle'))
+    return regions
+
+
+def refresh_reference_table(conn: sqlite3.Connection, force: bool = False) -> bool:
+    """Atualiza ref_country_codes se o conteúdo das fontes mudou desde a última carga.
+
+    As duas fontes passam pelo cache do gho_client; o SHA-256 dos corpos é comparado ao
+    registrado em ref_refresh_log e a tabela só é reconstruída quando ele muda.
 
-def enrich_locations():
-    """Enriquece a tabela dim_locations com nomes de países."""
+    Retorna:
+        bool: True se a tabela foi reconstruída.
+    """
+    cursor = conn.cursor()
+    ensure_reference_tables(cursor)
+
+    print(f"Obtendo dados de países de: {COUNTRY_CODES_URL}")
+    names_response = gho_client.get(COUNTRY_CODES_URL)
+    names_response.raise_for_status()  # Lança um erro para status HTTP ruins
+    print(f"Obtendo regiões da OMS de: {COUNTRY_REGIONS_URL}")
+    regions_response = gho_client.get(COUNTRY_REGIONS_URL)
+    regions_response.raise_for_status()
+
+    checksum = hashlib.sha256(names_response.content + b"\0" + regions_response.content).hexdigest()
+    cursor.execute("SELECT checksum FROM ref_refresh_log WHERE table_name = ?", (REF_TABLE,))
+    row = cursor.fetchone()
+    if row is not None and row[0] == checksum and not force:
+        print(f"{REF_TABLE} já está atualizada (checksum inalterado).")
+        return False
+
+    names = parse_country_names(names_response.text)
+    regions = parse_country_regions(regions_response.json())
+    rows = [
+        (code, names.get(code), *regions.get(code, (None, None)))
+        for code in sorted(set(names) | set(regions))
+    ]
+    cursor.execute(f"DELETE FROM {REF_TABLE}")
+    cursor.executemany(
+        f"INSERT INTO {REF_TABLE} (country_code, country_name, region_code, region_name) VALUES (?, ?, ?, ?)", rows
+    )
+    cursor.execute(
+        """
+        INSERT INTO ref_refresh_log (table_name, checksum, row_count, refreshed_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT (table_name) DO UPDATE SET
+            checksum = excluded.checksum, row_count = excluded.row_count, refreshed_at = excluded.refreshed_at
+        """,
+        (REF_TABLE, checksum, len(rows), datetime.now(timezone.utc).isoformat()),
+    )
+    conn.commit()
+    print(f"{REF_TABLE} recarregada com {len(rows)} países.")
+    return True
+
+
+# Preenche só o que está vazio; um único UPDATE ... FROM (SQLite >= 3.33)
+ENRICH_SQL = f"""
+    UPDATE dim_locations SET
+        country_name = COALESCE(NULLIF(dim_locations.country_name, ''), ref.country_name),
+        region_code = COALESCE(NULLIF(dim_locations.region_code, ''), ref.region_code)
+    FROM {REF_TABLE} AS ref
+    WHERE ref.country_code = dim_locations.country_code
+      AND (
+          (COALESCE(dim_locations.country_name, '') = '' AND ref.country_name IS NOT NULL)
+          OR (COALESCE(dim_locations.region_code, '') = '' AND ref.region_code IS NOT NULL)
+      )
+"""
+
+
+def apply_enrichment(conn: sqlite3.Connection) -> int:
+    """Preenche country_name e region_code de dim_locations a partir de ref_country_codes."""
+    cursor = conn.cursor()
+    if sqlite3.sqlite_version_info >= (3, 33, 0):
+        cursor.execute(ENRICH_SQL)
+        updated = cursor.rowcount
+    else:
+        # SQLite antigo, sem UPDATE ... FROM: mesma regra em um único executemany
+        cursor.execute(f"""
+            SELECT l.location_id, r.country_name, r.region_code
+            FROM dim_locations l JOIN {REF_TABLE} r ON r.country_code = l.country_code
+            WHERE (COALESCE(l.country_name, '') = '' AND r.country_name IS NOT NULL)
+               OR (COALESCE(l.region_code, '') = '' AND r.region_code IS NOT NULL)
+        """)
+        updates: List[Tuple[str, str, int]] = [
+            (country_name, region_code, location_id) for location_id, country_name, region_code in cursor.fetchall()
+        ]
+        cursor.executemany("""
+            UPDATE dim_locations SET
+                country_name = COALESCE(NULLIF(country_name, ''), ?),
+                region_code = COALESCE(NULLIF(region_code, ''), ?)
+            WHERE location_id = ?
+        """, updates)
+        updated = len(updates)
+    conn.commit()
+    return updated
+
+
+def enrich_locations(force_refresh: bool = False):
+    """Enriquece a tabela dim_locations com nomes de países e regiões da OMS."""
     print("--- Enriquecendo a Tabela dim_locations ---")
-    
-    # URL para o arquivo CSV de códigos de país
-    url = "https://datahub.io/core/country-codes/r/country-codes.csv"
-    
+    conn = None
     try:
-        # Baixar o arquivo CSV
-        print(f"Baixando dados de países de: {url}")
-        response = requests.get(url)
-        response.raise_for_status()  # Lança um erro para status HTTP ruins
-
-        # Salvar o conteúdo em um arquivo temporário
-        temp_csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'country_codes.csv')
-        with open(temp_csv_path, 'w', encoding='utf-8') as f:
-            f.write(response.text)
-        
-        # Ler o CSV em um DataFrame do pandas
-        country_df = pd.read_csv(temp_csv_path)
-        
-        # Manter apenas as colunas necessárias e renomeá-las para clareza
-        # O código da OMS corresponde ao ISO3166-1-Alpha-3
-        country_df = country_df[['ISO3166-1-Alpha-3', 'official_name_en']]
-        country_df.columns = ['country_code', 'country_name']
-
-        # Criar um dicionário para mapeamento rápido
-        country_map = country_df.set_index('country_code')['country_name'].to_dict()
-
-        # Conectar ao banco de dados
         conn = get_db_connection()
-        cursor = conn.cursor()
+        refresh_reference_table(conn, force_refresh)
 
-        # Buscar todos os códigos de país da dim_locations
-        cursor.execute("SELECT location_id, country_code FROM dim_locations WHERE country_name IS NULL OR country_name = ''")
-        locations_to_update = cursor.fetchall()
-        
-        print(f"Encontrados {len(locations_to_update)} locais para enriquecer.")
-
-        updated_count = 0
-        # Atualizar cada linha com o nome do país correspondente
-        for location_id, country_code in locations_to_update:
-            country_name = country_map.get(country_code)
-            if country_name:
-                cursor.execute("UPDATE dim_locations SET country_name = ? WHERE location_id = ?", (country_name, location_id))
-                updated_count += 1
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM dim_locations "
+            "WHERE COALESCE(country_name, '') = '' OR COALESCE(region_code, '') = ''"
+        )
+        print(f"Encontrados {cursor.fetchone()[0]} locais para enriquecer.")
 
-        conn.commit()
-        print(f"{updated_count} nomes de países foram atualizados com sucesso.")
+        updated_count = apply_enrichment(conn)
+        print(f"{updated_count} locais foram atualizados com sucesso.")
 
     except requests.exceptions.RequestException as e:
-        print(f"Erro ao baixar o arquivo de países: {e}")
+        print(f"Erro ao baixar os dados de referência de países: {e}")
     except Exception as e:
         print(f"Ocorreu um erro: {e}")
     finally:
-        # Limpar o arquivo temporário
-        if os.path.exists(temp_csv_path):
-            os.remove(temp_csv_path)
-        if 'conn' in locals() and conn:
+        if conn:
             conn.close()
 
+
 if __name__ == "__main__":
-    enrich_locations()
+    parser = argparse.ArgumentParser(description="Enriquece dim_locations com nomes de países e regiões da OMS")
+    parser.add_argument("--force-refresh", action="store_true",
+                        help="Recarrega ref_country_codes mesmo sem mudança no checksum")
+    args = parser.parse_args()
+    enrich_locations(args.force_refresh)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""gho_api_stub.py — Stand-in local da API OData do WHO GHO.
+
+Uso:
+    python3 scripts/gho_api_stub.py                          # http://127.0.0.1:8765/api/
+    python3 scripts/gho_api_stub.py --rows 5000 --latency 0.2
+    GHO_API_URL=http://127.0.0.1:8765/api/ python3 scripts/populate_database.py --async
+
+Serve, para qualquer código de indicador em /api/<IndicatorCode>, um payload
+determinístico no formato OData do GHO ({"value": [...]}) com SpatialDim,
+TimeDim, Dim1 (SEX_*) e NumericValue; /api/DIMENSION/COUNTRY/DimensionValues
+devolve os países com a região da OMS (ParentCode). Suporta paginação OData com $top/$skip
+e requisições condicionais (ETag/If-None-Match → 304); --revision altera os
+valores e o ETag, simulando uma atualização dos dados pela OMS; --fail-rate
+responde 503 a uma fração das requisições, para exercitar retry e circuit breaker.
+Permite testar e medir a ingestão sem acessar a API real.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COUNTRIES = [
+    "BRA", "USA", "GBR", "ARG", "CAN", "MEX", "FRA", "DEU", "ITA", "ESP",
+    "PRT", "CHN", "IND", "JPN", "KOR", "ZAF", "NGA", "EGY", "KEN", "AUS",
+]
+WHO_REGIONS = {
+    "BRA": "AMR", "USA": "AMR", "GBR": "EUR", "ARG": "AMR", "CAN": "AMR", "MEX": "AMR", "FRA": "EUR",
+    "DEU": "EUR", "ITA": "EUR", "ESP": "EUR", "PRT": "EUR", "CHN": "WPR", "IND": "SEAR", "JPN": "WPR",
+    "KOR": "WPR", "ZAF": "AFR", "NGA": "AFR", "EGY": "EMR", "KEN": "AFR", "AUS": "WPR",
+}
+SEX_CODES = ["SEX_MLE", "SEX_FMLE", "SEX_BTSX"]
+FIRST_YEAR = 2000
+N_YEARS = 24
+
+
+def country_code(idx: int) -> str:
+    """Código de país para o índice; além da lista fixa gera códigos sintéticos (X001, X002...)."""
+    if idx < len(COUNTRIES):
+        return COUNTRIES[idx]
+    return f"X{idx - len(COUNTRIES) + 1:03d}"
+
+
+def build_observations(indicator_code: str, start: int, stop: int, revision: int = 0) -> list:
+    """Gera as observações [start, stop) do indicador, únicas por (país, ano, sexo) e estáveis
+    entre requisições, de modo que qualquer página possa ser gerada isoladamente."""
+    observations = []
+    for i in range(start, stop):
+        sex = SEX_CODES[i % len(SEX_CODES)]
+        year = FIRST_YEAR + (i // len(SEX_CODES)) % N_YEARS
+        country = country_code(i // (len(SEX_CODES) * N_YEARS))
+        value = round(zlib.crc32(f"{indicator_code}:{i}:{revision}".encode()) % 500_000 / 1000, 3)
+        observations.append(
+            {
+                "Id": i + 1,
+                "IndicatorCode": indicator_code,
+                "SpatialDimType": "COUNTRY",
+                "SpatialDim": country,
+                "TimeDimType": "YEAR",
+                "TimeDim": year,
+                "Dim1Type": "SEX",
+                "Dim1": sex,
+                "NumericValue": value,
+                "Value": str(value),
+            }
+        )
+    return observations
+
+
+def build_country_values() -> list:
+    """Valores da dimensão COUNTRY, no formato de /api/DIMENSION/COUNTRY/DimensionValues."""
+    return [
+        {
+            "Code": code,
+            "Title": code,
+            "Dimension": "COUNTRY",
+            "ParentDimension": "REGION",
+            "ParentCode": region,
+            "ParentTitle": region,
+        }
+        for code, region in WHO_REGIONS.items()
+    ]
+
+
+def make_handler(rows: int, latency: float, revision: int = 0, fail_rate: float = 0.0):
+    class GHOStubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path
+            if not path.startswith("/api/") or len(path) <= len("/api/"):
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            if fail_rate and random.random() < fail_rate:
+                self.send_error(503, "Falha transitória simulada")
+                return
+            indicator_code = path[len("/api/"):]
+            if indicator_code == "DIMENSION/COUNTRY/DimensionValues":
+                body = json.dumps({"value": build_country_values()}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            etag = f'"{zlib.crc32(f"{indicator_code}:{rows}:{revision}".encode()):08x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            params = parse_qs(url.query)
+            skip = min(int(params.get("$skip", ["0"])[0]), rows)
+            top = int(params.get("$top", [str(rows)])[0])
+            body = json.dumps(
+                {
+                    "@odata.context": f"{self.headers.get('Host', '')}/api/$metadata#{indicator_code}",
+                    "value": build_observations(indicator_code, skip, min(skip + top, rows), revision),
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # silencioso: o stub é usado em benchmarks
+
+    return GHOStubHandler
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, rows: int = 500, latency: float = 0.0,
+                 revision: int = 0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Sobe o stub em uma thread daemon e retorna o servidor (porta real em server.server_address)."""
+    server = ThreadingHTTPServer((host, port), make_handler(rows, latency, revision, fail_rate))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in local da API OData do WHO GHO")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rows", type=int, default=500, help="Observações por indicador")
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso (s) por requisição")
+    parser.add_argument("--revision", type=int, default=0, help="Versão dos dados (muda valores e ETag)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fração das requisições respondidas com 503")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port), make_handler(args.rows, args.latency, args.revision, args.fail_rate)
+    )
+    print(f"✓ GHO API stub em http://{args.host}:{args.port}/api/ ({args.rows} obs/indicador)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""gho_client.py — Cliente HTTP compartilhado da API da OMS, com cache persistente em disco.
+
+Uso:
+    from gho_client import GHO_API_URL, get
+    response = get(f"{GHO_API_URL}Indicator")      # requests.Response (do cache ou da rede)
+
+    python3 scripts/gho_client.py --stats          # contadores acumulados do cache
+    python3 scripts/gho_client.py --clear          # esvazia o cache
+
+As respostas 200 ficam em um SQLite (.cache/gho_http/responses.db), com o corpo
+comprimido (zlib) e validade por endpoint (ENDPOINT_TTLS). Quando o total passa
+de GHO_CACHE_MAX_MB, as entradas menos usadas recentemente são removidas (LRU).
+O cache é seguro entre threads, processos e execuções. Hits, misses, bytes e o
+tempo de rede poupado são acumulados na tabela cache_stats.
+
+Erros transitórios (falha de conexão, timeout, HTTP 429/5xx) são repetidos com
+backoff exponencial e jitter; um 429 com Retry-After adia o host pelo tempo pedido.
+Toda ida à rede, retries e páginas incluídos, passa pelo limitador de taxa por host
+(set_rate_limit), de modo que uma rajada de 429 não vira uma rajada de retries.
+Um circuit breaker por processo abre após
+BREAKER_THRESHOLD falhas seguidas: durante BREAKER_COOLDOWN segundos as
+requisições falham na hora com CircuitOpenError, sem insistir em uma API fora do ar.
+
+Variáveis de ambiente:
+    GHO_API_URL        URL base da API (ex: http://127.0.0.1:8765/api/ para o stub)
+    GHO_CACHE_DIR      diretório do cache (default: .cache/gho_http na raiz do projeto)
+    GHO_CACHE_MAX_MB   tamanho máximo do cache (default: 512)
+    GHO_CACHE_DISABLE  "1" desativa o cache (ex: benchmarks de rede)
+    GHO_RETRY_ATTEMPTS tentativas por requisição (default: 4)
+    GHO_RATE_LIMIT     máximo de requisições por segundo por host (default: 0, sem limite)
+"""
+
+import argparse
+import email.utils
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# URL base da API OData da OMS (sobrescrevível para apontar para scripts/gho_api_stub.py)
+GHO_API_URL: str = os.environ.get("GHO_API_URL", "https://ghoapi.azureedge.net/api/")
+
+PROJECT_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_DIR: str = os.environ.get("GHO_CACHE_DIR", os.path.join(PROJECT_DIR, ".cache", "gho_http"))
+CACHE_MAX_BYTES: int = int(float(os.environ.get("GHO_CACHE_MAX_MB", "512")) * 1024 * 1024)
+CACHE_ENABLED: bool = os.environ.get("GHO_CACHE_DISABLE", "") not in ("1", "true", "yes")
+
+HOUR: int = 3600
+DAY: int = 24 * HOUR
+
+# Validade por endpoint (último segmento do caminho da URL). Metadados mudam pouco;
+# as observações de cada indicador usam DEFAULT_TTL.
+ENDPOINT_TTLS: Dict[str, int] = {
+    "Indicator": 7 * DAY,
+    "DIMENSION": 7 * DAY,
+    "Dimension": 7 * DAY,
+    "DimensionValues": 7 * DAY,
+    "country-codes.csv": 30 * DAY,
+}
+DEFAULT_TTL: int = DAY
+
+RETRY_ATTEMPTS: int = int(os.environ.get("GHO_RETRY_ATTEMPTS", "4"))
+RETRY_BASE_DELAY: float = 0.5
+RETRY_MAX_DELAY: float = 30.0
+TRANSIENT_STATUS = frozenset({429, 500, 502, 503, 504})
+RETRY_AFTER_MAX: float = 120.0
+BREAKER_THRESHOLD: int = 5
+BREAKER_COOLDOWN: float = 60.0
+
+# Só estes cabeçalhos da resposta são guardados (os de validação servem ao modo incremental)
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def ttl_for(url: str) -> int:
+    """Validade (s) das respostas da URL, pelo último segmento do caminho."""
+    endpoint = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return ENDPOINT_TTLS.get(endpoint, DEFAULT_TTL)
+
+
+def cache_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Chave do cache: URL + parâmetros de query em ordem canônica."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """A API falhou repetidamente e o circuit breaker está aberto."""
+
+
+class CircuitBreaker:
+    """Abre após `threshold` falhas seguidas; após `cooldown` segundos deixa passar uma tentativa (half-open)."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN) -> None:
+        self.threshold: int = threshold
+        self.cooldown: float = cooldown
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"circuit breaker aberto após {self.failures} falhas seguidas; nova tentativa em {remaining:.0f}s"
+                )
+            # Half-open: esta requisição testa a API; uma nova falha reabre o circuito
+            self.opened_at = None
+            self.failures = self.threshold - 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+breaker: CircuitBreaker = CircuitBreaker()
+
+
+class HostRateLimiter:
+    """Espaça as requisições para que cada host receba no máximo `rate` requisições por segundo.
+
+    Compartilhado pelas threads do processo. defer() empurra o próximo horário livre do host
+    (Retry-After), o que pausa todas as threads e não só a que recebeu o 429.
+    """
+
+    def __init__(self, rate: float = 0.0) -> None:
+        self.interval: float = 0.0
+        self.set_rate(rate)
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+
+    def wait(self, url: str) -> None:
+        """Aguarda até o próximo horário livre para o host da URL."""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            if self.interval or slot > now:
+                self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def defer(self, url: str, delay: float) -> None:
+        """Nenhuma requisição ao host da URL antes de `delay` segundos."""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._next_slot[host] = max(self._next_slot.get(host, 0.0), time.monotonic() + delay)
+
+
+rate_limiter: HostRateLimiter = HostRateLimiter(float(os.environ.get("GHO_RATE_LIMIT", "0")))
+
+
+def set_rate_limit(rate: float) -> None:
+    """Máximo de requisições por segundo por host neste processo (0 desativa o limite).
+
+    Também serve de initializer de ProcessPoolExecutor: cada processo tem o seu limitador.
+    """
+    rate_limiter.set_rate(rate)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Espera antes da tentativa attempt + 1: backoff exponencial com full jitter."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def retry_after(response: Optional[requests.Response]) -> Optional[float]:
+    """Segundos pedidos pelo Retry-After de uma resposta 429 (segundos ou data HTTP), limitados a RETRY_AFTER_MAX."""
+    if response is None or response.status_code != 429:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+
+def fetch(url: str, params: Optional[Mapping[str, Any]] = None, headers: Optional[Mapping[str, str]] = None,
+          timeout: float = 30) -> requests.Response:
+    """GET na rede com limite de taxa, retry de erros transitórios e circuit breaker (sem cache).
+
+    Cada tentativa aguarda o limitador do host; um 429 com Retry-After adia o host antes da
+    próxima. Respostas 4xx (exceto 429) são devolvidas ao chamador, que decide com raise_for_status.
+
+    Raises:
+        CircuitOpenError: Se o circuit breaker está aberto.
+        requests.exceptions.RequestException: Se todas as tentativas falharam.
+    """
+    attempt = 0
+    while True:
+        breaker.before_request()
+        rate_limiter.wait(url)
+        try:
+            response = requests.get(url, params=params, headers=headers, timeout=timeout)
+            if response.status_code in TRANSIENT_STATUS:
+                raise requests.exceptions.HTTPError(
+                    f"{response.status_code} transitório para {response.url}", response=response
+                )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.HTTPError) as e:
+            breaker.record_failure()
+            attempt += 1
+            if attempt >= RETRY_ATTEMPTS:
+                raise
+            delay = retry_after(e.response)
+            if delay is not None:
+                rate_limiter.defer(url, delay)
+            time.sleep(backoff_delay(attempt - 1))
+            continue
+        breaker.record_success()
+        return response
+
+
+class ResponseCache:
+    """Cache de respostas HTTP em SQLite, compartilhado entre threads e processos."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.path: str = os.path.join(cache_dir, "responses.db")
+        self.max_bytes: int = max_bytes
+        self.stats: Dict[str, float] = {
+            "hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0, "seconds_saved": 0.0,
+        }
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Uma conexão por thread e por processo (conexões não sobrevivem a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER,
+                    headers TEXT,
+                    body BLOB,
+                    size INTEGER,
+                    fetch_seconds REAL,
+                    stored_at REAL,
+                    expires_at REAL,
+                    last_access REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_stats (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, conn: sqlite3.Connection, **increments: float) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+        conn.executemany(
+            "INSERT INTO cache_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            list(increments.items()),
+        )
+
+    def lookup(self, key: str) -> Optional[requests.Response]:
+        """Resposta válida do cache para a chave, ou None (miss)."""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT status, headers, body, size, fetch_seconds FROM responses WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        if row is None:
+            self._count(conn, misses=1)
+            return None
+        status, headers, body, size, fetch_seconds = row
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self._count(conn, hits=1, bytes_saved=size, seconds_saved=fetch_seconds)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response._content = zlib.decompress(body)
+        response.url = key
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        response.from_cache = True
+        return response
+
+    def store(self, key: str, response: requests.Response, ttl: int, fetch_seconds: float) -> None:
+        """Guarda uma resposta 200 (corpo comprimido) e aplica o limite de tamanho."""
+        if response.status_code != 200 or ttl <= 0:
+            return
+        conn = self._conn()
+        now = time.time()
+        body = zlib.compress(response.content, 6)
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, status, headers, body, size, fetch_seconds, stored_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, response.status_code, json.dumps(headers), body, len(body), fetch_seconds, now, now + ttl, now),
+        )
+        self._count(conn, stores=1)
+        self.evict(conn)
+
+    def evict(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """Remove entradas expiradas e, se necessário, as menos usadas até caber em 90% do limite."""
+        conn = conn or self._conn()
+        removed = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            freed = 0
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                if total - freed <= target:
+                    break
+                victims.append((key,))
+                freed += size
+            conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+            removed += len(victims)
+        if removed:
+            self._count(conn, evictions=removed)
+        return removed
+
+    def persistent_stats(self) -> Dict[str, float]:
+        """Contadores acumulados entre execuções, mais o estado atual do cache."""
+        conn = self._conn()
+        stats: Dict[str, float] = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        stats["entries"] = entries
+        stats["size_bytes"] = size
+        return stats
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.execute("DELETE FROM cache_stats")
+        conn.execute("VACUUM")
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_cache() -> ResponseCache:
+    """Instância do cache compartilhada pelo processo."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def get(url: str, params: Optional[Mapping[str, Any]] = None, headers: Optional[Mapping[str, str]] = None,
+        timeout: float = 30, ttl: Optional[int] = None, refresh: bool = False) -> requests.Response:
+    """GET com cache: devolve a resposta do cache se válida, senão busca na rede e guarda.
+
+    Requisições condicionais (If-None-Match/If-Modified-Since) e as com refresh=True sempre
+    vão à rede, pois o chamador quer saber se o conteúdo mudou; respostas 200 delas também
+    são guardadas.
+
+    Args:
+        url (str): URL completa.
+        params (Optional[Mapping[str, Any]]): Parâmetros de query (ex: $top/$skip).
+        headers (Optional[Mapping[str, str]]): Cabeçalhos da requisição.
+        timeout (float): Timeout da requisição, em segundos.
+        ttl (Optional[int]): Validade da resposta em segundos (default: ttl_for(url); 0 não guarda).
+        refresh (bool): Ignora a resposta em cache e vai à rede (a nova resposta é guardada).
+
+    Retorna:
+        requests.Response: Resposta da rede ou do cache (from_cache=True).
+    """
+    conditional = bool(headers) and any(h.lower().startswith("if-") for h in headers)
+    if not CACHE_ENABLED:
+        return fetch(url, params=params, headers=headers, timeout=timeout)
+
+    cache = get_cache()
+    key = cache_key(url, params)
+    if not (conditional or refresh):
+        cached = cache.lookup(key)
+        if cached is not None:
+            return cached
+
+    start = time.perf_counter()
+    response = fetch(url, params=params, headers=headers, timeout=timeout)
+    cache.store(key, response, ttl_for(url) if ttl is None else ttl, time.perf_counter() - start)
+    response.from_cache = False
+    return response
+
+
+def counters() -> Dict[str, float]:
+    """Contadores acumulados (todos os processos); vazio com o cache desativado."""
+    return get_cache().persistent_stats() if CACHE_ENABLED else {}
+
+
+def counters_since(before: Mapping[str, float]) -> Dict[str, float]:
+    """Diferença dos contadores desde um snapshot de counters(): inclui os processos filhos."""
+    return {name: value - before.get(name, 0) for name, value in counters().items()}
+
+
+def format_stats(stats: Mapping[str, float]) -> str:
+    """Resumo de uma linha dos contadores (para os logs dos scripts de ingestão)."""
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    ratio = stats.get("hits", 0) / lookups * 100 if lookups else 0.0
+    return (f"{int(stats.get('hits', 0))} hits, {int(stats.get('misses', 0))} misses ({ratio:.1f}% hit), "
+            f"{stats.get('bytes_saved', 0) / 1024 / 1024:.1f} MB e ~{stats.get('seconds_saved', 0):.1f}s de rede poupados")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cache HTTP compartilhado da API da OMS")
+    parser.add_argument("--stats", action="store_true", help="Mostra os contadores acumulados")
+    parser.add_argument("--clear", action="store_true", help="Esvazia o cache")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+
+    cache = get_cache()
+    if args.clear:
+        cache.clear()
+        print(f"✓ Cache esvaziado: {cache.path}")
+        return
+    stats = cache.persistent_stats()
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"  Cache: {cache.path}")
+        print(f"  Entradas: {int(stats['entries']):,}  |  Tamanho: {stats['size_bytes'] / 1024 / 1024:.1f} MB "
+              f"(limite {cache.max_bytes / 1024 / 1024:.0f} MB)")
+        print(f"  {format_stats(stats)}")
+        print(f"  Evicções: {int(stats.get('evictions', 0)):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,11 @@ Verifica:
     - Existência e tamanho do banco DuckDB (dbt)
     - Contagem de linhas em cada tabela do star schema
     - Freshness (timestamp de modificação dos arquivos)
-    - Integridade referencial (FKs)
+    - Integridade referencial (FKs) e consistência entre camadas
+
+Contagens dos marts, órfãos das FKs e status de cada camada vêm da auditoria
+que o `dbt build` grava em main.audit_consistency (macros/layer_consistency.sql),
+sem recontar a fato.
 """
 
 import argparse
@@ -22,8 +26,6 @@ import sys
 import time
 from datetime import datetime, timezone
 
-import duckdb
-
 PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DBT_DIR = os.path.join(PROJECT_DIR, "dbt")
 RAW_DB = os.environ.get(
@@ -71,6 +73,32 @@ def check_raw_db() -> dict:
     return result
 
 
+def find_dbt_db() -> str | None:
+    """Procura o DuckDB gerado pelo dbt."""
+    candidates = [
+        os.environ.get("DBT_DUCKDB_PATH"),
+        os.path.join(DBT_DIR, "oms_dw.duckdb"),
+        os.path.join(DBT_DIR, "oms_dw_ci.duckdb"),
+    ]
+    for p in candidates:
+        if p and os.path.isfile(p):
+            return p
+    return None
+
+
+def load_audit(con) -> dict:
+    """Linhas de main.audit_consistency indexadas por camada ({} se o build ainda não a gravou)."""
+    exists = con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = 'main' AND table_name = 'audit_consistency'"
+    ).fetchone()[0]
+    if not exists:
+        return {}
+    cursor = con.execute("SELECT * FROM main.audit_consistency")
+    columns = [d[0] for d in cursor.description]
+    return {row["layer"]: row for row in (dict(zip(columns, r)) for r in cursor.fetchall())}
+
+
 def check_dbt_db() -> dict:
     """Verifica banco DuckDB do dbt."""
     result = {
@@ -81,18 +109,7 @@ def check_dbt_db() -> dict:
         "modified_at": None,
     }
 
-    # Procura DuckDB gerado pelo dbt
-    candidates = [
-        os.environ.get("DBT_DUCKDB_PATH"),
-        os.path.join(DBT_DIR, "oms_dw.duckdb"),
-        os.path.join(DBT_DIR, "oms_dw_ci.duckdb"),
-    ]
-    db_path = None
-    for p in candidates:
-        if p and os.path.isfile(p):
-            db_path = p
-            break
-
+    db_path = find_dbt_db()
     if not db_path:
         result["status"] = "missing"
         return result
@@ -103,13 +120,19 @@ def check_dbt_db() -> dict:
     result["modified_at"] = fmt_ts(os.path.getmtime(db_path))
 
     try:
-        con = duckdb.connect(db_path)
+        import duckdb  # importado sob demanda: quem não abre o DuckDB não paga o import
+
+        con = duckdb.connect(db_path, read_only=True)
+        audited_rows = {row["mart_model"]: row["mart_rows"] for row in load_audit(con).values()}
         tables = con.execute(
             "SELECT table_name, table_type FROM information_schema.tables "
             "WHERE table_schema = 'main' ORDER BY table_name"
         ).fetchall()
         for tbl_name, tbl_type in tables:
-            count = con.execute(f'SELECT COUNT(*) FROM main."{tbl_name}"').fetchone()[0]
+            if tbl_name in audited_rows:
+                count = audited_rows[tbl_name]
+            else:
+                count = con.execute(f'SELECT COUNT(*) FROM main."{tbl_name}"').fetchone()[0]
             result["tables"][tbl_name] = {"type": tbl_type, "rows": count}
         con.close()
     except Exception as e:
@@ -120,48 +143,38 @@ def check_dbt_db() -> dict:
 
 
 def check_referential_integrity() -> dict:
-    """Verifica FKs: toda FK na fato encontra uma PK na dimensão."""
-    result = {"status": "ok", "violations": {}}
-    db_path = None
-    candidates = [
-        os.environ.get("DBT_DUCKDB_PATH"),
-        os.path.join(DBT_DIR, "oms_dw.duckdb"),
-        os.path.join(DBT_DIR, "oms_dw_ci.duckdb"),
-    ]
-    for p in candidates:
-        if p and os.path.isfile(p):
-            db_path = p
-            break
-
+    """Verifica FKs (toda FK na fato encontra uma chave na dimensão) e a consistência entre camadas."""
+    result = {"status": "ok", "violations": {}, "inconsistent_layers": []}
+    db_path = find_dbt_db()
     if not db_path:
         result["status"] = "no_db"
         return result
 
     try:
-        con = duckdb.connect(db_path)
-        checks = [
-            ("indicator_id", "dim_indicator", "indicator_id"),
-            ("location_id", "dim_location", "location_id"),
-            ("period_id", "dim_period", "period_id"),
-            ("sex_id", "dim_sex", "sex_id"),
-        ]
-        for fk_col, dim_table, dim_col in checks:
-            violations = con.execute(
-                f"""
-                SELECT COUNT(*) AS orphans
-                FROM main.fct_observations f
-                LEFT JOIN main."{dim_table}" d
-                    ON f."{fk_col}" = d."{dim_col}"
-                WHERE d."{dim_col}" IS NULL
-            """
-            ).fetchone()[0]
-            if violations > 0:
-                result["violations"][fk_col] = violations
-                result["status"] = "violations"
+        import duckdb
+
+        con = duckdb.connect(db_path, read_only=True)
+        audit = load_audit(con)
         con.close()
     except Exception as e:
         result["status"] = "error"
         result["error"] = str(e)
+        return result
+
+    if not audit:
+        result["status"] = "no_audit"
+        result["error"] = "main.audit_consistency ausente: rode dbt build"
+        return result
+
+    result["audited_at"] = str(max(row["audited_at"] for row in audit.values()))
+    observations = audit.get("observations", {})
+    for fk in ("indicator", "location", "period", "sex"):
+        orphans = observations.get(f"orphan_{fk}_rows") or 0
+        if orphans > 0:
+            result["violations"][f"{fk}_key"] = orphans
+    result["inconsistent_layers"] = [layer for layer, row in audit.items() if row["status"] != "pass"]
+    if result["violations"] or result["inconsistent_layers"]:
+        result["status"] = "violations"
 
     return result
 
@@ -188,6 +201,8 @@ def main():
         report["overall"] = "degraded"
     if dbt["status"] != "ok":
         report["overall"] = "degraded"
+    if ref_int["status"] in ("error", "no_audit"):
+        report["overall"] = "degraded"
     if ref_int["status"] == "violations":
         report["overall"] = "violations"
 
@@ -213,12 +228,16 @@ def main():
             for tbl, info in dbt["tables"].items():
                 print(f"   └─ {tbl} ({info['type']}): {info['rows']:,} rows")
 
-        if ref_int["violations"]:
+        if ref_int.get("error"):
+            print(f"\n⚠️  Referential Integrity: {ref_int['error']}")
+        elif ref_int["violations"] or ref_int["inconsistent_layers"]:
             print(f"\n⚠️  Referential Integrity Violations:")
             for fk, cnt in ref_int["violations"].items():
                 print(f"   └─ {fk}: {cnt:,} orphans")
-        else:
-            print(f"\n✅ Referential Integrity: OK")
+            for layer in ref_int["inconsistent_layers"]:
+                print(f"   └─ camada {layer}: inconsistente (ver main.audit_consistency)")
+        elif ref_int["status"] == "ok":
+            print(f"\n✅ Referential Integrity: OK (auditoria de {ref_int['audited_at']})")
 
         print()
 
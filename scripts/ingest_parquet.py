@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""ingest_parquet.py — Ingestão da API da OMS direto para uma camada raw em Parquet (sem SQLite).
+
+Uso:
+    python3 scripts/ingest_parquet.py --category AIR                  # API → data_lake/parquet
+    python3 scripts/ingest_parquet.py --category all --workers 8
+    python3 scripts/ingest_parquet.py --from-sqlite database/who_gho.db   # exporta um banco raw existente
+    DBT_RAW_FORMAT=parquet make build                                 # dbt lê os Parquet via read_parquet
+
+Grava as mesmas 5 tabelas do schema raw, com as mesmas colunas e ids:
+
+    data_lake/parquet/dim_indicators/part-0000.parquet
+    data_lake/parquet/dim_locations/part-0000.parquet
+    data_lake/parquet/dim_periods/part-0000.parquet
+    data_lake/parquet/dim_sex/part-0000.parquet
+    data_lake/parquet/fact_observations/indicator_id=12/part-0000.parquet
+
+A fato é particionada por indicador no estilo Hive (a coluna indicator_id vem
+do diretório) e cada partição é escrita em record batches Arrow. Recarregar
+um indicador substitui a sua partição de forma atômica, preservando o
+observation_id de cada chave natural (indicador, local, período, sexo), como
+o upsert de populate_database.py. Os ids das dimensões são estáveis entre
+execuções: os membros existentes são relidos dos Parquet e os novos recebem
+o próximo id livre.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+import gho_client
+from populate_database import (
+    ALL_CATEGORIES,
+    DEFAULT_BATCH_SIZE,
+    INDICATORS_PATH,
+    ParsedObservation,
+    fetch_indicator_observations,
+    iter_indicator_rows,
+)
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PARQUET_DIR = os.environ.get("DBT_RAW_PARQUET_DIR", os.path.join(PROJECT_DIR, "data_lake", "parquet"))
+PART_NAME = "part-0000.parquet"
+FACT_TABLE = "fact_observations"
+SEX_DATA = [("MLE", "Male"), ("FMLE", "Female"), ("BTSX", "Both sexes")]
+
+# Schemas das dimensões: mesmas colunas do banco SQLite raw
+DIM_SCHEMAS: Dict[str, pa.Schema] = {
+    "dim_indicators": pa.schema([("indicator_id", pa.int64()), ("indicator_code", pa.string()),
+                                 ("indicator_name", pa.string()), ("category", pa.string())]),
+    "dim_locations": pa.schema([("location_id", pa.int64()), ("country_code", pa.string()),
+                                ("country_name", pa.string()), ("region_code", pa.string())]),
+    "dim_periods": pa.schema([("period_id", pa.int64()), ("year", pa.int64())]),
+    "dim_sex": pa.schema([("sex_id", pa.int64()), ("sex_code", pa.string()), ("sex_name", pa.string())]),
+}
+# indicator_id não é gravado no arquivo: vem da partição indicator_id=N
+# updated_at: momento (UTC) em que a observação entrou ou mudou de valor, como no banco SQLite raw
+FACT_SCHEMA = pa.schema([("observation_id", pa.int64()), ("location_id", pa.int64()), ("period_id", pa.int64()),
+                         ("sex_id", pa.int64()), ("value", pa.float64()), ("updated_at", pa.timestamp("ms"))])
+
+# Chave natural da fato dentro de uma partição: (location_id, period_id, sex_id ou 0)
+NaturalKey = Tuple[int, int, int]
+
+
+def table_path(base_dir: str, table: str) -> str:
+    return os.path.join(base_dir, table, PART_NAME)
+
+
+def fact_partition_path(base_dir: str, indicator_id: int) -> str:
+    return os.path.join(base_dir, FACT_TABLE, f"indicator_id={indicator_id}", PART_NAME)
+
+
+def partition_files(base_dir: str, indicator_id: Optional[int] = None) -> List[str]:
+    """Arquivos Parquet da fato (de um indicador ou de todos), inclusive os gravados pelo DuckDB."""
+    partition = f"indicator_id={indicator_id}" if indicator_id is not None else "indicator_id=*"
+    return sorted(glob.glob(os.path.join(base_dir, FACT_TABLE, partition, "*.parquet")))
+
+
+def write_table_atomic(path: str, table: pa.Table) -> None:
+    """Grava uma tabela Arrow em Parquet (ZSTD) via arquivo temporário + rename."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+class ParquetDimensions:
+    """Dimensões do schema raw mantidas em memória e persistidas como Parquet.
+
+    Equivalente a DimensionKeyCache para a camada Parquet: os membros existentes são lidos
+    uma vez, os ausentes recebem o próximo id na ordem em que aparecem e save() regrava as
+    quatro tabelas.
+    """
+
+    # tabela → coluna de código (a primeira coluna do schema é o id)
+    CODE_COLUMNS: Dict[str, str] = {
+        "dim_indicators": "indicator_code",
+        "dim_locations": "country_code",
+        "dim_periods": "year",
+        "dim_sex": "sex_code",
+    }
+
+    def __init__(self, base_dir: str) -> None:
+        self.base_dir = base_dir
+        # tabela → código → linha completa (id, código, demais colunas)
+        self.rows: Dict[str, Dict[Any, List[Any]]] = {}
+        self.next_id: Dict[str, int] = {}
+        self.created = 0
+        for table, schema in DIM_SCHEMAS.items():
+            path = table_path(base_dir, table)
+            existing = pq.read_table(path, schema=schema).to_pylist() if os.path.isfile(path) else []
+            code_column = self.CODE_COLUMNS[table]
+            self.rows[table] = {row[code_column]: list(row.values()) for row in existing}
+            self.next_id[table] = max((row[0] for row in self.rows[table].values()), default=0) + 1
+        for code, name in SEX_DATA:
+            self._get_or_create("dim_sex", code, [name])
+
+    def _get_or_create(self, table: str, code: Any, extra: Optional[List[Any]] = None) -> int:
+        row = self.rows[table].get(code)
+        if row is None:
+            width = len(DIM_SCHEMAS[table]) - 2
+            row = [self.next_id[table], code, *(extra or [None] * width)]
+            self.rows[table][code] = row
+            self.next_id[table] += 1
+            self.created += 1
+        return row[0]
+
+    def upsert_indicators(self, indicators: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> int:
+        """Insere indicadores novos e atualiza nome/categoria dos existentes; retorna as linhas lidas."""
+        count = 0
+        for code, name, category in indicators:
+            self._get_or_create("dim_indicators", code)
+            self.rows["dim_indicators"][code][2:] = [name, category]
+            count += 1
+        return count
+
+    def indicators(self, categories: Sequence[str]) -> List[Tuple[int, str]]:
+        """(indicator_id, indicator_code) das categorias pedidas ('all' = todas)."""
+        return [
+            (row[0], code) for code, row in self.rows["dim_indicators"].items()
+            if ALL_CATEGORIES in categories or row[3] in categories
+        ]
+
+    def resolve(self, rows: List[ParsedObservation]) -> List[Tuple[int, int, Optional[int], float]]:
+        """Converte observações interpretadas em (location_id, period_id, sex_id, value)."""
+        return [
+            (
+                self._get_or_create("dim_locations", country_code),
+                self._get_or_create("dim_periods", year),
+                self._get_or_create("dim_sex", sex_code) if sex_code else None,
+                value,
+            )
+            for country_code, year, sex_code, value in rows
+        ]
+
+    def save(self) -> None:
+        for table, schema in DIM_SCHEMAS.items():
+            rows = sorted(self.rows[table].values(), key=lambda row: row[0])
+            columns = list(zip(*rows)) if rows else [[] for _ in schema]
+            write_table_atomic(table_path(self.base_dir, table),
+                               pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(columns, schema)],
+                                                    schema=schema))
+
+
+def max_observation_id(base_dir: str) -> int:
+    """Maior observation_id da fato, lido das estatísticas dos row groups (sem ler os dados)."""
+    highest = 0
+    for path in partition_files(base_dir):
+        metadata = pq.ParquetFile(path).metadata
+        column = metadata.schema.names.index("observation_id")
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column).statistics
+            if stats is not None and stats.has_min_max:
+                highest = max(highest, stats.max)
+    return highest
+
+
+def write_fact_partition(base_dir: str, indicator_id: int, keyed_rows: List[Tuple[int, int, Optional[int], float]],
+                         next_observation_id: int, batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, int]:
+    """Regrava a partição do indicador em record batches Arrow, preservando os observation_id.
+
+    Observações repetidas pela chave natural no mesmo payload ficam com o último valor, como no
+    upsert do SQLite. updated_at só avança para observações novas ou com valor alterado.
+
+    Retorna:
+        Tuple[int, int]: (linhas gravadas, próximo observation_id livre).
+    """
+    path = fact_partition_path(base_dir, indicator_id)
+    old_files = partition_files(base_dir, indicator_id)
+    previous: Dict[NaturalKey, Tuple[int, float, Optional[datetime]]] = {}
+    for old_path in old_files:
+        old_table = pq.read_table(old_path)
+        old = old_table.to_pydict()
+        # Partições gravadas antes da coluna updated_at não a têm
+        old_updated = old.get("updated_at", [None] * old_table.num_rows)
+        previous.update(
+            ((location_id, period_id, sex_id or 0), (observation_id, value, updated_at))
+            for observation_id, location_id, period_id, sex_id, value, updated_at in zip(
+                old["observation_id"], old["location_id"], old["period_id"], old["sex_id"], old["value"], old_updated)
+        )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    latest: Dict[NaturalKey, Tuple[int, int, Optional[int], float]] = {}
+    for location_id, period_id, sex_id, value in keyed_rows:
+        latest[(location_id, period_id, sex_id or 0)] = (location_id, period_id, sex_id, value)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    items = list(latest.items())
+    with pq.ParquetWriter(tmp_path, FACT_SCHEMA, compression="zstd") as writer:
+        for start in range(0, len(items), batch_size):
+            observation_ids: List[int] = []
+            updated: List[datetime] = []
+            for key, (_, _, _, value) in items[start:start + batch_size]:
+                observation_id, old_value, updated_at = previous.get(key, (None, None, None))
+                if observation_id is None:
+                    observation_id, next_observation_id = next_observation_id, next_observation_id + 1
+                observation_ids.append(observation_id)
+                updated.append(updated_at if old_value == value and updated_at is not None else now)
+            location_ids, period_ids, sex_ids, values = zip(*(row for _, row in items[start:start + batch_size]))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(observation_ids, pa.int64()), pa.array(location_ids, pa.int64()),
+                 pa.array(period_ids, pa.int64()), pa.array(sex_ids, pa.int64()), pa.array(values, pa.float64()),
+                 pa.array(updated, pa.timestamp("ms"))],
+                schema=FACT_SCHEMA,
+            ))
+    os.replace(tmp_path, path)
+    for old_path in old_files:
+        if old_path != path:
+            os.remove(old_path)
+    return len(items), next_observation_id
+
+
+def _fetch(indicator_code: str) -> Optional[List[ParsedObservation]]:
+    try:
+        return fetch_indicator_observations(indicator_code)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Erro ao buscar o indicador {indicator_code}: {e}")
+        return None
+
+
+def ingest(categories: Sequence[str], base_dir: str = PARQUET_DIR, indicators_path: str = INDICATORS_PATH,
+           workers: int = 8, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Busca as observações das categorias pedidas e grava a camada raw em Parquet.
+
+    As requisições rodam em um pool de threads; a thread principal resolve as chaves e grava
+    cada partição. Indicadores cuja busca falha mantêm a partição anterior.
+    """
+    stats: Dict[str, Any] = {"indicators": 0, "failed": 0, "rows": 0}
+    start = time.perf_counter()
+    cache_before = gho_client.counters()
+    dims = ParquetDimensions(base_dir)
+    stats["indicator_rows"] = dims.upsert_indicators(iter_indicator_rows(indicators_path))
+    indicators = dims.indicators(categories)
+    logging.info(f"Encontrados {len(indicators)} indicadores para a(s) categoria(s) {', '.join(categories)}.")
+
+    next_observation_id = max_observation_id(base_dir) + 1
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for (indicator_id, code), rows in zip(indicators, executor.map(_fetch, (code for _, code in indicators))):
+                if rows is None:
+                    stats["failed"] += 1
+                    continue
+                written, next_observation_id = write_fact_partition(
+                    base_dir, indicator_id, dims.resolve(rows), next_observation_id, batch_size)
+                stats["indicators"] += 1
+                stats["rows"] += written
+    finally:
+        # Grava as dimensões mesmo após uma falha, para que as partições já escritas não fiquem órfãs
+        dims.save()
+
+    elapsed = time.perf_counter() - start
+    stats["dimension_members_created"] = dims.created
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["rows_per_s"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+    if gho_client.CACHE_ENABLED:
+        stats["http_cache"] = gho_client.format_stats(gho_client.counters_since(cache_before))
+    return stats
+
+
+def export_sqlite(db_path: str, base_dir: str = PARQUET_DIR) -> Dict[str, int]:
+    """Exporta um banco SQLite raw existente para o mesmo layout Parquet (via DuckDB).
+
+    A fato é regravada por inteiro; partições de indicadores que não existem mais são removidas.
+
+    Retorna:
+        Dict[str, int]: Linhas exportadas por tabela.
+    """
+    import duckdb
+
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(f"Banco raw não encontrado: {db_path}")
+    con = duckdb.connect()
+    counts: Dict[str, int] = {}
+    try:
+        con.execute(f"ATTACH '{db_path}' AS raw_db (TYPE SQLITE, READ_ONLY)")
+        for table, schema in DIM_SCHEMAS.items():
+            path = table_path(base_dir, table)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            columns = ", ".join(f"CAST({f.name} AS {'BIGINT' if pa.types.is_integer(f.type) else 'VARCHAR'}) AS {f.name}"
+                                for f in schema)
+            con.execute(f"COPY (SELECT {columns} FROM raw_db.{table} ORDER BY 1) TO '{path}' "
+                        f"(FORMAT PARQUET, COMPRESSION ZSTD)")
+            counts[table] = con.execute(f"SELECT COUNT(*) FROM raw_db.{table}").fetchone()[0]
+
+        fact_dir = os.path.join(base_dir, FACT_TABLE)
+        shutil.rmtree(fact_dir, ignore_errors=True)
+        con.execute(f"""
+            COPY (
+                SELECT CAST(observation_id AS BIGINT) AS observation_id, CAST(location_id AS BIGINT) AS location_id,
+                       CAST(period_id AS BIGINT) AS period_id, CAST(sex_id AS BIGINT) AS sex_id,
+                       CAST(value AS DOUBLE) AS value, CAST(updated_at AS TIMESTAMP_MS) AS updated_at,
+                       CAST(indicator_id AS BIGINT) AS indicator_id
+                FROM raw_db.{FACT_TABLE}
+                ORDER BY indicator_id, observation_id
+            ) TO '{fact_dir}' (FORMAT PARQUET, COMPRESSION ZSTD, PARTITION_BY (indicator_id), FILENAME_PATTERN 'part-000{{i}}')
+        """)
+        counts[FACT_TABLE] = con.execute(f"SELECT COUNT(*) FROM raw_db.{FACT_TABLE}").fetchone()[0]
+    finally:
+        con.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingestão da API da OMS direto para Parquet (camada raw do dbt)")
+    parser.add_argument("--category", nargs="+", default=["AIR"],
+                        help="Categoria(s) de indicadores a carregar, ou 'all' (default: AIR)")
+    parser.add_argument("--parquet-dir", default=PARQUET_DIR,
+                        help="Diretório da camada raw em Parquet (default: $DBT_RAW_PARQUET_DIR ou data_lake/parquet)")
+    parser.add_argument("--indicators-file", default=INDICATORS_PATH,
+                        help="CSV (ou .parquet) categorizado de indicadores")
+    parser.add_argument("--workers", type=int, default=8, help="Requisições simultâneas")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Linhas por record batch")
+    parser.add_argument("--from-sqlite", metavar="DB_PATH", default=None,
+                        help="Em vez da API, exporta um banco SQLite raw existente para Parquet")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        if args.from_sqlite:
+            stats: Dict[str, Any] = export_sqlite(args.from_sqlite, args.parquet_dir)
+        else:
+            stats = ingest(args.category, args.parquet_dir, args.indicators_file, args.workers, args.batch_size)
+    except FileNotFoundError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    elif args.from_sqlite:
+        print("✓ Exportado: " + ", ".join(f"{table}={count:,}" for table, count in stats.items()))
+        print(f"✓ Camada raw Parquet: {args.parquet_dir}")
+    else:
+        print(f"✓ {stats['indicators']} indicadores ({stats['failed']} falhas), {stats['rows']:,} observações "
+              f"em {stats['elapsed_s']}s — {stats['rows_per_s']:,.0f} linhas/s")
+        print(f"✓ Camada raw Parquet: {args.parquet_dir}")
+        if "http_cache" in stats:
+            print(f"✓ Cache HTTP: {stats['http_cache']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,65 +3,47 @@
 
 Uso:
     python3 scripts/init_test_db.py [--db-path database/who_gho.db]
+    python3 scripts/init_test_db.py --rows 10000000 --indicators 500 --countries 194 --years 40 --seed 7
 
 Cria as 5 tabelas do schema OMS (dim_indicators, dim_locations, dim_periods,
 dim_sex, fact_observations) e popula com dados sintéticos mínimos que passam
 nos testes dbt (unique, not_null, relationships, accepted_values).
 
+Com --rows, gera um banco raw realista do tamanho pedido (de milhares a
+centenas de milhões de observações) para capacity planning: indicadores de
+várias categorias com volumes desiguais, países distribuídos entre as regiões
+da OMS, séries anuais com tendência por indicador e ruído, e chaves naturais
+únicas por indicador. A geração é vetorizada (numpy) e feita em blocos, com
+inserção em lote; a memória depende de --batch-size, não de --rows. A mesma
+--seed gera sempre o mesmo banco.
+
 Atenção: Sobrescreve o banco existente. Use apenas em CI ou setup local limpo.
 """
 
 import argparse
+import itertools
 import os
 import sqlite3
 import sys
+import time
+from typing import Iterator, List, Optional, Tuple
 
+from create_database import FACT_INSERT_STATEMENTS, analyze_after_load, migrate, schema_variant
 
-def create_tables(cursor: sqlite3.Cursor) -> None:
-    """Cria as 5 tabelas do schema OMS."""
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dim_indicators (
-            indicator_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            indicator_code TEXT UNIQUE,
-            indicator_name TEXT,
-            category TEXT
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dim_locations (
-            location_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            country_code TEXT UNIQUE,
-            country_name TEXT,
-            region_code TEXT
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dim_periods (
-            period_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            year INTEGER UNIQUE
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dim_sex (
-            sex_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sex_code TEXT UNIQUE,
-            sex_name TEXT
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS fact_observations (
-            observation_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            indicator_id INTEGER,
-            location_id INTEGER,
-            period_id INTEGER,
-            sex_id INTEGER,
-            value REAL,
-            FOREIGN KEY (indicator_id) REFERENCES dim_indicators(indicator_id),
-            FOREIGN KEY (location_id) REFERENCES dim_locations(location_id),
-            FOREIGN KEY (period_id) REFERENCES dim_periods(period_id),
-            FOREIGN KEY (sex_id) REFERENCES dim_sex(sex_id)
-        )
-    """)
+SYNTHETIC_CATEGORIES = ["NCD", "AIR", "WSH", "TB", "HIV", "MALARIA", "SDG", "NUTRITION"]
+WHO_REGIONS = ["AFR", "AMR", "SEAR", "EUR", "EMR", "WPR"]
+SEX_DATA = [("MLE", "Male"), ("FMLE", "Female"), ("BTSX", "Both sexes")]
+LAST_YEAR = 2023
+DEFAULT_GENERATOR_BATCH = 100_000
+
+
+def create_tables(cursor: sqlite3.Cursor, variant: Optional[str] = None) -> None:
+    """Cria as 5 tabelas do schema OMS e seus índices, aplicando as migrações de create_database.
+
+    variant escolhe o schema de um banco novo: 'standard' (default) ou 'compact'
+    (ver create_database.SCHEMA_VARIANTS).
+    """
+    migrate(cursor.connection, variant)
 
 
 def populate_dim_tables(cursor: sqlite3.Cursor) -> dict:
@@ -134,11 +116,10 @@ def populate_fact_table(cursor: sqlite3.Cursor, ids: dict) -> None:
         ("AIR_1", "USA", 2020, "FMLE", 38.9),
         ("AIR_1", "GBR", 2020, "BTSX", 42.1),
     ]
+    insert_sql = FACT_INSERT_STATEMENTS[schema_variant(cursor.connection)]
     for ind_code, loc_code, year, sex_code, value in facts:
         cursor.execute(
-            """INSERT INTO fact_observations
-               (indicator_id, location_id, period_id, sex_id, value)
-               VALUES (?, ?, ?, ?, ?)""",
+            insert_sql,
             (
                 ids["indicator_ids"][ind_code],
                 ids["location_ids"][loc_code],
@@ -149,6 +130,150 @@ def populate_fact_table(cursor: sqlite3.Cursor, ids: dict) -> None:
         )
 
 
+def country_codes(n: int) -> List[str]:
+    """n códigos de 3 letras (AAA, AAB, ...), no formato ISO3166-1-Alpha-3 usado pela OMS."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return ["".join(code) for code in itertools.islice(itertools.product(letters, repeat=3), n)]
+
+
+def populate_synthetic_dimensions(cursor: sqlite3.Cursor, n_indicators: int, n_countries: int,
+                                  n_years: int) -> None:
+    """Dimensões sintéticas com ids explícitos 1..n, usados diretamente pelo gerador da fato."""
+    cursor.executemany(
+        "INSERT INTO dim_indicators (indicator_id, indicator_code, indicator_name, category) VALUES (?, ?, ?, ?)",
+        [
+            (i + 1, f"{category}_SYN{i:05d}", f"Synthetic {category} indicator {i}", category)
+            for i, category in ((i, SYNTHETIC_CATEGORIES[i % len(SYNTHETIC_CATEGORIES)]) for i in range(n_indicators))
+        ],
+    )
+    cursor.executemany(
+        "INSERT INTO dim_locations (location_id, country_code, country_name, region_code) VALUES (?, ?, ?, ?)",
+        [
+            (i + 1, code, f"Country {code}", WHO_REGIONS[i % len(WHO_REGIONS)])
+            for i, code in enumerate(country_codes(n_countries))
+        ],
+    )
+    first_year = LAST_YEAR - n_years + 1
+    cursor.executemany(
+        "INSERT INTO dim_periods (period_id, year) VALUES (?, ?)",
+        [(i + 1, first_year + i) for i in range(n_years)],
+    )
+    cursor.executemany(
+        "INSERT INTO dim_sex (sex_id, sex_code, sex_name) VALUES (?, ?, ?)",
+        [(i + 1, code, name) for i, (code, name) in enumerate(SEX_DATA)],
+    )
+
+
+def allocate_rows(rng, n_rows: int, n_indicators: int, capacity: int):
+    """Distribui n_rows entre os indicadores com pesos log-normais (poucos indicadores grandes,
+    muitos pequenos), respeitando o máximo de chaves distintas de cada um."""
+    import numpy as np
+
+    weights = rng.lognormal(mean=0.0, sigma=1.0, size=n_indicators)
+    counts = np.minimum(np.floor(weights / weights.sum() * n_rows).astype(np.int64), capacity)
+    deficit = n_rows - int(counts.sum())
+    while deficit > 0:
+        open_slots = np.flatnonzero(counts < capacity)
+        share = np.minimum(capacity - counts[open_slots], -(-deficit // len(open_slots)))
+        share = share[:int(np.searchsorted(np.cumsum(share), deficit)) + 1]
+        share[-1] -= max(0, int(share.sum()) - deficit)
+        counts[open_slots[:len(share)]] += share
+        deficit -= int(share.sum())
+    return counts
+
+
+def iter_synthetic_facts(n_rows: int, n_indicators: int, n_countries: int, n_years: int, seed: int,
+                         batch_size: int = DEFAULT_GENERATOR_BATCH) -> Iterator[Tuple]:
+    """Gera a fato em blocos de ~batch_size linhas: (indicator_id, location_id, period_id, sex_id, value).
+
+    Cada indicador sorteia, sem reposição, as suas chaves (país, ano, sexo); o valor combina um
+    nível base do indicador, um fator do país, uma tendência anual e ruído log-normal.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n_sex = len(SEX_DATA)
+    capacity = n_countries * n_years * n_sex
+    counts = allocate_rows(rng, n_rows, n_indicators, capacity)
+    base = rng.lognormal(mean=3.0, sigma=1.5, size=n_indicators)
+    trend = rng.normal(loc=0.0, scale=0.02, size=n_indicators)
+    country_factor = rng.lognormal(mean=0.0, sigma=0.4, size=n_countries)
+    sex_factor = np.array([1.08, 0.93, 1.0])
+
+    pending: List[Tuple] = []
+    pending_rows = 0
+    for indicator, count in enumerate(counts):
+        if count == 0:
+            continue
+        keys = np.sort(rng.choice(capacity, size=int(count), replace=False))
+        location, rest = np.divmod(keys, n_years * n_sex)
+        period, sex = np.divmod(rest, n_sex)
+        value = (base[indicator] * country_factor[location] * sex_factor[sex]
+                 * (1.0 + trend[indicator]) ** period * rng.lognormal(0.0, 0.1, size=keys.size))
+        pending.append((np.full(keys.size, indicator + 1), location + 1, period + 1, sex + 1, np.round(value, 3)))
+        pending_rows += keys.size
+        if pending_rows >= batch_size:
+            yield tuple(np.concatenate(column) for column in zip(*pending))
+            pending, pending_rows = [], 0
+    if pending:
+        yield tuple(np.concatenate(column) for column in zip(*pending))
+
+
+def generate_database(conn: sqlite3.Connection, n_rows: int, n_indicators: int, n_countries: int,
+                      n_years: int, seed: int, batch_size: int = DEFAULT_GENERATOR_BATCH,
+                      variant: Optional[str] = None) -> dict:
+    """Popula um banco recém-criado com n_rows observações sintéticas; retorna contagens e vazão.
+
+    O banco é descartável durante a carga (journal e fsync desligados) e os índices da fato são
+    criados só ao final, de uma vez. Na variante compacta a fato é a própria árvore da chave
+    natural, alimentada em ordem (o gerador emite as chaves ordenadas).
+    """
+    capacity = n_indicators * n_countries * n_years * len(SEX_DATA)
+    if n_rows > capacity:
+        raise ValueError(
+            f"--rows {n_rows:,} excede as {capacity:,} chaves distintas possíveis "
+            f"(indicadores × países × anos × sexos); aumente --indicators, --countries ou --years."
+        )
+    start = time.perf_counter()
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    cursor = conn.cursor()
+    create_tables(cursor, variant)
+    insert_sql = FACT_INSERT_STATEMENTS[schema_variant(conn)]
+    # Os índices da fato são construídos uma vez, sobre a tabela já carregada
+    fact_indexes = cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'fact_observations' AND sql IS NOT NULL"
+    ).fetchall()
+    for name, _ in fact_indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    populate_synthetic_dimensions(cursor, n_indicators, n_countries, n_years)
+
+    written = 0
+    for indicator_id, location_id, period_id, sex_id, value in iter_synthetic_facts(
+            n_rows, n_indicators, n_countries, n_years, seed, batch_size):
+        cursor.executemany(
+            insert_sql,
+            zip(indicator_id.tolist(), location_id.tolist(), period_id.tolist(), sex_id.tolist(), value.tolist()),
+        )
+        written += len(indicator_id)
+        conn.commit()
+    for _, sql in fact_indexes:
+        cursor.execute(sql)
+    conn.commit()
+    analyze_after_load(conn, written)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": written,
+        "indicators": n_indicators,
+        "countries": n_countries,
+        "years": n_years,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(written / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Cria banco SQLite de teste para CI do projeto OMS"
@@ -158,7 +283,21 @@ def main() -> None:
         default=None,
         help="Caminho para o arquivo .db (default: database/who_gho.db relativo ao script)",
     )
+    parser.add_argument("--compact", action="store_true",
+                        help="Schema compacto: tabelas STRICT, sem AUTOINCREMENT, fato WITHOUT ROWID")
+    parser.add_argument("--rows", type=int, default=0,
+                        help="Modo gerador: observações sintéticas na fato (default: fixture de 10 linhas)")
+    parser.add_argument("--indicators", type=int, default=200, help="Indicadores no modo gerador")
+    parser.add_argument("--countries", type=int, default=194, help="Países no modo gerador")
+    parser.add_argument("--years", type=int, default=30, help=f"Anos no modo gerador (até {LAST_YEAR})")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do modo gerador")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_GENERATOR_BATCH,
+                        help="Linhas por bloco gerado/inserido no modo gerador")
     args = parser.parse_args()
+    if args.rows and min(args.indicators, args.countries, args.years) < 1:
+        parser.error("--indicators, --countries e --years devem ser positivos")
+    if args.countries > 26 ** 3:
+        parser.error(f"--countries suporta no máximo {26 ** 3} códigos de 3 letras")
 
     if args.db_path:
         db_path = args.db_path
@@ -173,10 +312,25 @@ def main() -> None:
     if os.path.exists(db_path):
         os.remove(db_path)
 
+    variant = "compact" if args.compact else None
     conn = sqlite3.connect(db_path)
+    if args.rows:
+        try:
+            stats = generate_database(conn, args.rows, args.indicators, args.countries, args.years,
+                                      args.seed, args.batch_size, variant)
+        except ValueError as e:
+            conn.close()
+            os.remove(db_path)
+            parser.error(str(e))
+        conn.close()
+        print(f"✓ Banco sintético criado: {db_path} ({os.path.getsize(db_path) / (1024 * 1024):,.1f} MB)")
+        print(f"  {stats['indicators']} indicadores × {stats['countries']} países × {stats['years']} anos")
+        print(f"  Linhas na fato: {stats['rows']:,} em {stats['elapsed_s']}s — {stats['rows_per_s']:,.0f} linhas/s")
+        return
+
     cursor = conn.cursor()
 
-    create_tables(cursor)
+    create_tables(cursor, variant)
     ids = populate_dim_tables(cursor)
     populate_fact_table(cursor, ids)
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""oms.py — Ponto de entrada único para os scripts do pipeline OMS.
+
+Uso:
+    python3 scripts/oms.py --help                      # lista os subcomandos
+    python3 scripts/oms.py health --json               # = scripts/health_check.py --json
+    python3 scripts/oms.py contracts --ci              # = scripts/data_contracts.py --ci
+    python3 scripts/oms.py populate --category AIR --async
+    python3 scripts/oms.py --profile-imports health    # custo de import por módulo (stderr)
+
+Cada subcomando é o script correspondente de scripts/, executado como
+__main__ e com os mesmos argumentos. O módulo só é importado quando o
+subcomando é escolhido, então `oms lineage` não carrega duckdb nem pandas.
+Com --profile-imports o subcomando roda sob `python -X importtime` e, ao
+final, os módulos mais caros (tempo próprio e acumulado) são listados em
+stderr, sem misturar com a saída normal (ex: --json).
+"""
+
+import os
+import re
+import runpy
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# subcomando → (módulo em scripts/, descrição)
+SUBCOMMANDS: Dict[str, Tuple[str, str]] = {
+    "health": ("health_check", "Verificação de integridade do pipeline"),
+    "contracts": ("data_contracts", "Validação de contratos de dados entre camadas"),
+    "reconcile": ("reconciliation", "Reconciliação cross-camada (raw vs staging vs marts)"),
+    "lineage": ("lineage_report", "Linhagem de dados a partir do manifest.json do dbt"),
+    "create-db": ("create_database", "Criação/migração versionada do schema do banco SQLite raw"),
+    "populate": ("populate_database", "Ingestão da API da OMS no banco SQLite raw"),
+    "categorize": ("categorize_indicators", "Categorização do catálogo de indicadores"),
+    "enrich": ("enrich_locations", "Enriquecimento de dim_locations (países e regiões)"),
+    "lake-ingest": ("simulate_data_lake_ingestion", "Ingestão da API no Data Lake local"),
+    "lake-replay": ("replay_data_lake", "Reconstrução do banco raw a partir do Data Lake"),
+    "parquet-ingest": ("ingest_parquet", "Ingestão da API direto para a camada raw em Parquet"),
+    "dedup": ("dedup_fact_observations", "Remoção de observações duplicadas pela chave natural"),
+    "init-test-db": ("init_test_db", "Criação do banco SQLite de teste"),
+    "cache": ("gho_client", "Estatísticas e limpeza do cache HTTP da API"),
+    "api-stub": ("gho_api_stub", "Stand-in local da API OData da OMS"),
+    "bench-load": ("benchmark_fact_load", "Benchmark das estratégias de carga da fato"),
+    "bench-raw-layout": ("benchmark_raw_layout", "Benchmark do dbt build: raw SQLite vs Parquet"),
+    "bench-raw-schema": ("benchmark_raw_schema", "Benchmark do banco raw: schema padrão vs compacto"),
+    "bench-incremental": ("benchmark_incremental", "Benchmark do fct_observations incremental por delta"),
+    "bench-keys": ("benchmark_surrogate_keys", "Benchmark das chaves surrogate dos marts: int64 vs MD5"),
+    "bench-dashboard": ("benchmark_dashboard", "Benchmark do dashboard: agregados agg_* vs consultas na fato"),
+    "bench-pipeline": ("benchmark_pipeline", "Benchmark ponta a ponta do pipeline com baseline"),
+}
+
+PROFILE_TOP = 15
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def usage() -> str:
+    width = max(len(name) for name in SUBCOMMANDS)
+    lines = [
+        "uso: oms.py [--profile-imports] <subcomando> [argumentos...]",
+        "",
+        "Subcomandos:",
+        *(f"  {name:<{width}}  {description}" for name, (_, description) in SUBCOMMANDS.items()),
+        "",
+        "Use `oms.py <subcomando> --help` para as opções de cada um.",
+    ]
+    return "\n".join(lines)
+
+
+def run_subcommand(name: str, argv: List[str]) -> None:
+    """Executa o script do subcomando como __main__ no processo atual, importando-o só agora."""
+    module, _ = SUBCOMMANDS[name]
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    sys.argv = [f"oms {name}", *argv]
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def parse_importtime(stderr: str) -> Tuple[List[Tuple[str, int, int, int]], List[str]]:
+    """Separa as linhas de -X importtime do resto do stderr.
+
+    Retorna:
+        Tuple: ([(módulo, próprio µs, acumulado µs, nível)], linhas restantes do stderr).
+    """
+    modules: List[Tuple[str, int, int, int]] = []
+    passthrough: List[str] = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+        elif not line.startswith("import time:"):
+            passthrough.append(line)
+    return modules, passthrough
+
+
+def format_import_profile(modules: List[Tuple[str, int, int, int]], top: int = PROFILE_TOP) -> str:
+    # Os imports de nível 0 (sem indentação no relatório do -X importtime) somam o custo total
+    total_us = sum(cumulative for _, _, cumulative, level in modules if level == 0)
+    lines = [f"Imports: {len(modules)} módulos, {total_us / 1000:,.1f} ms acumulados (top {top})",
+             f"  {'acumulado ms':>12}  {'próprio ms':>10}  módulo"]
+    for name, self_us, cumulative_us, _ in sorted(modules, key=lambda m: m[2], reverse=True)[:top]:
+        lines.append(f"  {cumulative_us / 1000:>12,.1f}  {self_us / 1000:>10,.1f}  {name}")
+    return "\n".join(lines)
+
+
+def profile_subcommand(name: str, argv: List[str]) -> int:
+    """Reexecuta o subcomando sob -X importtime e relata o custo de import por módulo."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), name, *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    modules, passthrough = parse_importtime(result.stderr)
+    if passthrough:
+        print("\n".join(passthrough), file=sys.stderr)
+    print(format_import_profile(modules), file=sys.stderr)
+    return result.returncode
+
+
+def main(argv: List[str]) -> None:
+    profile = False
+    if argv and argv[0] == "--profile-imports":
+        profile, argv = True, argv[1:]
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    name, rest = argv[0], argv[1:]
+    if name not in SUBCOMMANDS:
+        print(f"✗ subcomando desconhecido: {name}\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+    if profile:
+        sys.exit(profile_subcommand(name, rest))
+    run_subcommand(name, rest)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,54 +1,153 @@
+import time
+# Marca o início do carregamento do módulo, para medir o custo de startup (imports)
+_MODULE_START: float = time.perf_counter()
+
+import argparse
+import asyncio
+import csv
+import hashlib
 import sqlite3
-import pandas as pd
 import os
 import requests
 import traceback
 import logging # Importa o módulo logging
-from typing import List, Tuple, Dict, Any, Optional # Importa tipos para type hinting
-
-# Configuração básica do logger
-logging.basicConfig(
-    level=logging.INFO, # Define o nível mínimo de mensagens a serem registradas
-    format='%(asctime)s - %(levelname)s - %(message)s', # Formato da mensagem
-    handlers=[
-        logging.FileHandler("populate_database.log"), # Salva logs em arquivo
-        logging.StreamHandler() # Exibe logs no console
-    ]
-)
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Dict, Any, Optional, TypeVar, Union # Importa tipos para type hinting
+
+import gho_client
+from create_database import (DuplicateFactsError, analyze_after_load, create_fact_natural_key, fact_upsert_sql,
+                             migrate, schema_variant)
+from gho_client import GHO_API_URL
+
+VALID_SEX_CODES: Tuple[str, ...] = ('MLE', 'FMLE', 'BTSX')
+
+# Observação já interpretada: (country_code, year, sex_code, value)
+ParsedObservation = Tuple[str, int, Optional[str], float]
+
+# Upsert pela chave natural: recargas atualizam o valor no lugar, preservando o observation_id
+# (schema padrão; FactBulkLoader usa o da variante do banco, ver create_database.SCHEMA_VARIANTS)
+FACT_INSERT_SQL: str = fact_upsert_sql('standard')
+
+# Valor de --category que seleciona todas as categorias presentes em dim_indicators
+ALL_CATEGORIES: str = 'all'
+
+DEFAULT_BATCH_SIZE: int = 10_000
+
+# Tentativas de um indicador com falha transitória em uma mesma execução antes de desistir dele
+MAX_INDICATOR_ATTEMPTS: int = 3
+DEFAULT_PAGE_SIZE: int = 1_000
+
+T = TypeVar('T')
+
+def configure_logging() -> None:
+    """Configuração básica do logger, feita só ao executar o script.
+
+    Importar o módulo (ingest_parquet, replay_data_lake, benchmarks) não cria
+    populate_database.log nem altera o logging de quem importa.
+    """
+    logging.basicConfig(
+        level=logging.INFO, # Define o nível mínimo de mensagens a serem registradas
+        format='%(asctime)s - %(levelname)s - %(message)s', # Formato da mensagem
+        handlers=[
+            logging.FileHandler("populate_database.log"), # Salva logs em arquivo
+            logging.StreamHandler() # Exibe logs no console
+        ]
+    )
 
 def get_db_connection() -> sqlite3.Connection:
     """Cria e retorna uma conexão com o banco de dados SQLite.
 
+    O caminho padrão é database/who_gho.db; DBT_RAW_DB (a mesma variável lida pelo dbt e pelos
+    checks) aponta a carga para outro banco. As migrações pendentes do schema raw
+    (create_database.MIGRATIONS) são aplicadas antes de devolver a conexão.
+
     Retorna:
         sqlite3.Connection: Objeto de conexão com o banco de dados.
     """
     script_dir: str = os.path.dirname(os.path.abspath(__file__))
-    db_path: str = os.path.join(script_dir, '..', 'database', 'who_gho.db')
+    db_path: str = os.environ.get('DBT_RAW_DB', os.path.join(script_dir, '..', 'database', 'who_gho.db'))
     logging.info(f"Conectando ao banco de dados em: {db_path}")
-    return sqlite3.connect(db_path)
+    conn: sqlite3.Connection = sqlite3.connect(db_path)
+    applied: List[int] = migrate(conn)
+    if applied:
+        logging.info(f"Migrações do schema raw aplicadas: {', '.join(map(str, applied))}")
+    return conn
+
+# Upsert de dim_indicators: insere códigos novos e atualiza nome/categoria só quando mudaram
+DIM_INDICATOR_UPSERT_SQL: str = """
+    INSERT INTO dim_indicators (indicator_code, indicator_name, category) VALUES (?, ?, ?)
+    ON CONFLICT (indicator_code) DO UPDATE SET
+        indicator_name = excluded.indicator_name,
+        category = excluded.category
+    WHERE indicator_name IS NOT excluded.indicator_name OR category IS NOT excluded.category
+"""
 
-def populate_dimensions() -> None:
+INDICATORS_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'categorized_indicators.csv')
+
+def iter_indicator_rows(indicators_path: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """Lê (IndicatorCode, IndicatorName, Category) em streaming do CSV categorizado.
+
+    Arquivos .parquet (gerados por categorize_indicators.py) são lidos em lotes via DuckDB,
+    importado apenas nesse caso.
+    """
+    if indicators_path.endswith('.parquet'):
+        import duckdb
+        con = duckdb.connect()
+        try:
+            result = con.execute(
+                "SELECT IndicatorCode, IndicatorName, Category FROM read_parquet(?) WHERE IndicatorCode IS NOT NULL",
+                [indicators_path],
+            )
+            while True:
+                rows = result.fetchmany(DEFAULT_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            con.close()
+        return
+    with open(indicators_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            code: str = (row.get('IndicatorCode') or '').strip()
+            if code:
+                # Campos vazios viram NULL, como no read_csv/to_sql anterior
+                yield code, row.get('IndicatorName') or None, row.get('Category') or None
+
+def populate_dimensions(indicators_path: str = INDICATORS_PATH, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
     """Popula as tabelas de dimensão (dim_indicators, dim_sex) no banco de dados SQLite.
 
-    Este processo inclui a leitura de indicadores de um CSV e a inserção de dados de sexo pré-definidos.
+    Os indicadores são lidos em streaming do CSV categorizado (módulo csv, sem pandas) e gravados
+    em lotes com upsert direto em dim_indicators: códigos novos são inseridos e nomes ou
+    categorias alterados são atualizados. Os dados de sexo são pré-definidos.
+
+    Retorna:
+        Dict[str, Any]: Linhas lidas, inseridas, atualizadas, tempo e vazão (linhas/s).
     """
     logging.info("--- Iniciando População das Tabelas de Dimensão ---")
+    stats: Dict[str, Any] = {'rows': 0, 'inserted': 0, 'updated': 0}
+    start: float = time.perf_counter()
     conn: Optional[sqlite3.Connection] = None
     try:
         conn = get_db_connection()
         cursor: sqlite3.Cursor = conn.cursor()
 
         # Popula dim_indicators
-        indicators_path: str = os.path.join(os.path.dirname(__file__), '..', 'data', 'categorized_indicators.csv')
         logging.info(f"Lendo indicadores de: {indicators_path}")
-        indicators_df: pd.DataFrame = pd.read_csv(indicators_path)
-        indicators_df.to_sql('dim_indicators_temp', conn, if_exists='replace', index=False)
-        cursor.execute("""
-            INSERT OR IGNORE INTO dim_indicators (indicator_code, indicator_name, category)
-            SELECT IndicatorCode, IndicatorName, Category FROM dim_indicators_temp
-        """)
-        cursor.execute("DROP TABLE dim_indicators_temp")
-        logging.info(f"{cursor.rowcount} novos indicadores processados.")
+        cursor.execute("SELECT COUNT(*) FROM dim_indicators")
+        existing: int = cursor.fetchone()[0]
+        changes_before: int = conn.total_changes
+        for batch in batched(iter_indicator_rows(indicators_path), batch_size):
+            cursor.executemany(DIM_INDICATOR_UPSERT_SQL, batch)
+            stats['rows'] += len(batch)
+        changed: int = conn.total_changes - changes_before
+        cursor.execute("SELECT COUNT(*) FROM dim_indicators")
+        stats['inserted'] = cursor.fetchone()[0] - existing
+        stats['updated'] = changed - stats['inserted']
+        logging.info(f"{stats['inserted']} novos indicadores inseridos, {stats['updated']} atualizados "
+                     f"({stats['rows']} linhas lidas).")
 
         # Popula dim_sex
         sex_data: List[Tuple[str, str]] = [('MLE', 'Male'), ('FMLE', 'Female'), ('BTSX', 'Both sexes')]
@@ -66,6 +165,12 @@ def populate_dimensions() -> None:
             conn.close()
             logging.info("Conexão com o banco de dados fechada.")
 
+    elapsed: float = time.perf_counter() - start
+    stats['elapsed_s'] = round(elapsed, 3)
+    stats['rows_per_s'] = round(stats['rows'] / elapsed, 1) if elapsed > 0 else 0.0
+    logging.info(f"Dimensões: {stats['rows']} linhas em {stats['elapsed_s']}s — {stats['rows_per_s']} linhas/s")
+    return stats
+
 def get_or_create_id(cursor: sqlite3.Cursor, table: str, id_column: str, code_column: str, code_value: Any) -> int:
     """Obtém o ID de um valor em uma tabela de dimensão, criando-o se não existir.
 
@@ -89,73 +194,960 @@ def get_or_create_id(cursor: sqlite3.Cursor, table: str, id_column: str, code_co
         cursor.execute(sql_insert, (code_value,))
         return cursor.lastrowid # type: ignore
 
-def populate_facts(category: str = 'NCD') -> None:
-    """Busca dados da API da OMS para uma dada categoria e popula a tabela fact_observations.
+def ensure_fact_natural_key(cursor: sqlite3.Cursor) -> None:
+    """Garante o índice único da chave natural de fact_observations, exigido pelo upsert.
+
+    No schema compacto a chave natural é a própria chave primária da fato e nada é criado.
+
+    Raises:
+        RuntimeError: Se a tabela já contém duplicatas (bancos anteriores ao índice); nesse caso
+            execute scripts/dedup_fact_observations.py uma vez antes de carregar.
+    """
+    try:
+        create_fact_natural_key(cursor.connection)
+    except DuplicateFactsError as e:
+        raise RuntimeError(
+            "fact_observations contém observações duplicadas pela chave natural; "
+            "execute scripts/dedup_fact_observations.py antes de carregar."
+        ) from e
+
+def prune_stale_facts(cursor: sqlite3.Cursor, indicator_id: int,
+                      keyed_rows: List[Tuple[int, int, Optional[int], float]]) -> int:
+    """Remove as observações do indicador que não constam mais do payload recarregado.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor do banco de dados.
+        indicator_id (int): Indicador recarregado.
+        keyed_rows (List[Tuple[int, int, Optional[int], float]]): Observações atuais do indicador.
+
+    Retorna:
+        int: Número de observações removidas.
+    """
+    fresh: set = {(location_id, period_id, sex_id or 0) for location_id, period_id, sex_id, _ in keyed_rows}
+    cursor.execute(
+        "SELECT location_id, period_id, COALESCE(sex_id, 0) FROM fact_observations WHERE indicator_id = ?",
+        (indicator_id,),
+    )
+    stale: List[Tuple[int, int, int, int]] = [
+        (indicator_id, location_id, period_id, sex_id) for location_id, period_id, sex_id in cursor.fetchall()
+        if (location_id, period_id, sex_id) not in fresh
+    ]
+    # Remoção pela chave natural: usa o índice único (ou a chave primária, no schema compacto)
+    cursor.executemany(
+        "DELETE FROM fact_observations "
+        "WHERE indicator_id = ? AND location_id = ? AND period_id = ? AND COALESCE(sex_id, 0) = ?",
+        stale,
+    )
+    return len(stale)
+
+class DimensionKeyCache:
+    """Resolve códigos de dimensão (país, ano, sexo) para ids a partir de mapas em memória.
+
+    Os mapas código → id são carregados uma única vez; membros ausentes são criados em lote,
+    na ordem em que aparecem, o que preserva os mesmos ids que get_or_create_id geraria
+    chamada a chamada. O cache vale para a transação corrente: após um rollback, descarte-o.
+    """
+
+    # tabela → (coluna de id, coluna de código)
+    DIMENSIONS: Dict[str, Tuple[str, str]] = {
+        'dim_locations': ('location_id', 'country_code'),
+        'dim_periods': ('period_id', 'year'),
+        'dim_sex': ('sex_id', 'sex_code'),
+    }
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self.cursor: sqlite3.Cursor = cursor
+        self.keys: Dict[str, Dict[Any, int]] = {}
+        self.created: int = 0
+        for table, (id_column, code_column) in self.DIMENSIONS.items():
+            cursor.execute(f"SELECT {code_column}, {id_column} FROM {table}")
+            self.keys[table] = dict(cursor.fetchall())
+        logging.info("Cache de dimensões carregado: " +
+                     ", ".join(f"{table}={len(keys)}" for table, keys in self.keys.items()))
+
+    def ensure(self, table: str, codes: List[Any]) -> None:
+        """Cria em lote os códigos ainda ausentes da dimensão, na ordem da primeira ocorrência."""
+        known: Dict[Any, int] = self.keys[table]
+        missing: List[Any] = list(dict.fromkeys(code for code in codes if code not in known))
+        if not missing:
+            return
+        id_column, code_column = self.DIMENSIONS[table]
+        self.cursor.executemany(f"INSERT INTO {table} ({code_column}) VALUES (?)", [(code,) for code in missing])
+        # Relê os ids gerados em blocos (limite de parâmetros do SQLite)
+        for start in range(0, len(missing), 500):
+            chunk: List[Any] = missing[start:start + 500]
+            placeholders: str = ", ".join("?" * len(chunk))
+            self.cursor.execute(
+                f"SELECT {code_column}, {id_column} FROM {table} WHERE {code_column} IN ({placeholders})", chunk
+            )
+            known.update(self.cursor.fetchall())
+        self.created += len(missing)
+
+    def resolve(self, rows: List[ParsedObservation]) -> List[Tuple[int, int, Optional[int], float]]:
+        """Converte observações interpretadas em (location_id, period_id, sex_id, value).
+
+        Args:
+            rows (List[ParsedObservation]): Observações retornadas por parse_observation.
+
+        Retorna:
+            List[Tuple[int, int, Optional[int], float]]: Chaves resolvidas e valor de cada observação.
+        """
+        self.ensure('dim_sex', [sex_code for _, _, sex_code, _ in rows if sex_code])
+        self.ensure('dim_locations', [country_code for country_code, _, _, _ in rows])
+        self.ensure('dim_periods', [year for _, year, _, _ in rows])
+        locations: Dict[Any, int] = self.keys['dim_locations']
+        periods: Dict[Any, int] = self.keys['dim_periods']
+        sexes: Dict[Any, int] = self.keys['dim_sex']
+        return [
+            (locations[country_code], periods[year], sexes[sex_code] if sex_code else None, value)
+            for country_code, year, sex_code, value in rows
+        ]
+
+class FactBulkLoader:
+    """Acumula linhas de fact_observations e as grava em lotes de tamanho fixo.
+
+    Cada lote é gravado com um único executemany (upsert pela chave natural da variante de schema do banco)
+    e confirmado com commit, de modo que uma falha no meio da carga perde no máximo o lote
+    corrente e recargas não duplicam observações.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.conn: sqlite3.Connection = conn
+        self.cursor: sqlite3.Cursor = conn.cursor()
+        self.insert_sql: str = fact_upsert_sql(schema_variant(conn) or 'standard')
+        self.batch_size: int = batch_size
+        self.buffer: List[Tuple[int, int, int, Optional[int], float]] = []
+        self.rows_written: int = 0
+        self.batches: int = 0
+
+    def add(self, indicator_id: int, keyed_rows: List[Tuple[int, int, Optional[int], float]]) -> None:
+        """Enfileira as observações (já com chaves resolvidas) de um indicador."""
+        self.buffer.extend(
+            (indicator_id, location_id, period_id, sex_id, value)
+            for location_id, period_id, sex_id, value in keyed_rows
+        )
+        while len(self.buffer) >= self.batch_size:
+            self._write(self.buffer[:self.batch_size])
+            del self.buffer[:self.batch_size]
+
+    def flush(self) -> None:
+        """Grava o lote parcial pendente."""
+        if self.buffer:
+            self._write(self.buffer)
+            self.buffer = []
+
+    def discard(self) -> None:
+        """Descarta as linhas ainda não gravadas (ex: indicador cuja busca falhou no meio)."""
+        self.buffer = []
+
+    def _write(self, batch: List[Tuple[int, int, int, Optional[int], float]]) -> None:
+        self.cursor.executemany(self.insert_sql, batch)
+        self.conn.commit()
+        self.rows_written += len(batch)
+        self.batches += 1
+
+@contextmanager
+def ingest_profile(conn: sqlite3.Connection, enabled: bool = True) -> Iterator[None]:
+    """Ajusta a conexão para cargas volumosas enquanto o bloco executa.
+
+    Ativa journal WAL (persistente no arquivo), synchronous=NORMAL, cache de 256 MB e
+    tabelas temporárias em memória, e adia a construção dos índices secundários não únicos
+    de fact_observations: eles são removidos antes da carga e recriados ao final, mesmo em
+    caso de erro. Índices únicos são mantidos, pois garantem a integridade da carga.
+
+    Args:
+        conn (sqlite3.Connection): Conexão usada na carga.
+        enabled (bool): Se False, o bloco executa sem nenhuma alteração.
+    """
+    if not enabled:
+        yield
+        return
+
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+    deferred: List[Tuple[str, str]] = []
+    for _, name, unique, origin, _ in conn.execute("PRAGMA index_list('fact_observations')").fetchall():
+        if origin == 'c' and not unique:
+            sql: str = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()[0]
+            deferred.append((name, sql))
+    for name, _ in deferred:
+        conn.execute(f'DROP INDEX "{name}"')
+    conn.commit()
+    if deferred:
+        logging.info(f"Perfil de ingestão ativo; índices adiados: {', '.join(name for name, _ in deferred)}")
+    else:
+        logging.info("Perfil de ingestão ativo.")
+
+    try:
+        yield
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        for name, sql in deferred:
+            logging.info(f"Recriando índice {name}...")
+            conn.execute(sql)
+        conn.commit()
+
+def parse_observation(obs: Dict[str, Any]) -> Optional[ParsedObservation]:
+    """Extrai os campos relevantes de uma observação bruta da API da OMS.
+
+    Args:
+        obs (Dict[str, Any]): Item do array 'value' retornado pela API.
+
+    Retorna:
+        Optional[ParsedObservation]: (country_code, year, sex_code, value), ou None se a
+        observação não tiver localização, período ou valor numérico. sex_code é None quando
+        Dim1 não é um código de sexo válido.
+    """
+    if not all(k in obs for k in ['SpatialDim', 'TimeDim']) or obs.get('NumericValue') is None:
+        return None
+
+    sex_code: Optional[str] = obs.get('Dim1') # Dim1 is often SEX
+    if sex_code:
+        # Clean the code
+        if sex_code.startswith('SEX_'):
+            sex_code = sex_code.replace('SEX_', '')
+        # Check if it's a valid sex code before processing
+        if sex_code not in VALID_SEX_CODES:
+            sex_code = None
+    else:
+        sex_code = None
+
+    return obs['SpatialDim'], obs['TimeDim'], sex_code, obs['NumericValue']
+
+def iter_indicator_pages(indicator_code: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Percorre o endpoint OData de um indicador página a página ($top/$skip).
+
+    Só uma página fica em memória por vez; a iteração termina na primeira página incompleta.
 
     Args:
-        category (str): A categoria de indicadores a ser buscada (ex: 'NCD', 'AIR').
+        indicator_code (str): Código do indicador na API da OMS.
+        page_size (int): Observações por página ($top).
+
+    Retorna:
+        Iterator[List[Dict[str, Any]]]: O array 'value' de cada página.
     """
-    logging.info(f"--- Iniciando População da Tabela de Fatos para a Categoria: {category} ---")
+    skip: int = 0
+    while True:
+        response: requests.Response = gho_client.get(
+            f"{GHO_API_URL}{indicator_code}", params={'$top': page_size, '$skip': skip}, timeout=30
+        )
+        response.raise_for_status()
+        page: List[Dict[str, Any]] = response.json().get('value', [])
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        skip += page_size
+
+def iter_indicator_observations(indicator_code: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[ParsedObservation]:
+    """Gera as observações válidas de um indicador, interpretadas página a página."""
+    for page in iter_indicator_pages(indicator_code, page_size):
+        for obs in page:
+            parsed: Optional[ParsedObservation] = parse_observation(obs)
+            if parsed is not None:
+                yield parsed
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Agrupa um iterável em listas de até `size` elementos."""
+    iterator: Iterator[T] = iter(items)
+    while True:
+        chunk: List[T] = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def ensure_ingestion_state_table(cursor: sqlite3.Cursor) -> None:
+    """Cria (se necessário) a tabela de estado da ingestão incremental, uma linha por indicador."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_state (
+            indicator_code TEXT PRIMARY KEY,
+            last_fetched_at TEXT,
+            last_changed_at TEXT,
+            row_count INTEGER,
+            content_hash TEXT,
+            etag TEXT,
+            last_modified TEXT
+        )
+    """)
+
+def load_ingestion_state(cursor: sqlite3.Cursor) -> Dict[str, Dict[str, Any]]:
+    """Carrega o estado de ingestão de todos os indicadores, indexado por indicator_code."""
+    ensure_ingestion_state_table(cursor)
+    cursor.execute("SELECT indicator_code, row_count, content_hash, etag, last_modified FROM ingestion_state")
+    return {
+        code: {'row_count': row_count, 'content_hash': content_hash, 'etag': etag, 'last_modified': last_modified}
+        for code, row_count, content_hash, etag, last_modified in cursor.fetchall()
+    }
+
+def record_ingestion_state(cursor: sqlite3.Cursor, indicator_code: str, fetch_state: Dict[str, Any],
+                           row_count: Optional[int] = None) -> None:
+    """Registra uma busca no estado do indicador.
+
+    Para indicadores inalterados só last_fetched_at é atualizado; para os recarregados também
+    last_changed_at, row_count, o hash do conteúdo e os cabeçalhos de validação (ETag/Last-Modified).
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor do banco de dados.
+        indicator_code (str): Código do indicador.
+        fetch_state (Dict[str, Any]): Estado retornado por fetch_indicator_delta.
+        row_count (Optional[int]): Observações gravadas (None se o indicador não mudou).
+    """
+    now: str = datetime.now(timezone.utc).isoformat()
+    changed: bool = fetch_state['changed']
+    cursor.execute("""
+        INSERT INTO ingestion_state (indicator_code, last_fetched_at, last_changed_at, row_count, content_hash, etag, last_modified)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (indicator_code) DO UPDATE SET
+            last_fetched_at = excluded.last_fetched_at,
+            last_changed_at = COALESCE(excluded.last_changed_at, ingestion_state.last_changed_at),
+            row_count = COALESCE(excluded.row_count, ingestion_state.row_count),
+            content_hash = COALESCE(excluded.content_hash, ingestion_state.content_hash),
+            etag = COALESCE(excluded.etag, ingestion_state.etag),
+            last_modified = COALESCE(excluded.last_modified, ingestion_state.last_modified)
+    """, (
+        indicator_code, now, now if changed else None, row_count if changed else None,
+        fetch_state['content_hash'] if changed else None, fetch_state.get('etag'), fetch_state.get('last_modified'),
+    ))
+
+def ensure_checkpoint_tables(cursor: sqlite3.Cursor) -> None:
+    """Cria (se necessário) as tabelas de execuções e de checkpoint por indicador."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_runs (
+            run_id INTEGER PRIMARY KEY,
+            scope TEXT NOT NULL,
+            status TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_checkpoint (
+            run_id INTEGER NOT NULL,
+            indicator_code TEXT NOT NULL,
+            status TEXT NOT NULL,
+            row_count INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 1,
+            error TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (run_id, indicator_code)
+        )
+    """)
+
+def start_ingestion_run(cursor: sqlite3.Cursor, scope: str, restart: bool = False) -> Tuple[int, set]:
+    """Retoma a última execução inacabada do escopo ou abre uma nova.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor do banco de dados.
+        scope (str): Identifica o conjunto de indicadores da execução (ver ingestion_scope).
+        restart (bool): Ignora execuções inacabadas e começa do zero.
+
+    Retorna:
+        Tuple[int, set]: O run_id e os códigos de indicadores já resolvidos nessa execução
+        (concluídos ou com falha permanente), que não são buscados de novo.
+    """
+    ensure_checkpoint_tables(cursor)
+    now: str = datetime.now(timezone.utc).isoformat()
+    cursor.execute(
+        "SELECT run_id FROM ingestion_runs WHERE scope = ? AND status IN ('running', 'partial') "
+        "ORDER BY run_id DESC LIMIT 1",
+        (scope,),
+    )
+    row = cursor.fetchone()
+    if row is not None and restart:
+        cursor.execute("UPDATE ingestion_runs SET status = 'abandoned', finished_at = ? WHERE run_id = ?", (now, row[0]))
+        row = None
+    if row is None:
+        cursor.execute(
+            "INSERT INTO ingestion_runs (scope, status, started_at) VALUES (?, 'running', ?)", (scope, now)
+        )
+        return cursor.lastrowid, set()
+    run_id: int = row[0]
+    cursor.execute("UPDATE ingestion_runs SET status = 'running' WHERE run_id = ?", (run_id,))
+    cursor.execute(
+        "SELECT indicator_code FROM ingestion_checkpoint WHERE run_id = ? AND status IN ('done', 'rejected')",
+        (run_id,),
+    )
+    return run_id, {code for (code,) in cursor.fetchall()}
+
+def mark_indicator(cursor: sqlite3.Cursor, run_id: int, indicator_code: str, status: str,
+                   row_count: Optional[int] = None, error: Optional[str] = None) -> None:
+    """Registra o resultado de um indicador na execução, contando as tentativas.
+
+    status é 'done', 'failed' (falha transitória, repetida ao retomar) ou 'rejected' (falha
+    permanente, ver is_permanent_failure). Uma falha transitória na tentativa
+    MAX_INDICATOR_ATTEMPTS também vira 'rejected', para não prender a execução em 'partial'.
+    """
+    cursor.execute("""
+        INSERT INTO ingestion_checkpoint (run_id, indicator_code, status, row_count, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (run_id, indicator_code) DO UPDATE SET
+            status = CASE
+                WHEN excluded.status = 'failed' AND ingestion_checkpoint.attempts + 1 >= ? THEN 'rejected'
+                ELSE excluded.status
+            END,
+            row_count = excluded.row_count,
+            attempts = ingestion_checkpoint.attempts + 1,
+            error = excluded.error,
+            updated_at = excluded.updated_at
+    """, (run_id, indicator_code, status, row_count, error, datetime.now(timezone.utc).isoformat(),
+          MAX_INDICATOR_ATTEMPTS))
+
+def finish_ingestion_run(cursor: sqlite3.Cursor, run_id: int, attempted_all: bool) -> str:
+    """Fecha a execução e retorna o seu status.
+
+    'partial' (retomável) se algum indicador não foi tentado (attempted_all=False) ou ainda tem
+    falha transitória; 'completed_with_failures' se as únicas falhas são permanentes; senão
+    'completed'. Os dois últimos são terminais: a próxima execução do escopo começa do zero,
+    buscando também os indicadores rejeitados.
+    """
+    cursor.execute(
+        "SELECT COALESCE(SUM(status = 'failed'), 0), COALESCE(SUM(status = 'rejected'), 0) "
+        "FROM ingestion_checkpoint WHERE run_id = ?",
+        (run_id,),
+    )
+    transient, permanent = cursor.fetchone()
+    if not attempted_all or transient:
+        status: str = 'partial'
+    elif permanent:
+        status = 'completed_with_failures'
+    else:
+        status = 'completed'
+    cursor.execute(
+        "UPDATE ingestion_runs SET status = ?, finished_at = ? WHERE run_id = ?",
+        (status, datetime.now(timezone.utc).isoformat(), run_id),
+    )
+    return status
+
+def is_permanent_failure(error: Exception) -> bool:
+    """Falhas que uma nova tentativa não resolve: HTTP 4xx (exceto 429, ex: código de indicador
+    removido) e erros de parsing do payload (ValueError)."""
+    if isinstance(error, ValueError):
+        return True
+    response: Optional[requests.Response] = getattr(error, 'response', None)
+    return (isinstance(error, requests.exceptions.HTTPError) and response is not None
+            and 400 <= response.status_code < 500 and response.status_code != 429)
+
+def fetch_indicator_delta(indicator_code: str, previous: Optional[Dict[str, Any]] = None
+                          ) -> Tuple[Optional[List[ParsedObservation]], Dict[str, Any]]:
+    """Busca um indicador de forma condicional e detecta se o conteúdo mudou desde a última carga.
+
+    Envia If-None-Match/If-Modified-Since quando há ETag/Last-Modified registrados; uma resposta
+    304, ou um payload com o mesmo hash SHA-256 da última carga, indica indicador inalterado.
+    A busca sempre vai à rede: uma resposta ainda válida no cache HTTP faria um indicador
+    alterado parecer inalterado até expirar.
+
+    Args:
+        indicator_code (str): Código do indicador na API da OMS.
+        previous (Optional[Dict[str, Any]]): Estado anterior (de load_ingestion_state), se houver.
+
+    Retorna:
+        Tuple[Optional[List[ParsedObservation]], Dict[str, Any]]: As observações (None se o
+        indicador não mudou) e o novo estado: changed, content_hash, etag e last_modified.
+    """
+    headers: Dict[str, str] = {}
+    if previous and previous.get('etag'):
+        headers['If-None-Match'] = previous['etag']
+    if previous and previous.get('last_modified'):
+        headers['If-Modified-Since'] = previous['last_modified']
+
+    response: requests.Response = gho_client.get(f"{GHO_API_URL}{indicator_code}", headers=headers, timeout=30,
+                                                 refresh=True)
+    response.raise_for_status()
+    fetch_state: Dict[str, Any] = {
+        'changed': False,
+        'content_hash': previous.get('content_hash') if previous else None,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    if response.status_code == 304:
+        return None, fetch_state
+
+    content_hash: str = hashlib.sha256(response.content).hexdigest()
+    if previous and previous.get('content_hash') == content_hash:
+        return None, fetch_state
+
+    fetch_state['changed'] = True
+    fetch_state['content_hash'] = content_hash
+    rows: List[ParsedObservation] = [
+        parsed for parsed in map(parse_observation, response.json().get('value', [])) if parsed is not None
+    ]
+    return rows, fetch_state
+
+def resolve_categories(cursor: sqlite3.Cursor, requested: Sequence[str]) -> List[str]:
+    """Expande a lista de categorias pedida; 'all' vira todas as categorias de dim_indicators.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor do banco de dados.
+        requested (Sequence[str]): Categorias pedidas na linha de comando (ex: ['AIR', 'NCD'] ou ['all']).
+
+    Retorna:
+        List[str]: Categorias sem repetição, na ordem pedida (ou alfabética para 'all').
+    """
+    if ALL_CATEGORIES in requested:
+        cursor.execute(
+            "SELECT DISTINCT category FROM dim_indicators WHERE category IS NOT NULL AND category <> '' ORDER BY category"
+        )
+        return [category for (category,) in cursor.fetchall()]
+    return list(dict.fromkeys(requested))
+
+def ingestion_scope(categories: Sequence[str]) -> str:
+    """Escopo do checkpoint de uma carga de fatos: as categorias sem repetição, em ordem alfabética.
+
+    Usado pelos modos sequencial e concorrente, de modo que a mesma seleção de categorias
+    retoma a mesma execução em qualquer modo e em qualquer ordem (ex: 'facts:AIR,NCD').
+    """
+    return f"facts:{','.join(sorted(set(categories)))}"
+
+def select_indicators(cursor: sqlite3.Cursor, categories: Sequence[str]) -> List[Tuple[int, str]]:
+    """Retorna (indicator_id, indicator_code) de todos os indicadores das categorias."""
+    placeholders: str = ", ".join("?" for _ in categories)
+    cursor.execute(
+        f"SELECT indicator_id, indicator_code FROM dim_indicators WHERE category IN ({placeholders})",
+        tuple(categories),
+    )
+    return cursor.fetchall()
+
+def _load_indicator(cursor: sqlite3.Cursor, keys: DimensionKeyCache, loader: FactBulkLoader,
+                    indicator_id: int, indicator_code: str, page_size: int,
+                    state: Optional[Dict[str, Dict[str, Any]]]) -> Optional[int]:
+    """Busca e enfileira as observações de um indicador no loader (modo sequencial).
+
+    Retorna:
+        Optional[int]: Observações carregadas, ou None se o indicador não mudou (modo incremental).
+    """
+    if state is not None:
+        delta_rows, fetch_state = fetch_indicator_delta(indicator_code, state.get(indicator_code))
+        if delta_rows is None:
+            logging.info(f"  -> {indicator_code} inalterado desde a última carga; ignorado.")
+            record_ingestion_state(cursor, indicator_code, fetch_state)
+            return None
+        keyed_rows = keys.resolve(delta_rows)
+        loader.add(indicator_id, keyed_rows)
+        # O estado só é gravado depois que todas as linhas do indicador foram persistidas
+        loader.flush()
+        prune_stale_facts(cursor, indicator_id, keyed_rows)
+        record_ingestion_state(cursor, indicator_code, fetch_state, len(delta_rows))
+        logging.info(f"  -> {len(delta_rows)} observações recarregadas para {indicator_code}.")
+        return len(delta_rows)
+
+    if page_size:
+        streamed: int = 0
+        for chunk in batched(iter_indicator_observations(indicator_code, page_size), page_size):
+            loader.add(indicator_id, keys.resolve(chunk))
+            streamed += len(chunk)
+        logging.info(f"  -> {streamed} observações processadas em streaming para {indicator_code}.")
+        return streamed
+
+    response: requests.Response = gho_client.get(f"{GHO_API_URL}{indicator_code}", timeout=30)
+    response.raise_for_status() # Lança um erro para status HTTP ruins
+
+    if response.status_code == 200 and 'value' in response.json():
+        observations: List[Dict[str, Any]] = response.json()['value']
+        logging.info(f"  -> {len(observations)} observações encontradas para {indicator_code}.")
+        rows: List[ParsedObservation] = [
+            parsed for parsed in map(parse_observation, observations) if parsed is not None
+        ]
+        loader.add(indicator_id, keys.resolve(rows))
+        return len(rows)
+    logging.warning(f"  -> Sem dados ou erro para o indicador: {indicator_code}")
+    return 0
+
+def populate_facts(category: Union[str, Sequence[str]] = 'NCD', batch_size: int = DEFAULT_BATCH_SIZE,
+                   fast_ingest: bool = False, page_size: int = 0, incremental: bool = False,
+                   restart: bool = False) -> None:
+    """Busca dados da API da OMS para as categorias dadas e popula a tabela fact_observations.
+
+    As observações são gravadas em lotes (FactBulkLoader) e cada indicador é confirmado com
+    commit e registrado em ingestion_checkpoint. Um indicador que falha (após os retries do
+    gho_client) é marcado como 'failed' sem desfazer os demais; com o circuit breaker aberto a
+    execução para. A próxima execução com as mesmas categorias, sequencial ou concorrente,
+    retoma pelos indicadores não concluídos (ver ingestion_scope).
+
+    Args:
+        category (Union[str, Sequence[str]]): Categoria ou lista de categorias a ser buscada
+            (ex: 'AIR', ['AIR', 'NCD'] ou 'all' para todas as categorias de dim_indicators).
+        batch_size (int): Linhas por lote de inserção/commit.
+        fast_ingest (bool): Ativa o ingest_profile (WAL, synchronous relaxado, índices adiados).
+        page_size (int): Se > 0, consome cada indicador em streaming, paginado com $top/$skip,
+            com memória limitada a uma página e um lote, independente do tamanho do indicador.
+        incremental (bool): Pula indicadores inalterados desde a última carga (ver
+            fetch_indicator_delta) e recarrega só os que mudaram. Incompatível com page_size.
+        restart (bool): Ignora o checkpoint de uma execução inacabada e recomeça do zero.
+    """
+    if incremental and page_size:
+        raise ValueError("O modo incremental não suporta streaming paginado (page_size).")
+    requested: List[str] = [category] if isinstance(category, str) else list(category)
+    logging.info(f"--- Iniciando População da Tabela de Fatos para a(s) Categoria(s): {', '.join(requested)} ---")
     conn: Optional[sqlite3.Connection] = None
+    cache_before: Dict[str, float] = gho_client.counters()
     try:
         conn = get_db_connection()
         cursor: sqlite3.Cursor = conn.cursor()
 
-        cursor.execute("SELECT indicator_id, indicator_code FROM dim_indicators WHERE category = ?", (category,))
-        indicators: List[Tuple[int, str]] = cursor.fetchall()
-        logging.info(f"Encontrados {len(indicators)} indicadores para a categoria '{category}'.")
-
-        for indicator_id, indicator_code in indicators:
-            logging.info(f"Buscando dados para o indicador: {indicator_code}...")
-            response: requests.Response = requests.get(f"https://ghoapi.azureedge.net/api/{indicator_code}", timeout=30)
-            response.raise_for_status() # Lança um erro para status HTTP ruins
-
-            if response.status_code == 200 and 'value' in response.json():
-                observations: List[Dict[str, Any]] = response.json()['value']
-                logging.info(f"  -> {len(observations)} observações encontradas para {indicator_code}.")
-                for obs in observations:
-                    if all(k in obs for k in ['SpatialDim', 'TimeDim']) and obs.get('NumericValue') is not None:
-                        country_code: str = obs['SpatialDim']
-                        year: int = obs['TimeDim']
-
-                        sex_code: Optional[str] = obs.get('Dim1') # Dim1 is often SEX
-                        sex_id: Optional[int] = None
-                        if sex_code:
-                            # Clean the code
-                            if sex_code.startswith('SEX_'):
-                                sex_code = sex_code.replace('SEX_', '')
-
-                            # Check if it's a valid sex code before processing
-                            if sex_code in ['MLE', 'FMLE', 'BTSX']:
-                                sex_id = get_or_create_id(cursor, 'dim_sex', 'sex_id', 'sex_code', sex_code)
-
-                        value: float = obs.get('NumericValue') # type: ignore
-
-                        location_id: int = get_or_create_id(cursor, 'dim_locations', 'location_id', 'country_code', country_code)
-                        period_id: int = get_or_create_id(cursor, 'dim_periods', 'period_id', 'year', year)
-
-                        sql_insert_fact: str = """
-                            INSERT INTO fact_observations (indicator_id, location_id, period_id, sex_id, value)
-                            VALUES (?, ?, ?, ?, ?)
-                        """
-                        cursor.execute(sql_insert_fact, (indicator_id, location_id, period_id, sex_id, value))
-            else:
-                logging.warning(f"  -> Sem dados ou erro para o indicador: {indicator_code}")
+        ensure_fact_natural_key(cursor)
+        categories: List[str] = resolve_categories(cursor, requested)
+        indicators: List[Tuple[int, str]] = select_indicators(cursor, categories)
+        logging.info(f"Encontrados {len(indicators)} indicadores para a(s) categoria(s) {', '.join(categories)}.")
+        run_id, done = start_ingestion_run(cursor, ingestion_scope(categories), restart)
+        conn.commit()
+        pending: List[Tuple[int, str]] = [(i, code) for i, code in indicators if code not in done]
+        if done:
+            logging.info(f"Retomando a execução {run_id}: {len(indicators) - len(pending)} indicadores já concluídos, "
+                         f"{len(pending)} pendentes.")
+        keys: DimensionKeyCache = DimensionKeyCache(cursor)
+        loader: FactBulkLoader = FactBulkLoader(conn, batch_size)
+        state: Optional[Dict[str, Dict[str, Any]]] = load_ingestion_state(cursor) if incremental else None
+        skipped: int = 0
+        failed: int = 0
+        completed: int = 0
 
+        with ingest_profile(conn, fast_ingest):
+            for indicator_id, indicator_code in pending:
+                logging.info(f"Buscando dados para o indicador: {indicator_code}...")
+                try:
+                    loaded: Optional[int] = _load_indicator(cursor, keys, loader, indicator_id, indicator_code,
+                                                            page_size, state)
+                except gho_client.CircuitOpenError as e:
+                    loader.discard()
+                    logging.error(f"  -> API indisponível ({e}); interrompendo. A próxima execução retoma de {indicator_code}.")
+                    break
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    # Só o indicador é perdido: as linhas pendentes são descartadas e o resto segue
+                    loader.discard()
+                    mark_indicator(cursor, run_id, indicator_code,
+                                   'rejected' if is_permanent_failure(e) else 'failed', error=str(e))
+                    conn.commit()
+                    failed += 1
+                    logging.error(f"  -> Falha ao buscar o indicador {indicator_code}: {e}")
+                    continue
+                loader.flush()
+                mark_indicator(cursor, run_id, indicator_code, 'done', loaded)
+                conn.commit()
+                completed += 1
+                if loaded is None:
+                    skipped += 1
+
+        status: str = finish_ingestion_run(cursor, run_id, completed + failed == len(pending))
         conn.commit()
-        logging.info(f"Tabela de fatos populada com sucesso para a categoria '{category}'.")
+        logging.info(f"{loader.rows_written} observações gravadas em {loader.batches} lotes.")
+        if analyze_after_load(conn, loader.rows_written):
+            logging.info("Estatísticas do planner atualizadas (ANALYZE).")
+        if incremental:
+            logging.info(f"Modo incremental: {completed - skipped} indicadores recarregados, {skipped} inalterados.")
+        if status == 'completed':
+            logging.info(f"Tabela de fatos populada com sucesso para a(s) categoria(s) {', '.join(categories)}.")
+        elif status == 'completed_with_failures':
+            logging.warning(f"Execução {run_id} concluída com {failed} indicadores com falha permanente "
+                            f"(ver ingestion_checkpoint); a próxima execução começa do zero.")
+        else:
+            logging.warning(f"Execução {run_id} incompleta para a(s) categoria(s) {', '.join(categories)}: "
+                            f"{completed} concluídos, "
+                            f"{failed} falhas, {len(pending) - completed - failed} não tentados; "
+                            f"rode novamente para retomar.")
 
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Erro de requisição ao buscar dados para a categoria {category}: {e}", exc_info=True)
+    except Exception as e:
+        logging.error(f"Ocorreu um erro inesperado durante a população de fatos para a(s) categoria(s) {', '.join(requested)}: {e}", exc_info=True)
         if conn: conn.rollback()
+    finally:
+        if conn:
+            conn.close()
+            logging.info("Conexão com o banco de dados fechada.")
+    if gho_client.CACHE_ENABLED:
+        logging.info(f"Cache HTTP: {gho_client.format_stats(gho_client.counters_since(cache_before))}")
+
+
+def fetch_indicator_observations(indicator_code: str) -> List[ParsedObservation]:
+    """Busca (de forma bloqueante) e interpreta todas as observações de um indicador.
+
+    Args:
+        indicator_code (str): Código do indicador na API da OMS.
+
+    Retorna:
+        List[ParsedObservation]: Observações válidas do indicador.
+    """
+    response: requests.Response = gho_client.get(f"{GHO_API_URL}{indicator_code}", timeout=30)
+    response.raise_for_status()
+    payload: Dict[str, Any] = response.json()
+    rows: List[ParsedObservation] = []
+    for obs in payload.get('value', []):
+        parsed: Optional[ParsedObservation] = parse_observation(obs)
+        if parsed is not None:
+            rows.append(parsed)
+    return rows
+
+class FetchResult(NamedTuple):
+    """Item da fila fetch → writer.
+
+    Em streaming, um indicador chega em vários itens e só o último tem done=True. No modo
+    incremental, fetch_state traz o novo estado do indicador (rows=[] se ele não mudou).
+    """
+    indicator_id: int
+    indicator_code: str
+    rows: Optional[List[ParsedObservation]]  # None se a busca falhou
+    done: bool = True
+    fetch_state: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    permanent: bool = False  # falha que uma nova tentativa não resolve (is_permanent_failure)
+
+def _stream_into_queue(indicator_id: int, indicator_code: str, page_size: int,
+                       loop: asyncio.AbstractEventLoop, queue: "asyncio.Queue[Optional[FetchResult]]") -> None:
+    """Executado em thread: envia ao writer cada página interpretada, aguardando espaço na fila."""
+    for chunk in batched(iter_indicator_observations(indicator_code, page_size), page_size):
+        asyncio.run_coroutine_threadsafe(queue.put(FetchResult(indicator_id, indicator_code, chunk, False)), loop).result()
+
+async def _fetch_into_queue(indicator_id: int, indicator_code: str, semaphore: asyncio.Semaphore,
+                            executor: Executor,
+                            queue: "asyncio.Queue[Optional[FetchResult]]", page_size: int,
+                            state: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    """Busca um indicador respeitando o limite de concorrência e entrega o resultado ao writer.
+
+    O limite de taxa é aplicado pelo gho_client a cada ida à rede (retries e páginas incluídos).
+    """
+    rows: Optional[List[ParsedObservation]] = None
+    fetch_state: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    permanent: bool = False
+    async with semaphore:
+        logging.info(f"Buscando dados para o indicador: {indicator_code}...")
+        try:
+            loop = asyncio.get_running_loop()
+            if state is not None:
+                rows, fetch_state = await loop.run_in_executor(
+                    executor, fetch_indicator_delta, indicator_code, state.get(indicator_code)
+                )
+                rows = rows or []
+            elif page_size:
+                await loop.run_in_executor(executor, _stream_into_queue, indicator_id, indicator_code, page_size, loop, queue)
+                rows = []
+            else:
+                rows = await loop.run_in_executor(executor, fetch_indicator_observations, indicator_code)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            error = str(e)
+            permanent = is_permanent_failure(e)
+            logging.error(f"  -> Falha ao buscar o indicador {indicator_code}: {e}")
+    await queue.put(FetchResult(indicator_id, indicator_code, rows, True, fetch_state, error, permanent))
+
+async def _write_from_queue(conn: sqlite3.Connection, queue: "asyncio.Queue[Optional[FetchResult]]",
+                            stats: Dict[str, Any], batch_size: int, run_id: int) -> None:
+    """Writer único: consome os resultados da fila e grava as observações no SQLite em lotes.
+
+    Cada indicador concluído é confirmado com commit e registrado no checkpoint da execução.
+    """
+    cursor: sqlite3.Cursor = conn.cursor()
+    keys: DimensionKeyCache = DimensionKeyCache(cursor)
+    loader: FactBulkLoader = FactBulkLoader(conn, batch_size)
+    pending: Dict[str, int] = {}
+    while True:
+        item: Optional[FetchResult] = await queue.get()
+        if item is None:
+            break
+        indicator_id, indicator_code, rows, done, fetch_state, error, permanent = item
+        if rows is None:
+            pending.pop(indicator_code, None)
+            mark_indicator(cursor, run_id, indicator_code, 'rejected' if permanent else 'failed', error=error)
+            conn.commit()
+            stats['failed'] += 1
+            continue
+        if fetch_state is not None:
+            if fetch_state['changed']:
+                keyed_rows = keys.resolve(rows)
+                loader.add(indicator_id, keyed_rows)
+                loader.flush()
+                prune_stale_facts(cursor, indicator_id, keyed_rows)
+                record_ingestion_state(cursor, indicator_code, fetch_state, len(rows))
+                mark_indicator(cursor, run_id, indicator_code, 'done', len(rows))
+                stats['indicators'] += 1
+                stats['rows'] += len(rows)
+                logging.info(f"  -> {len(rows)} observações recarregadas para {indicator_code}.")
+            else:
+                record_ingestion_state(cursor, indicator_code, fetch_state)
+                mark_indicator(cursor, run_id, indicator_code, 'done')
+                stats['skipped'] += 1
+                logging.info(f"  -> {indicator_code} inalterado desde a última carga; ignorado.")
+            conn.commit()
+            continue
+        if rows:
+            loader.add(indicator_id, keys.resolve(rows))
+            # Contadas só quando o indicador termina: um streaming que falha no meio não entra em stats
+            pending[indicator_code] = pending.get(indicator_code, 0) + len(rows)
+        if done:
+            loaded: int = pending.pop(indicator_code, 0)
+            loader.flush()
+            mark_indicator(cursor, run_id, indicator_code, 'done', loaded)
+            conn.commit()
+            stats['indicators'] += 1
+            stats['rows'] += loaded
+            logging.info(f"  -> {loaded} observações gravadas para {indicator_code}.")
+    loader.flush()
+    stats['batches'] = loader.batches
+
+async def _populate_facts_async(conn: sqlite3.Connection, indicators: List[Tuple[int, str]],
+                                concurrency: int, rate_limit: float, batch_size: int, page_size: int,
+                                state: Optional[Dict[str, Dict[str, Any]]], run_id: int,
+                                processes: int = 0) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {'indicators': 0, 'failed': 0, 'skipped': 0, 'rows': 0}
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+    # Fila limitada: se o writer ficar para trás, os fetchers aguardam (memória constante)
+    queue: "asyncio.Queue[Optional[FetchResult]]" = asyncio.Queue(maxsize=concurrency * 2)
+
+    writer: asyncio.Task = asyncio.create_task(_write_from_queue(conn, queue, stats, batch_size, run_id))
+    # Com processes > 0, busca e parsing do JSON rodam em processos (sem disputar o GIL com o writer)
+    # O limitador de taxa do gho_client é por processo: no pool, cada processo recebe uma fração do limite
+    gho_client.set_rate_limit(rate_limit)
+    executor: Executor = (ProcessPoolExecutor(max_workers=processes, initializer=gho_client.set_rate_limit,
+                                              initargs=(rate_limit / processes,))
+                          if processes else ThreadPoolExecutor(max_workers=concurrency))
+    with executor:
+        await asyncio.gather(*(
+            _fetch_into_queue(indicator_id, indicator_code, semaphore, executor, queue, page_size, state)
+            for indicator_id, indicator_code in indicators
+        ))
+    await queue.put(None)
+    await writer
+    return stats
+
+def populate_facts_async(category: Union[str, Sequence[str]] = 'NCD', concurrency: int = 8, rate_limit: float = 10.0,
+                         batch_size: int = DEFAULT_BATCH_SIZE, fast_ingest: bool = False,
+                         page_size: int = 0, incremental: bool = False, processes: int = 0,
+                         restart: bool = False) -> Dict[str, Any]:
+    """Versão concorrente de populate_facts: busca os indicadores em paralelo e grava com um writer único.
+
+    Indicadores cuja busca falha (após os retries do gho_client) são registrados no log e no
+    checkpoint e ignorados; os demais são gravados e confirmados um a um. Uma execução incompleta
+    é retomada pela próxima chamada com as mesmas categorias, que só busca os indicadores pendentes.
+    Várias categorias são carregadas em uma única passada, com um só pool de busca e um só writer.
+
+    Args:
+        category (Union[str, Sequence[str]]): Categoria ou lista de categorias a ser buscada
+            (ex: 'AIR', ['AIR', 'NCD'] ou 'all' para todas as categorias de dim_indicators).
+        concurrency (int): Número máximo de requisições simultâneas.
+        rate_limit (float): Máximo de requisições por segundo por host, retries incluídos
+            (0 desativa o limite; ver gho_client.set_rate_limit).
+        batch_size (int): Linhas por lote de inserção/commit.
+        fast_ingest (bool): Ativa o ingest_profile (WAL, synchronous relaxado, índices adiados).
+        page_size (int): Se > 0, cada indicador é consumido em streaming paginado; a fila limitada
+            mantém no máximo 2 × concurrency páginas em memória.
+        incremental (bool): Pula indicadores inalterados e recarrega só os que mudaram
+            (ver fetch_indicator_delta). Incompatível com page_size.
+        processes (int): Se > 0, busca e parsing rodam em um pool com esse número de processos,
+            que alimenta o writer único pela fila. Incompatível com page_size.
+        restart (bool): Ignora o checkpoint de uma execução inacabada e recomeça do zero.
+
+    Retorna:
+        Dict[str, Any]: Estatísticas da carga (indicadores, falhas, linhas e vazão).
+    """
+    if incremental and page_size:
+        raise ValueError("O modo incremental não suporta streaming paginado (page_size).")
+    if processes and page_size:
+        raise ValueError("O pool de processos não suporta streaming paginado (page_size).")
+    requested: List[str] = [category] if isinstance(category, str) else list(category)
+    workers: str = f"{processes} processos" if processes else f"concorrência={concurrency}"
+    logging.info(f"--- Iniciando População Concorrente da Tabela de Fatos para a(s) Categoria(s): {', '.join(requested)} "
+                 f"({workers}, limite={rate_limit} req/s) ---")
+    stats: Dict[str, Any] = {'indicators': 0, 'failed': 0, 'skipped': 0, 'rows': 0}
+    conn: Optional[sqlite3.Connection] = None
+    start: float = time.perf_counter()
+    cache_before: Dict[str, float] = gho_client.counters()
+    try:
+        conn = get_db_connection()
+        cursor: sqlite3.Cursor = conn.cursor()
+        ensure_fact_natural_key(cursor)
+        categories: List[str] = resolve_categories(cursor, requested)
+        indicators: List[Tuple[int, str]] = select_indicators(cursor, categories)
+        logging.info(f"Encontrados {len(indicators)} indicadores para a(s) categoria(s) {', '.join(categories)}.")
+        run_id, done = start_ingestion_run(cursor, ingestion_scope(categories), restart)
+        conn.commit()
+        pending: List[Tuple[int, str]] = [(i, code) for i, code in indicators if code not in done]
+        if done:
+            logging.info(f"Retomando a execução {run_id}: {len(indicators) - len(pending)} indicadores já concluídos, "
+                         f"{len(pending)} pendentes.")
+
+        state: Optional[Dict[str, Dict[str, Any]]] = load_ingestion_state(cursor) if incremental else None
+        with ingest_profile(conn, fast_ingest):
+            stats = asyncio.run(_populate_facts_async(conn, pending, concurrency, rate_limit, batch_size,
+                                                      page_size, state, run_id, processes))
+        status: str = finish_ingestion_run(cursor, run_id, True)
+        conn.commit()
+        if analyze_after_load(conn, stats['rows']):
+            logging.info("Estatísticas do planner atualizadas (ANALYZE).")
+        if status == 'partial':
+            logging.warning(f"Execução {run_id} incompleta: {stats['failed']} indicadores falharam; rode novamente para retomar.")
+        elif status == 'completed_with_failures':
+            logging.warning(f"Execução {run_id} concluída com {stats['failed']} indicadores com falha permanente "
+                            f"(ver ingestion_checkpoint); a próxima execução começa do zero.")
+        else:
+            logging.info(f"Tabela de fatos populada com sucesso para a(s) categoria(s) {', '.join(categories)}.")
     except Exception as e:
-        logging.error(f"Ocorreu um erro inesperado durante a população de fatos para a categoria {category}: {e}", exc_info=True)
+        logging.error(f"Ocorreu um erro inesperado durante a população concorrente para a(s) categoria(s) {', '.join(requested)}: {e}", exc_info=True)
         if conn: conn.rollback()
     finally:
         if conn:
             conn.close()
             logging.info("Conexão com o banco de dados fechada.")
 
+    elapsed: float = time.perf_counter() - start
+    stats['elapsed_s'] = round(elapsed, 3)
+    stats['indicators_per_s'] = round(stats['indicators'] / elapsed, 2) if elapsed > 0 else 0.0
+    stats['rows_per_s'] = round(stats['rows'] / elapsed, 1) if elapsed > 0 else 0.0
+    logging.info(f"Vazão: {stats['indicators']} indicadores ({stats['failed']} falhas, {stats['skipped']} inalterados), {stats['rows']} linhas "
+                 f"em {stats['elapsed_s']}s — {stats['indicators_per_s']} indicadores/s, {stats['rows_per_s']} linhas/s")
+    if gho_client.CACHE_ENABLED:
+        logging.info(f"Cache HTTP: {gho_client.format_stats(gho_client.counters_since(cache_before))}")
+    return stats
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Popula o banco SQLite raw com dados da API da OMS")
+    parser.add_argument("--category", nargs="+", default=["AIR"],
+                        help="Categoria(s) de indicadores a carregar, ou 'all' para todas as de dim_indicators (default: AIR)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Busca os indicadores em paralelo (asyncio) com um writer único")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requisições simultâneas no modo --async")
+    parser.add_argument("--rate-limit", type=float, default=10.0,
+                        help="Máximo de requisições por segundo por host no modo --async (0 = sem limite)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Linhas por lote de inserção/commit (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--ingest-profile", action="store_true",
+                        help="Perfil de carga: WAL, synchronous=NORMAL, cache maior e índices adiados")
+    parser.add_argument("--stream", action="store_true",
+                        help="Consome cada indicador em streaming paginado ($top/$skip), com memória constante")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Observações por página no modo --stream (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Busca e parsing em N processos alimentando o writer único (implica --async)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignora o checkpoint de uma execução inacabada e recomeça do zero")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Pula indicadores inalterados desde a última carga (ETag/hash do conteúdo)")
+    parser.add_argument("--indicators-file", default=INDICATORS_PATH,
+                        help="CSV (ou .parquet) categorizado de indicadores (default: data/categorized_indicators.csv)")
+    parser.add_argument("--dimensions-only", action="store_true",
+                        help="Carrega apenas as dimensões e encerra")
+    args = parser.parse_args()
+    if args.incremental and args.stream:
+        parser.error("--incremental não pode ser combinado com --stream")
+    if args.processes and args.stream:
+        parser.error("--processes não pode ser combinado com --stream")
+    return args
+
 if __name__ == "__main__":
-    populate_dimensions()
-    populate_facts('AIR')
\ No newline at end of file
+    configure_logging()
+    args = parse_args()
+    page_size: int = args.page_size if args.stream else 0
+    logging.info(f"Startup: {time.perf_counter() - _MODULE_START:.3f}s (imports e argumentos)")
+    try:
+        get_db_connection().close()  # aplica as migrações pendentes antes de qualquer carga
+    except DuplicateFactsError as e:
+        logging.error(f"Migração do schema raw interrompida: {e}")
+        raise SystemExit(1)
+    populate_dimensions(args.indicators_file, args.batch_size)
+    if args.dimensions_only:
+        raise SystemExit(0)
+    if args.use_async or args.processes:
+        populate_facts_async(args.category, args.concurrency, args.rate_limit, args.batch_size,
+                             args.ingest_profile, page_size, args.incremental, args.processes, args.restart)
+    else:
+        populate_facts(args.category, args.batch_size, args.ingest_profile, page_size, args.incremental, args.restart)
@@ -9,8 +9,12 @@ Uso:
 Verifica:
     1. Volume: contagem de linhas em cada camada (raw → staging → marts)
     2. Uniqueness: PKs sem duplicatas em todas as camadas
-    3. Valor: soma e média de valores entre staging e marts
-    4. Cobertura: todo registro na staging encontra um correspondente nos marts
+    3. Valor: soma e média de valores entre raw e marts
+    4. Auditoria: status de cada camada na tabela audit_consistency do dbt
+
+O lado DuckDB (staging e marts) vem da auditoria que o `dbt build` grava em
+main.audit_consistency (macros/layer_consistency.sql), sem recontar as tabelas;
+só o SQLite raw, a fonte independente, é consultado diretamente.
 """
 
 import argparse
@@ -19,8 +23,10 @@ import os
 import sqlite3
 import sys
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
-import duckdb
+if TYPE_CHECKING:
+    import duckdb  # só para anotações; connect_dbt importa sob demanda
 
 PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DBT_DIR = os.path.join(PROJECT_DIR, "dbt")
@@ -37,7 +43,7 @@ def connect_raw() -> sqlite3.Connection | None:
     return sqlite3.connect(RAW_DB)
 
 
-def connect_dbt() -> duckdb.DuckDBPyConnection | None:
+def connect_dbt() -> "duckdb.DuckDBPyConnection | None":
     candidates = [
         os.environ.get("DBT_DUCKDB_PATH"),
         os.path.join(DBT_DIR, "oms_dw.duckdb"),
@@ -45,16 +51,9 @@ def connect_dbt() -> duckdb.DuckDBPyConnection | None:
     ]
     for p in candidates:
         if p and os.path.isfile(p):
-            con = duckdb.connect(p)
-            # ATTACH raw SQLite para queries nas staging views
-            if os.path.isfile(RAW_DB):
-                try:
-                    con.execute(
-                        f"ATTACH IF NOT EXISTS '{RAW_DB}' AS raw_db (TYPE SQLITE)"
-                    )
-                except Exception:
-                    pass  # pode já existir
-            return con
+            import duckdb
+
+            return duckdb.connect(p, read_only=True)
     return None
 
 
@@ -63,45 +62,36 @@ def quote(name: str) -> str:
     return f'"{name}"'
 
 
-# ── Mapeamento Raw → Staging → Mart ──────────────────────────────
-# Mart tables usam *_nk (natural key) em vez de *_id
-# Staging tables mantêm *_id da fonte SQLite
+# ── Mapeamento Raw → Auditoria do dbt ────────────────────────────
+# audit_layer é a linha da camada em main.audit_consistency
 LAYERS = [
     {
         "name": "Indicadores",
         "raw_table": "dim_indicators",
         "raw_count_col": "indicator_id",
         "mart_table": "dim_indicator",
-        "mart_count_col": "indicator_nk",
-        "staging_table": "stg_indicators",
-        "staging_count_col": "indicator_id",
+        "audit_layer": "indicators",
     },
     {
         "name": "Localizações",
         "raw_table": "dim_locations",
         "raw_count_col": "location_id",
         "mart_table": "dim_location",
-        "mart_count_col": "location_nk",
-        "staging_table": "stg_locations",
-        "staging_count_col": "location_id",
+        "audit_layer": "locations",
     },
     {
         "name": "Períodos",
         "raw_table": "dim_periods",
         "raw_count_col": "period_id",
         "mart_table": "dim_period",
-        "mart_count_col": "period_nk",
-        "staging_table": "stg_periods",
-        "staging_count_col": "period_id",
+        "audit_layer": "periods",
     },
     {
         "name": "Sexo",
         "raw_table": "dim_sex",
         "raw_count_col": "sex_id",
         "mart_table": "dim_sex",
-        "mart_count_col": "sex_nk",
-        "staging_table": "stg_sex",
-        "staging_count_col": "sex_id",
+        "audit_layer": "sex",
         "mart_extra_rows": 1,  # +1 UNK row
     },
     {
@@ -109,9 +99,7 @@ LAYERS = [
         "raw_table": "fact_observations",
         "raw_count_col": "observation_id",
         "mart_table": "fct_observations",
-        "mart_count_col": "observation_id",
-        "staging_table": "stg_observations",
-        "staging_count_col": "observation_id",
+        "audit_layer": "observations",
         "value_col": "value",
     },
 ]
@@ -129,6 +117,13 @@ def safe_float(val) -> float:
     return float(val)
 
 
+def load_audit(dbt_conn) -> dict:
+    """Linhas de main.audit_consistency (gravada pelo dbt build) indexadas por camada."""
+    cursor = dbt_conn.execute("SELECT * FROM main.audit_consistency")
+    columns = [d[0] for d in cursor.description]
+    return {row["layer"]: row for row in (dict(zip(columns, r)) for r in cursor.fetchall())}
+
+
 def reconcile_raw_to_dbt() -> dict:
     """Compara cada camada e retorna resultados."""
     raw_conn = connect_raw()
@@ -152,47 +147,44 @@ def reconcile_raw_to_dbt() -> dict:
     if not raw_conn or not dbt_conn:
         return results
 
+    try:
+        audit = load_audit(dbt_conn)
+        results["audited_at"] = max((row["audited_at"] for row in audit.values()), default=None)
+    except Exception as e:
+        results["errors"].append(f"audit_consistency indisponível (rode dbt build): {e}")
+        results["overall"] = "error"
+        raw_conn.close()
+        dbt_conn.close()
+        return results
+
     for layer in LAYERS:
         name = layer["name"]
         entry = {"name": name, "checks": []}
+        row = audit.get(layer["audit_layer"])
+        if row is None:
+            entry["checks"].append(
+                {"check": "audit", "status": "error", "detail": f"camada {layer['audit_layer']} ausente da auditoria"}
+            )
+            results["overall"] = "fail"
+            row = {}
 
         # ── Contagens ──────────────────────────────────────────
         raw_count = 0
-        stg_count = 0
-        mart_count = 0
-
+        raw_unique = 0
         try:
-            raw_count = safe_int(
-                raw_conn.execute(
-                    f'SELECT COUNT({layer["raw_count_col"]}) FROM "{layer["raw_table"]}"'
-                ).fetchone()[0]
+            raw_count, raw_unique = (
+                safe_int(v)
+                for v in raw_conn.execute(
+                    f'SELECT COUNT(*), COUNT(DISTINCT "{layer["raw_count_col"]}") FROM "{layer["raw_table"]}"'
+                ).fetchone()
             )
         except Exception as e:
             entry["checks"].append(
                 {"check": "raw_count", "status": "error", "detail": str(e)}
             )
 
-        try:
-            stg_count = safe_int(
-                dbt_conn.execute(
-                    f'SELECT COUNT({layer["staging_count_col"]}) FROM main."{layer["staging_table"]}"'
-                ).fetchone()[0]
-            )
-        except Exception as e:
-            entry["checks"].append(
-                {"check": "stg_count", "status": "error", "detail": str(e)}
-            )
-
-        try:
-            mart_count = safe_int(
-                dbt_conn.execute(
-                    f'SELECT COUNT({layer["mart_count_col"]}) FROM main."{layer["mart_table"]}"'
-                ).fetchone()[0]
-            )
-        except Exception as e:
-            entry["checks"].append(
-                {"check": "mart_count", "status": "error", "detail": str(e)}
-            )
+        stg_count = safe_int(row.get("staging_rows"))
+        mart_count = safe_int(row.get("mart_rows"))
 
         entry["raw_count"] = raw_count
         entry["stg_count"] = stg_count
@@ -227,63 +219,51 @@ def reconcile_raw_to_dbt() -> dict:
         )
 
         # ── Uniqueness ─────────────────────────────────────────
-        for scope, conn, tbl, col in [
-            ("raw", raw_conn, layer["raw_table"], layer["raw_count_col"]),
-            ("mart", dbt_conn, layer["mart_table"], layer["mart_count_col"]),
+        mart_dupes = safe_int(row.get("duplicate_keys"))
+        for scope, total, dupes in [
+            ("raw", raw_count, raw_count - raw_unique),
+            ("mart", mart_count, mart_dupes),
         ]:
-            try:
-                total = safe_int(
-                    conn.execute(f'SELECT COUNT(*) FROM "{tbl}"').fetchone()[0]
-                )
-                unique = safe_int(
-                    conn.execute(
-                        f'SELECT COUNT(DISTINCT "{col}") FROM "{tbl}"'
-                    ).fetchone()[0]
-                )
-                dupes = total - unique
-                entry["checks"].append(
-                    {
-                        "check": f"uniqueness_{scope}",
-                        "status": "pass" if dupes == 0 else "fail",
-                        "total": total,
-                        "unique": unique,
-                        "duplicates": dupes,
-                    }
-                )
-                if dupes > 0:
-                    results["overall"] = "fail"
-            except Exception as e:
-                entry["checks"].append(
-                    {
-                        "check": f"uniqueness_{scope}",
-                        "status": "error",
-                        "detail": str(e),
-                    }
-                )
+            entry["checks"].append(
+                {
+                    "check": f"uniqueness_{scope}",
+                    "status": "pass" if dupes == 0 else "fail",
+                    "total": total,
+                    "unique": total - dupes,
+                    "duplicates": dupes,
+                }
+            )
+            if dupes > 0:
+                results["overall"] = "fail"
+
+        # ── Auditoria da execução do dbt ───────────────────────
+        if row:
+            audit_status = row["status"]
+            entry["checks"].append(
+                {
+                    "check": "audit_layer",
+                    "status": audit_status,
+                    "detail": f"staging={stg_count} esperado no mart={row['expected_mart_rows']} mart={mart_count}",
+                }
+            )
+            if audit_status != "pass":
+                results["overall"] = "fail"
 
         # ── Valores (apenas para a fato) ────────────────────────
         value_col = layer.get("value_col")
         if value_col:
-            for scope, conn, tbl in [
-                ("raw", raw_conn, layer["raw_table"]),
-                ("mart", dbt_conn, layer["mart_table"]),
-            ]:
-                try:
-                    sum_val = safe_float(
-                        conn.execute(
-                            f'SELECT COALESCE(SUM({value_col}), 0) FROM "{tbl}"'
-                        ).fetchone()[0]
-                    )
-                    avg_val = safe_float(
-                        conn.execute(
-                            f'SELECT COALESCE(AVG({value_col}), 0) FROM "{tbl}"'
-                        ).fetchone()[0]
-                    )
-                    entry[f"sum_{scope}"] = round(sum_val, 2)
-                    entry[f"avg_{scope}"] = round(avg_val, 4)
-                except Exception as e:
-                    entry[f"sum_{scope}"] = None
-                    entry[f"avg_{scope}"] = None
+            try:
+                sum_val, avg_val = raw_conn.execute(
+                    f'SELECT COALESCE(SUM({value_col}), 0), COALESCE(AVG({value_col}), 0) FROM "{layer["raw_table"]}"'
+                ).fetchone()
+                entry["sum_raw"] = round(safe_float(sum_val), 2)
+                entry["avg_raw"] = round(safe_float(avg_val), 4)
+            except Exception:
+                entry["sum_raw"] = None
+                entry["avg_raw"] = None
+            mart_sum = safe_float(row.get("mart_value_sum"))
+            entry["sum_mart"] = round(mart_sum, 2)
+            entry["avg_mart"] = round(mart_sum / mart_count, 4) if mart_count else 0.0
 
             # Comparar somas
             if entry.get("sum_raw") and entry.get("sum_mart") and entry["sum_raw"] > 0:
@@ -305,10 +285,8 @@ def reconcile_raw_to_dbt() -> dict:
 
         results["tables"].append(entry)
 
-    if raw_conn:
-        raw_conn.close()
-    if dbt_conn:
-        dbt_conn.close()
+    raw_conn.close()
+    dbt_conn.close()
 
     return results
 
@@ -321,6 +299,8 @@ def report_text(results: dict) -> str:
         f"  Overall: {'✅ PASS' if results['overall'] == 'pass' else '❌ FAIL'}"
     )
     lines.append(f"  Tolerância: {results['tolerance_pct']}%")
+    if results.get("audited_at"):
+        lines.append(f"  Auditoria do dbt: {results['audited_at']}")
     lines.append("=" * 70)
 
     if results.get("errors"):
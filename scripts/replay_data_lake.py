@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""replay_data_lake.py — Reconstrói o banco SQLite raw a partir do Data Lake, sem rede.
+
+Uso:
+    python3 scripts/replay_data_lake.py                              # lake → database/who_gho.db
+    python3 scripts/replay_data_lake.py --category AIR --workers 8
+    python3 scripts/replay_data_lake.py --ingest-date 2024-05-01 --db-path /tmp/replay.db
+    python3 scripts/replay_data_lake.py --verify --ingest-profile    # confere os checksums do manifesto
+
+Lê o manifesto gravado por simulate_data_lake_ingestion.py e, para cada
+indicador, usa a partição mais recente (ou a de --ingest-date). A
+descompressão, a verificação do SHA-256 e o parsing das partições NDJSON.gz
+rodam em um pool de processos; um writer único grava o star schema com
+DimensionKeyCache + FactBulkLoader (upsert pela chave natural), exatamente
+como populate_database.py. Observações que não constam mais da partição são
+removidas, então o banco reflete o estado do lake.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from create_database import analyze_after_load
+from init_test_db import create_tables
+from populate_database import (
+    DEFAULT_BATCH_SIZE,
+    DimensionKeyCache,
+    FactBulkLoader,
+    ParsedObservation,
+    ensure_fact_natural_key,
+    ingest_profile,
+    parse_observation,
+    prune_stale_facts,
+)
+from simulate_data_lake_ingestion import DATA_LAKE_RAW_DIR, OBSERVATIONS_ENDPOINT, load_manifest
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_DB_PATH = os.path.join(PROJECT_DIR, "database", "who_gho.db")
+SEX_DATA = [("MLE", "Male"), ("FMLE", "Female"), ("BTSX", "Both sexes")]
+
+
+def read_partition(path: str, expected_sha256: Optional[str] = None) -> List[dict]:
+    """Lê uma partição NDJSON.gz inteira; com expected_sha256, confere o checksum do manifesto."""
+    with open(path, "rb") as f:
+        compressed = f.read()
+    if expected_sha256 and hashlib.sha256(compressed).hexdigest() != expected_sha256:
+        raise ValueError(f"checksum divergente em {path}")
+    return [json.loads(line) for line in gzip.decompress(compressed).splitlines() if line]
+
+
+def parse_partition(path: str, expected_sha256: Optional[str] = None) -> List[ParsedObservation]:
+    """Executado nos processos do pool: descomprime e interpreta as observações de uma partição."""
+    rows: List[ParsedObservation] = []
+    for record in read_partition(path, expected_sha256):
+        parsed = parse_observation(record)
+        if parsed is not None:
+            rows.append(parsed)
+    return rows
+
+
+def latest_partitions(partitions: Dict[str, dict], endpoint: str,
+                      ingest_date: Optional[str] = None) -> Dict[Optional[str], dict]:
+    """Partição mais recente (ou da data pedida) de cada indicador do endpoint."""
+    selected: Dict[Optional[str], dict] = {}
+    for entry in partitions.values():
+        if entry["endpoint"] != endpoint:
+            continue
+        if ingest_date and entry["ingest_date"] != ingest_date:
+            continue
+        current = selected.get(entry["indicator"])
+        if current is None or entry["ingest_date"] > current["ingest_date"]:
+            selected[entry["indicator"]] = entry
+    return selected
+
+
+def replay_dimensions(cursor: sqlite3.Cursor, lake_dir: str, partitions: Dict[str, dict],
+                      observations: List[dict], ingest_date: Optional[str]) -> Dict[str, int]:
+    """Popula dim_indicators (código, nome, categoria) e dim_sex; retorna indicator_code → indicator_id."""
+    names: Dict[str, str] = {}
+    metadata = latest_partitions(partitions, "Indicator", ingest_date).get(None)
+    if metadata is not None:
+        for record in read_partition(os.path.join(lake_dir, metadata["path"])):
+            if record.get("IndicatorCode"):
+                names[record["IndicatorCode"]] = record.get("IndicatorName")
+
+    cursor.executemany(
+        """
+        INSERT INTO dim_indicators (indicator_code, indicator_name, category) VALUES (?, ?, ?)
+        ON CONFLICT (indicator_code) DO UPDATE SET
+            indicator_name = COALESCE(excluded.indicator_name, indicator_name),
+            category = excluded.category
+        """,
+        [(entry["indicator"], names.get(entry["indicator"]), entry["category"]) for entry in observations],
+    )
+    cursor.executemany("INSERT OR IGNORE INTO dim_sex (sex_code, sex_name) VALUES (?, ?)", SEX_DATA)
+    cursor.execute("SELECT indicator_code, indicator_id FROM dim_indicators")
+    return dict(cursor.fetchall())
+
+
+def parse_in_pool(lake_dir: str, observations: List[dict], workers: int,
+                  verify: bool) -> Iterator[Tuple[dict, List[ParsedObservation]]]:
+    """Interpreta as partições em paralelo, entregando-as na ordem do manifesto.
+
+    No máximo 2 × workers partições ficam em voo, o que limita a memória do lado do writer.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: Deque[Tuple[dict, Future]] = deque()
+        for entry in observations:
+            path = os.path.join(lake_dir, entry["path"])
+            in_flight.append((entry, executor.submit(parse_partition, path, entry["sha256"] if verify else None)))
+            if len(in_flight) >= workers * 2:
+                done_entry, future = in_flight.popleft()
+                yield done_entry, future.result()
+        while in_flight:
+            done_entry, future = in_flight.popleft()
+            yield done_entry, future.result()
+
+
+def replay(db_path: str, lake_dir: str = DATA_LAKE_RAW_DIR, categories: Optional[List[str]] = None,
+           ingest_date: Optional[str] = None, workers: int = os.cpu_count() or 1,
+           batch_size: int = DEFAULT_BATCH_SIZE, fast_ingest: bool = False, verify: bool = False) -> dict:
+    partitions = load_manifest(lake_dir)
+    if not partitions:
+        raise FileNotFoundError(f"Manifesto vazio ou ausente em {lake_dir}")
+    observations = sorted(
+        (
+            entry for entry in latest_partitions(partitions, OBSERVATIONS_ENDPOINT, ingest_date).values()
+            if not categories or "all" in categories or entry["category"] in categories
+        ),
+        key=lambda entry: (entry["category"], entry["indicator"]),
+    )
+
+    stats = {"partitions": 0, "rows": 0, "pruned": 0}
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        create_tables(cursor)
+        ensure_fact_natural_key(cursor)
+        indicator_ids = replay_dimensions(cursor, lake_dir, partitions, observations, ingest_date)
+        conn.commit()
+
+        keys = DimensionKeyCache(cursor)
+        loader = FactBulkLoader(conn, batch_size)
+        with ingest_profile(conn, fast_ingest):
+            for entry, rows in parse_in_pool(lake_dir, observations, workers, verify):
+                indicator_id = indicator_ids[entry["indicator"]]
+                keyed_rows = keys.resolve(rows)
+                loader.add(indicator_id, keyed_rows)
+                loader.flush()
+                stats["pruned"] += prune_stale_facts(cursor, indicator_id, keyed_rows)
+                stats["partitions"] += 1
+                stats["rows"] += len(rows)
+            conn.commit()
+        stats["analyzed"] = analyze_after_load(conn, stats["rows"])
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["rows_per_s"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstrói o banco SQLite raw a partir do Data Lake (offline)")
+    parser.add_argument("--lake-dir", default=DATA_LAKE_RAW_DIR, help="Diretório da zona raw")
+    parser.add_argument(
+        "--db-path",
+        default=DEFAULT_DB_PATH,
+        help="Caminho para o arquivo .db (default: database/who_gho.db)",
+    )
+    parser.add_argument("--category", nargs="*", default=[], help="Categorias a reprocessar (default: todas)")
+    parser.add_argument("--ingest-date", default=None, help="Reprocessa apenas as partições desta data (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos de parsing")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Linhas por lote de inserção/commit")
+    parser.add_argument("--ingest-profile", action="store_true",
+                        help="Perfil de carga: WAL, synchronous=NORMAL, cache maior e índices adiados")
+    parser.add_argument("--verify", action="store_true", help="Confere o SHA-256 de cada partição com o manifesto")
+    parser.add_argument("--json", action="store_true", help="Saída JSON")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db_path)), exist_ok=True)
+    try:
+        stats = replay(args.db_path, args.lake_dir, args.category, args.ingest_date, args.workers,
+                       args.batch_size, args.ingest_profile, args.verify)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"✓ {stats['partitions']} partições, {stats['rows']:,} observações "
+              f"({stats['pruned']:,} removidas) em {stats['elapsed_s']}s — {stats['rows_per_s']:,.0f} linhas/s")
+        print(f"✓ Banco raw: {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,7 @@ if make ci 2>&1; then
     
     # Gera relatorio de saude pos-execucao
     if [ -f "${SCRIPT_DIR}/health_check.py" ]; then
-        python3 "${SCRIPT_DIR}/health_check.py" --json >> "$LOG_DIR/health.jsonl"
+        python3 "${SCRIPT_DIR}/oms.py" health --json >> "$LOG_DIR/health.jsonl"
     fi
 else
     log "ERROR" "Pipeline falhou"
@@ -1,50 +1,207 @@
-import requests
-import os
+#!/usr/bin/env python3
+"""simulate_data_lake_ingestion.py — Ingestão simulada da API da OMS em um Data Lake local.
+
+Uso:
+    python3 scripts/simulate_data_lake_ingestion.py                              # Indicator + DIMENSION
+    python3 scripts/simulate_data_lake_ingestion.py --category AIR NCD           # + observações por indicador
+    python3 scripts/simulate_data_lake_ingestion.py --category all --workers 8   # catálogo completo
+    GHO_API_URL=http://127.0.0.1:8765/api/ python3 scripts/simulate_data_lake_ingestion.py --category AIR
+
+A zona raw é gravada como NDJSON comprimido (gzip, um registro OData por linha)
+e particionada no estilo Hive:
+
+    data_lake/raw/endpoint=Indicator/ingest_date=2024-05-01/part-0000.ndjson.gz
+    data_lake/raw/endpoint=observations/category=AIR/indicator=AIR_1/ingest_date=2024-05-01/part-0000.ndjson.gz
+
+Reingerir a mesma partição no mesmo dia a substitui (escrita atômica). O
+arquivo data_lake/raw/_manifest.json lista cada partição com contagem de
+linhas, tamanho e checksum SHA-256, permitindo validar e reprocessar o lake
+sem abrir os arquivos. Em um cenário real, isso seria o upload para um bucket
+S3, Azure Blob Storage, etc.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
 import json
-from datetime import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+import gho_client
 
-# URL base da API da OMS
-BASE_URL = "https://ghoapi.azureedge.net/api/"
+# URL base da API da OMS (sobrescrevível para apontar para scripts/gho_api_stub.py)
+BASE_URL = gho_client.GHO_API_URL
 
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 # Define o diretório do Data Lake (local)
-data_lake_raw_dir = os.path.join('data_lake', 'raw')
-os.makedirs(data_lake_raw_dir, exist_ok=True)
+DATA_LAKE_RAW_DIR = os.path.join(PROJECT_DIR, "data_lake", "raw")
+INDICATORS_CSV = os.path.join(PROJECT_DIR, "data", "categorized_indicators.csv")
+MANIFEST_NAME = "_manifest.json"
+PART_NAME = "part-0000.ndjson.gz"
+
+# Endpoint lógico das observações por indicador (na API, /api/<IndicatorCode>)
+OBSERVATIONS_ENDPOINT = "observations"
+
+
+def partition_path(endpoint: str, ingest_date: str, category: Optional[str] = None,
+                   indicator: Optional[str] = None) -> str:
+    """Caminho relativo (à zona raw) da partição endpoint/category/indicator/ingest_date."""
+    parts = [f"endpoint={endpoint}"]
+    if category is not None:
+        parts.append(f"category={category}")
+    if indicator is not None:
+        parts.append(f"indicator={indicator}")
+    parts.append(f"ingest_date={ingest_date}")
+    return "/".join(parts)
+
+
+def write_ndjson_gz(path: str, records: Iterable[dict]) -> Tuple[int, int, str]:
+    """Grava os registros como NDJSON gzip de forma atômica.
+
+    O cabeçalho gzip não leva timestamp, então o mesmo conteúdo gera sempre o mesmo checksum.
+
+    Retorna:
+        Tuple[int, int, str]: (linhas, bytes no disco, SHA-256 do arquivo comprimido).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            for record in records:
+                gz.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+                gz.write(b"\n")
+                rows += 1
+    digest = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    os.replace(tmp_path, path)
+    return rows, os.path.getsize(path), digest.hexdigest()
 
-def ingest_raw_data_to_data_lake(endpoint: str, filename_prefix: str):
-    """Simula a ingestão de dados brutos da API da OMS para um Data Lake local."""
-    url = f"{BASE_URL}{endpoint}"
+
+def load_manifest(lake_dir: str) -> Dict[str, dict]:
+    """Partições já registradas no manifesto, indexadas pelo caminho relativo."""
+    manifest_path = os.path.join(lake_dir, MANIFEST_NAME)
+    if not os.path.isfile(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return {entry["path"]: entry for entry in json.load(f)["partitions"]}
+
+
+def save_manifest(lake_dir: str, partitions: Dict[str, dict]) -> str:
+    manifest_path = os.path.join(lake_dir, MANIFEST_NAME)
+    body = {
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "format": "ndjson.gz",
+        "total_rows": sum(entry["rows"] for entry in partitions.values()),
+        "partitions": [partitions[path] for path in sorted(partitions)],
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(body, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def ingest_raw_data_to_data_lake(endpoint: str, lake_dir: str = DATA_LAKE_RAW_DIR,
+                                 category: Optional[str] = None, indicator: Optional[str] = None,
+                                 ingest_date: Optional[str] = None) -> Optional[dict]:
+    """Simula a ingestão de dados brutos da API da OMS para um Data Lake local.
+
+    Busca o endpoint (ou, com indicator, as observações do indicador) e grava os registros
+    OData em uma partição NDJSON gzip.
+
+    Retorna:
+        Optional[dict]: Entrada do manifesto da partição, ou None se a ingestão falhou.
+    """
+    url = f"{BASE_URL}{indicator or endpoint}"
+    ingest_date = ingest_date or date.today().isoformat()
+    relative_dir = partition_path(endpoint, ingest_date, category, indicator)
     print(f"Tentando ingerir dados brutos de: {url}")
 
     try:
-        response = requests.get(url, timeout=30)
+        response = gho_client.get(url, timeout=30)
         response.raise_for_status()  # Lança um erro para status HTTP ruins
+        records = response.json().get("value", [])
 
-        # Gera um nome de arquivo com timestamp para evitar sobrescrever
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"{filename_prefix}_{timestamp}.json"
-        output_path = os.path.join(data_lake_raw_dir, output_filename)
-
-        # Salva a resposta JSON bruta no 'Data Lake' local
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(response.json(), f, indent=4)
-        
-        print(f"Dados brutos de '{endpoint}' salvos em: {output_path}")
-        print("Em um cenário real, isso seria o upload para um bucket S3, Azure Blob Storage, etc.")
+        relative_path = f"{relative_dir}/{PART_NAME}"
+        rows, size, checksum = write_ndjson_gz(os.path.join(lake_dir, relative_path), records)
+        print(f"  -> {rows} registros de '{indicator or endpoint}' salvos em: {relative_path}")
+        return {
+            "path": relative_path,
+            "endpoint": endpoint,
+            "category": category,
+            "indicator": indicator,
+            "ingest_date": ingest_date,
+            "rows": rows,
+            "bytes": size,
+            "sha256": checksum,
+            "source_url": url,
+            "ingested_at": datetime.now(timezone.utc).isoformat(),
+        }
 
     except requests.exceptions.RequestException as e:
-        print(f"Erro ao ingerir dados brutos de {endpoint}: {e}")
+        print(f"Erro ao ingerir dados brutos de {indicator or endpoint}: {e}")
     except Exception as e:
         print(f"Ocorreu um erro inesperado: {e}")
+    return None
+
+
+def select_indicators(categories: List[str], indicators_csv: str = INDICATORS_CSV) -> List[Tuple[str, str]]:
+    """(categoria, código) dos indicadores das categorias pedidas ('all' = todas) no CSV categorizado."""
+    with open(indicators_csv, newline="", encoding="utf-8") as f:
+        rows = [(row["Category"], row["IndicatorCode"]) for row in csv.DictReader(f) if row.get("Category")]
+    if "all" in categories:
+        return rows
+    wanted = set(categories)
+    return [(category, code) for category, code in rows if category in wanted]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingestão simulada da API da OMS em um Data Lake local")
+    parser.add_argument("--endpoints", nargs="*", default=["Indicator", "DIMENSION"],
+                        help="Endpoints de metadados a ingerir (default: Indicator DIMENSION)")
+    parser.add_argument("--category", nargs="*", default=[],
+                        help="Categorias cujas observações serão ingeridas, ou 'all'")
+    parser.add_argument("--indicators-csv", default=INDICATORS_CSV, help="CSV categorizado de indicadores")
+    parser.add_argument("--lake-dir", default=DATA_LAKE_RAW_DIR, help="Diretório da zona raw")
+    parser.add_argument("--workers", type=int, default=4, help="Requisições simultâneas")
+    args = parser.parse_args()
+
+    os.makedirs(args.lake_dir, exist_ok=True)
+    ingest_date = date.today().isoformat()
+    jobs: List[dict] = [{"endpoint": endpoint} for endpoint in args.endpoints]
+    if args.category:
+        jobs += [
+            {"endpoint": OBSERVATIONS_ENDPOINT, "category": category, "indicator": code}
+            for category, code in select_indicators(args.category, args.indicators_csv)
+        ]
+
+    # Cada partição é um arquivo independente; só o manifesto é atualizado no fim, pela thread principal
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(
+            lambda job: ingest_raw_data_to_data_lake(lake_dir=args.lake_dir, ingest_date=ingest_date, **job),
+            jobs,
+        ))
+
+    partitions = load_manifest(args.lake_dir)
+    written = [entry for entry in results if entry is not None]
+    for entry in written:
+        partitions[entry["path"]] = entry
+    manifest_path = save_manifest(args.lake_dir, partitions)
+
+    print(f"✓ {len(written)}/{len(jobs)} partições gravadas "
+          f"({sum(e['rows'] for e in written):,} registros, {sum(e['bytes'] for e in written) / 1024:,.1f} KiB)")
+    print(f"✓ Manifesto: {manifest_path}")
+    if gho_client.CACHE_ENABLED:
+        print(f"✓ Cache HTTP: {gho_client.format_stats(gho_client.get_cache().stats)}")
+
 
 if __name__ == "__main__":
-    # Exemplo de uso: Ingerir dados de Indicadores
-    ingest_raw_data_to_data_lake("Indicator", "indicators_raw")
-    
-    # Exemplo de uso: Ingerir dados de uma categoria específica (se disponível e funcional)
-    # ingest_raw_data_to_data_lake("NCD", "ncd_category_raw")
-    
-    # Exemplo de uso: Ingerir dados de Dimensões
-    ingest_raw_data_to_data_lake("DIMENSION", "dimensions_raw")
-
-    # Exemplo de uso: Ingerir dados de Regiões (sabemos que está quebrado, mas para demonstração)
-    # ingest_raw_data_to_data_lake("Region", "regions_raw")
+    main()